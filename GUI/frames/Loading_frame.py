@@ -1,9 +1,25 @@
-from threading import Thread
+import queue
+import time
 from tkinter import ttk
 import tkinter as tk
 
 class LoadingWindow:
-    def __init__(self, parent, message="Calculating schedule...\nPlease wait"):
+    """
+    Modal progress window.  Worker threads never touch Tk directly: they call
+    post()/update_message(), which only put events on a queue, and the window
+    drains that queue on the UI thread with after() polling.
+
+    Recognised event keys: message, time_limit, elapsed, objective, bound,
+    gap, jobs, jobs_total, status, phase (two-phase solves), and day/days for
+    batch runs.  Once a time_limit is known the bar becomes determinate.
+    The bar follows elapsed time, or the closing gap when that is further
+    along; the solver only sends a gap where it measures progress (the
+    throughput, or the makespan), not for the raw weighted objective.
+    """
+    POLL_MS = 100
+
+    def __init__(self, parent, message="Calculating schedule...\nPlease wait",
+                 on_cancel=None, on_use_best=None):
         self.top = tk.Toplevel(parent)
         self.top.title("Processing")
         
@@ -12,8 +28,8 @@ class LoadingWindow:
         self.top.grab_set()
         
         # Center the window
-        w = 300
-        h = 100
+        w = 320
+        h = 160 if (on_cancel or on_use_best) else 120
         ws = parent.winfo_screenwidth()
         hs = parent.winfo_screenheight()
         x = (ws/2) - (w/2)
@@ -30,7 +46,9 @@ class LoadingWindow:
             text=message,
             style='Loading.TLabel'
         )
-        self.label.pack(pady=10)
+        self.label.pack(pady=(10,0))
+        self.detail = ttk.Label(self.top, text="", style='Loading.TLabel')
+        self.detail.pack()
         
         self.progress = ttk.Progressbar(
             self.top,
@@ -39,17 +57,110 @@ class LoadingWindow:
         )
         self.progress.pack(pady=10, padx=20, fill='x')
         self.progress.start(10)  # Speed up animation
+
+        # progress state, only ever touched on the UI thread
+        self.events = queue.Queue()
+        self._closed = False
+        self._t0 = time.time()
+        self._state = {"day": None, "days": None, "time_limit": None, "status": None,
+                       "objective": None, "bound": None, "gap": None,
+                       "jobs": None, "jobs_total": None, "phase": None}
+        self.top.after(self.POLL_MS, self._poll)
         
-        # Prevent window from being closed
-        self.top.protocol("WM_DELETE_WINDOW", lambda: None)
+        # Cancel / "Use best so far" for solves that can be stopped early
+        if on_cancel or on_use_best:
+            btns = ttk.Frame(self.top)
+            btns.pack(pady=(0,10))
+            if on_use_best:
+                self.use_best_btn = ttk.Button(btns, text="Use best so far",
+                                               command=lambda: self._stop(on_use_best))
+                self.use_best_btn.pack(side="left", padx=5)
+            if on_cancel:
+                self.cancel_btn = ttk.Button(btns, text="Cancel",
+                                             command=lambda: self._stop(on_cancel))
+                self.cancel_btn.pack(side="left", padx=5)
+
+        # Closing the window cancels when that is allowed, otherwise it is ignored
+        self.top.protocol("WM_DELETE_WINDOW",
+                          (lambda: self._stop(on_cancel)) if on_cancel else (lambda: None))
+
+    def _stop(self, action):
+        """Run a cancel action once and show that the solver is stopping"""
+        for btn in (getattr(self, "use_best_btn", None), getattr(self, "cancel_btn", None)):
+            if btn is not None:
+                btn.state(["disabled"])
+        self.label.configure(text="Stopping solver…")
+        action()
         
+    def post(self, event=None, **fields):
+        """Queue a progress event; safe to call from any thread"""
+        self.events.put({**(event or {}), **fields})
+
     def update_message(self, message):
-        """Update the loading message"""
-        self.label.configure(text=message)
-        self.top.update()
-        
+        """Update the loading message (thread-safe)"""
+        self.post(message=message)
+
+    def _poll(self):
+        if self._closed:
+            return
+        while True:
+            try:
+                self._apply(self.events.get_nowait())
+            except queue.Empty:
+                break
+        self._render()
+        self.top.after(self.POLL_MS, self._poll)
+
+    def _apply(self, ev):
+        st = self._state
+        if "message" in ev:
+            self.label.configure(text=ev["message"])
+        if ev.get("day") is not None and ev["day"] != st["day"]:
+            # next day of a batch run: start that day's clock afresh
+            st.update(objective=None, bound=None, gap=None, jobs=None, status=None)
+            self._t0 = time.time()
+        if ev.get("phase") is not None and ev["phase"] != st["phase"]:
+            # the next phase optimises something else: its gap starts afresh
+            st.update(objective=None, bound=None, gap=None)
+        if "elapsed" in ev and "status" not in ev:
+            self._t0 = time.time() - ev["elapsed"]
+        if ev.get("time_limit") and st["time_limit"] is None:
+            self.progress.stop()
+            self.progress.configure(mode='determinate', maximum=100, value=0)
+        for key in st:
+            if key in ev:
+                st[key] = ev[key]
+
+    def _render(self):
+        st = self._state
+        limit = st["time_limit"]
+        if not limit:
+            return
+        elapsed = min(time.time() - self._t0, limit)
+        frac = elapsed / limit
+        parts = []
+        if st["phase"] is not None:
+            parts.append(f"phase {st['phase']}/2")
+        if st["jobs"] is not None:
+            parts.append(f"{st['jobs']}/{st['jobs_total']} jobs")
+        gap = st["gap"]
+        if gap is not None:
+            # closing the gap to the proven bound also counts as progress
+            frac = max(frac, 1 - gap)
+            parts.append(f"gap {gap:.1%}")
+        parts.append(f"{elapsed:.0f}/{limit:.0f} s")
+        if st["status"]:
+            frac = 1.0
+        if st["days"]:
+            frac = ((st["day"] or 1) - 1 + frac) / st["days"]
+        self.progress.configure(value=100 * min(frac, 1.0))
+        self.detail.configure(text="  ·  ".join(parts))
+
     def destroy(self):
-        """Safely destroy the loading window"""
+        """Safely destroy the loading window (safe to call twice)"""
+        if self._closed:
+            return
+        self._closed = True
         self.progress.stop()
         self.top.grab_release()
         self.top.destroy()
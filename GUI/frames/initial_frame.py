@@ -2,14 +2,21 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from Data.universal_variable import DEFAULT_HORIZON as default_horizon
-import pandas as pd
 from GUI.colours import GKN_TEXT, GKN_SECONDARY
 import os
-from Scheduler.model import solve_throughput_with_earliest
+# pandas, the solver service and the report modules load with the handlers
+# that use them (MainApp preloads them in the background), so this first
+# page comes up on tkinter alone
 from GUI.frames.Loading_frame import LoadingWindow
 from threading import Thread
 import uuid
-import json
+
+# Scheduler.model.OBJECTIVES as shown in the objective box
+OBJECTIVE_LABELS = {
+    "weighted":      "Max throughput",
+    "lexicographic": "Max throughput, two-phase",
+    "makespan":      "Shortest finish (all runs)",
+}
 
 class InitialFrame(ttk.Frame):
     def __init__(self, master, app):
@@ -74,6 +81,17 @@ class InitialFrame(ttk.Frame):
         opts_frame.pack(fill="x", pady=5, padx=10)
         ttk.Checkbutton(opts_frame, text="Show Simulation", variable=self.var_sim).pack(side="left", padx=(0,10))
         ttk.Checkbutton(opts_frame, text="Show Gantt", variable=self.var_gantt).pack(side="left")
+        self.var_service = tk.BooleanVar(value=bool(self.app.service_url))
+        ttk.Checkbutton(
+            opts_frame, text="Use local scheduling service",
+            variable=self.var_service, command=self.on_toggle_service
+        ).pack(side="left", padx=(10,0))
+        ttk.Label(opts_frame, text="Objective:", foreground=GKN_TEXT).pack(side="left", padx=(10,0))
+        self.var_objective = tk.StringVar(value=OBJECTIVE_LABELS[self.app.objective])
+        ttk.Combobox(
+            opts_frame, textvariable=self.var_objective, state="readonly", width=22,
+            values=list(OBJECTIVE_LABELS.values())
+        ).pack(side="left", padx=(5,0))
 
         # Operation selector
         ttk.Label(
@@ -128,17 +146,37 @@ class InitialFrame(ttk.Frame):
         ttk.Button(btn_frame, text="Test", command=self.on_test).pack(side="left", padx=5)        
         ttk.Button(btn_frame,text="Import FlightBar JSON", command=self.on_import_flightbar_json).pack(side="left", padx=5)
 
+    def on_toggle_service(self):
+        if not self.var_service.get():
+            self.app.service_url = None
+            return
+        from Scheduler.service import ServiceClient, DEFAULT_PORT
+        url = self.app.service_url or f"http://127.0.0.1:{DEFAULT_PORT}"
+        if not ServiceClient(url).available():
+            messagebox.showwarning(
+                "Service unavailable",
+                f"No scheduling service is running at {url}.\n"
+                "Start one with: python -m Scheduler.service"
+            )
+            self.var_service.set(False)
+            return
+        self.app.service_url = url
+
     def on_test(self):
         # Step 1: Import history file
         path = filedialog.askopenfilename(
             title="Select history Excel for testing",
-            filetypes=[("Excel files","*.xlsx;*.xls")]
+            filetypes=[("History files","*.xlsx;*.xls;*.csv")]
         )
         if not path:
             return
+        import pandas as pd
+        from Scheduler.problem import make_problem
+        from Scheduler.archive import ScheduleArchive
+        from Scheduler.history import read_history, day_counts
+        from Scheduler.kpi import kpis
         try:
-            df = pd.read_excel(path, parse_dates=["Date"], dtype={"Sequence label": str})
-            df["Date"] = df["Date"].dt.date
+            problems = day_counts(read_history(path))
         except Exception as e:
             messagebox.showerror("Load error", f"Could not read {path}:\n{e}")
             return
@@ -148,16 +186,17 @@ class InitialFrame(ttk.Frame):
         sd, ops_dict = self.app.sd, self.app.ops
         base_horizon = getattr(self.app, 'horizon', default_horizon)
 
+        # every solved day also goes to the schedule archive for later comparison
+        archive = ScheduleArchive()
+        run_id = archive.start_run(os.path.basename(path), kind=test_choice,
+                                   params={"source": path, "horizon": base_horizon})
+
         if test_choice == "Operator Test":
             # Vary number of operators from 1 to 6
             for n_ops in range(1, 7):
                 self.app.station_caps['S'] = n_ops
-                for day in sorted(df["Date"].unique()):
-                    sub = df[df["Date"] == day]
-                    counts = sub["Sequence label"].value_counts().to_dict()
-                    if not counts:
-                        continue
-                    sched, tasks, _ = solve_throughput_with_earliest(
+                for day, counts in problems.items():
+                    args = dict(
                         selected_ops    = list(counts),
                         stations_dict   = sd,
                         operations_dict = ops_dict,
@@ -167,15 +206,15 @@ class InitialFrame(ttk.Frame):
                         station_caps    = self.app.station_caps,
                         earliest_starts = {"program_start": 0, **{op:0 for op in counts}}
                     )
-                    procs = [ (s,e) for (jid,idx),(s,e) in sched.items() if tasks[(jid,idx)]["type"]=="PROCESS" ]
-                    total_runtime = max(e for s,e in procs) - min(s for s,e in procs) if procs else 0
-                    throughput = sum(1 for (jid,idx) in sched if idx==0)
+                    sched, tasks, _ = self.app.solve(priority="batch", **args)
+                    archive.record(run_id, sched, tasks, make_problem(**args), date=day)
+                    metrics = kpis(sched, tasks)
                     results.append({
                         'test_type': 'Operator',
                         'operator_count': n_ops,
                         'Date': day,
-                        'total_runtime': total_runtime,
-                        'throughput': throughput
+                        'total_runtime': metrics['total_runtime'],
+                        'throughput': metrics['throughput']
                     })
 
         else:  # Time Limit Test
@@ -186,12 +225,8 @@ class InitialFrame(ttk.Frame):
                 except ValueError:
                     n_ops = 1
                 self.app.station_caps['S'] = n_ops
-                for day in sorted(df["Date"].unique()):
-                    sub = df[df["Date"] == day]
-                    counts = sub["Sequence label"].value_counts().to_dict()
-                    if not counts:
-                        continue
-                    sched, tasks, _ = solve_throughput_with_earliest(
+                for day, counts in problems.items():
+                    args = dict(
                         selected_ops    = list(counts),
                         stations_dict   = sd,
                         operations_dict = ops_dict,
@@ -202,17 +237,19 @@ class InitialFrame(ttk.Frame):
                         earliest_starts = {"program_start": 0, **{op:0 for op in counts}},
                         time_limit      = t_lim
                     )
-                    procs = [ (s,e) for (jid,idx),(s,e) in sched.items() if tasks[(jid,idx)]["type"]=="PROCESS" ]
-                    total_runtime = max(e for s,e in procs) - min(s for s,e in procs) if procs else 0
-                    throughput = sum(1 for (jid,idx) in sched if idx==0)
+                    sched, tasks, _ = self.app.solve(priority="batch", **args)
+                    archive.record(run_id, sched, tasks, make_problem(**args), date=day)
+                    metrics = kpis(sched, tasks)
                     results.append({
                         'test_type': 'TimeLimit',
                         'time_limit': t_lim,
                         'Date': day,
-                        'total_runtime': total_runtime,
-                        'throughput': throughput
+                        'total_runtime': metrics['total_runtime'],
+                        'throughput': metrics['throughput']
                     })
 
+        archive.close()
+
         # Export results
         out_df = pd.DataFrame(results)
         fn = "test_results.xlsx"
@@ -236,29 +273,15 @@ class InitialFrame(ttk.Frame):
         )
         if not path:
             return
+        from Scheduler.flightbar import flightbar_problem
 
-        # 1) load JSON
+        # 1) stream the flightBars and extract ops, weights, counts
         try:
-            with open(path, 'r') as f:
-                data = json.load(f)
+            counts, weights = flightbar_problem(path, self.app.ops)
         except Exception as e:
             messagebox.showerror("JSON load error", f"Could not read {path}:\n{e}")
             return
 
-        # 2) extract ops, weights, counts
-        counts = {}
-        weights = {}
-        for fb in data.get("flightBars", []):
-            k = fb.get("kNumber")
-            if k not in self.app.ops:
-                continue
-            eff = fb.get("efficiency", 1.0)
-            if not k:
-                continue
-            counts[k] = counts.get(k, 0) + 1
-            # if multiple bars of same k, just keep the last efficiency
-            weights[k] = eff
-
         if not counts:
             messagebox.showinfo("No flightBars", "No valid flightBars found in that file.")
             return
@@ -275,88 +298,96 @@ class InitialFrame(ttk.Frame):
         # 3) call the solver immediately
         from .schedule_frame.frame import ScheduleFrame
 
-        loading = LoadingWindow(self.app, "Solving flight-bar schedule…")
+        # start the solver without blocking; the loader can stop it early
+        discard = []
 
-        def worker():
-            try:
-                # run the solver
-                sched, tasks, makespan = solve_throughput_with_earliest(
-                    self.app.selected_ops,
-                    self.app.sd,
-                    self.app.ops,
-                    self.app.weights,
-                    self.app.max_runs,
-                    getattr(self.app, 'horizon', default_horizon),
-                    self.app.station_caps,
-                    self.app.earliest
-
-                )
+        def on_cancel():
+            discard.append(True)
+            handle.cancel()
 
-                # done solving, now dispatch back to UI thread
-                def finish():
-                    loading.destroy()
-                    helper = ScheduleFrame.__new__(ScheduleFrame)
-                    helper.sched        = sched
-                    helper.tasks        = tasks
-                    helper.selected_ops = self.app.selected_ops
-                    helper.ops          = self.app.ops
-                    helper.weights      = self.app.weights
-                    helper.max_runs     = self.app.max_runs
-                    helper.earliest     = self.app.earliest
-                    helper.base_minutes = 0
-                    helper.export_to_excel()
-                    self.app.destroy()
-                    # if neither view requested, export & quit
-                    """if not (self.app.show_simulation or self.app.show_gantt):
-                        helper = ScheduleFrame.__new__(ScheduleFrame)
-                        helper.sched        = sched
-                        helper.tasks        = tasks
-                        helper.selected_ops = self.app.selected_ops
-                        helper.ops          = self.app.ops
-                        helper.weights      = self.app.weights
-                        helper.max_runs     = self.app.max_runs
-                        helper.earliest     = self.app.earliest
-                        helper.base_minutes = 0
-                        helper.export_to_excel()
-                        self.app.destroy()
-                    else:
-                        # go straight to the full GUI
-                        self.destroy()
-                        ScheduleFrame(
-                            self.app,
-                            sched, tasks, self.app.sd, makespan,
-                            self.app.selected_ops,
-                            self.app.ops,
-                            self.app.weights,
-                            self.app.max_runs
-                        )"""
-
-                self.app.after(0, finish)
+        loading = LoadingWindow(
+            self.app, "Solving flight-bar schedule…",
+            on_cancel=on_cancel, on_use_best=lambda: handle.cancel()
+        )
+        handle = self.app.submit_solve(
+            self.app.selected_ops,
+            self.app.sd,
+            self.app.ops,
+            self.app.weights,
+            self.app.max_runs,
+            getattr(self.app, 'horizon', default_horizon),
+            self.app.station_caps,
+            self.app.earliest,
+            progress=loading.post
+        )
 
+        # done solving, now dispatch back to UI thread
+        def finish():
+            loading.destroy()
+            if discard:
+                return
+            try:
+                sched, tasks, makespan = handle.result()
             except Exception as ex:
                 # on error, hide loading and show message
-                def show_err():
-                    loading.destroy()
-                    messagebox.showerror("Error", str(ex))
-                self.app.after(0, show_err)
+                messagebox.showerror("Error", str(ex))
+                return
+            helper = ScheduleFrame.__new__(ScheduleFrame)
+            helper.sched        = sched
+            helper.tasks        = tasks
+            helper.selected_ops = self.app.selected_ops
+            helper.ops          = self.app.ops
+            helper.weights      = self.app.weights
+            helper.max_runs     = self.app.max_runs
+            helper.earliest     = self.app.earliest
+            helper.base_minutes = 0
+            helper.export_to_excel(background=False)
+            self.app.destroy()
+            # if neither view requested, export & quit
+            """if not (self.app.show_simulation or self.app.show_gantt):
+                helper = ScheduleFrame.__new__(ScheduleFrame)
+                helper.sched        = sched
+                helper.tasks        = tasks
+                helper.selected_ops = self.app.selected_ops
+                helper.ops          = self.app.ops
+                helper.weights      = self.app.weights
+                helper.max_runs     = self.app.max_runs
+                helper.earliest     = self.app.earliest
+                helper.base_minutes = 0
+                helper.export_to_excel(background=False)
+                self.app.destroy()
+            else:
+                # go straight to the full GUI
+                self.destroy()
+                ScheduleFrame(
+                    self.app,
+                    sched, tasks, self.app.sd, makespan,
+                    self.app.selected_ops,
+                    self.app.ops,
+                    self.app.weights,
+                    self.app.max_runs
+                )"""
 
-        # fire off the solver thread
-        Thread(target=worker, daemon=True).start()
+        handle.add_done_callback(lambda h: self.app.after(0, finish))
 
     def on_import_history(self):
 
         """Load historical Excel, compute per-day schedules, export reports."""
         path = filedialog.askopenfilename(
             title="Select history Excel",
-            filetypes=[("Excel files","*.xlsx;*.xls")]
+            filetypes=[("History files","*.xlsx;*.xls;*.csv")]
         )
         if not path:
             return
+        import pandas as pd
+        from Scheduler.problem import make_problem
+        from Scheduler.archive import ScheduleArchive
+        from Scheduler.history import read_history, day_counts
+        from Scheduler.kpi import job_table
 
         # try loading
         try:
-            df = pd.read_excel(path, parse_dates=["Date"], dtype={"Sequence label": str})
-            df["Date"] = df["Date"].dt.date
+            problems = day_counts(read_history(path))
         except Exception as e:
             messagebox.showerror("Load error", f"Could not read {path}:\n{e}")
             return
@@ -376,17 +407,18 @@ class InitialFrame(ttk.Frame):
                 horizon      = default_horizon
                 earliest     = {"program_start": 0}
 
-                all_dates = sorted(df["Date"].unique())
+                n_days = len(problems)
+                # opened here: SQLite connections belong to the thread that made them
+                archive = ScheduleArchive()
+                run_id = archive.start_run(os.path.basename(path), kind="history",
+                                           params={"source": path, "horizon": horizon})
 
-                for idx, day in enumerate(all_dates, start=1):
-                    loading.update_message(f"Scheduling {day} ({idx}/{len(all_dates)})…")
-                    sub = df[df["Date"] == day]
-                    counts = sub["Sequence label"].value_counts().to_dict()
-                    if not counts:
-                        continue
+                for idx, (day, counts) in enumerate(problems.items(), start=1):
+                    loading.post(message=f"Scheduling {day} ({idx}/{n_days})…",
+                                 day=idx, days=n_days)
 
                     # run the solver
-                    sched, tasks, _ = solve_throughput_with_earliest(
+                    args = dict(
                         selected_ops    = list(counts),
                         stations_dict   = sd,
                         operations_dict = ops,
@@ -394,28 +426,27 @@ class InitialFrame(ttk.Frame):
                         max_runs        = counts,
                         horizon         = horizon,
                         station_caps    = station_caps,
-                        earliest_starts = {'program_start': 0, **{op:0 for op in counts}}
+                        earliest_starts = {'program_start': 0, **{op:0 for op in counts}},
+                    )
+                    sched, tasks, _ = self.app.solve(
+                        priority = "batch",
+                        progress = lambda ev, idx=idx: loading.post(ev, day=idx, days=n_days),
+                        **args
                     )
+                    archive.record(run_id, sched, tasks, make_problem(**args), date=day)
 
-                    # build summary: one row per product
-                    for op, cnt in counts.items():
-                        for k in range(cnt):
-                            jid = f"{op}_{k}"
-                            starts = [s for (j,i),(s,e) in sched.items()
-                                      if j==jid and tasks[(j,i)]["type"]=="PROCESS"]
-                            ends   = [e for (j,i),(s,e) in sched.items()
-                                      if j==jid and tasks[(j,i)]["type"]=="PROCESS"]
-                            if not starts: continue
-                            ent = min(starts); ext = max(ends)
-                            hhmm = lambda m: f"{int(m//60):02d}:{int(m%60):02d}"
-                            summary_rows.append({
-                                "Date": day,
-                                "Product": op,
-                                "Run": k,
-                                "Entry (clock)": hhmm(ent),
-                                "Exit (clock)":  hhmm(ext),
-                                "Timespan (min)": ext - ent
-                            })
+                    # build summary: one row per scheduled run
+                    hhmm = lambda m: f"{int(m//60):02d}:{int(m%60):02d}"
+                    jobs = job_table(sched, tasks).dropna(subset=["Entry"])
+                    for job in jobs.itertuples(index=False):
+                        summary_rows.append({
+                            "Date": day,
+                            "Product": job.Op,
+                            "Run": job.Run,
+                            "Entry (clock)": hhmm(job.Entry),
+                            "Exit (clock)":  hhmm(job.Exit),
+                            "Timespan (min)": job.Exit - job.Entry
+                        })
 
                     # build details: one row per PROCESS task
                     for (jid, idx2), (s,e) in sched.items():
@@ -430,6 +461,8 @@ class InitialFrame(ttk.Frame):
                             "Duration": round(e - s,1)
                         })
 
+                archive.close()
+
                 # once done, write out Excel files
                 loading.update_message("Writing summary Excel…")
                 sum_df = pd.DataFrame(summary_rows)
@@ -499,6 +532,9 @@ class InitialFrame(ttk.Frame):
         # Store view flags
         self.app.show_simulation = self.var_sim.get()
         self.app.show_gantt = self.var_gantt.get()
+        self.app.objective = next(
+            key for key, label in OBJECTIVE_LABELS.items() if label == self.var_objective.get()
+        )
 
         # Proceed
         self.destroy()
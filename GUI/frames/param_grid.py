@@ -0,0 +1,207 @@
+# param_grid.py
+import tkinter as tk
+from tkinter import ttk, simpledialog
+
+
+class ParamGrid(ttk.Frame):
+    """
+    An editable table on one ttk.Treeview: rows are tree items rather than
+    widgets, so thousands of jobs build instantly and only the visible rows
+    are drawn.  One Entry is laid over the cell being edited.  The cells are
+    kept as typed in self.cells (the tree would hand "0030" back as 30).
+
+    - double-click / Enter / F2 edits a cell; Enter and Tab move on, Escape cancels
+    - an edit made with several rows selected fills them all
+    - Ctrl+D fills the selection down from its first row
+    - right-click a heading: fill, clear or fill-down that column
+    """
+    def __init__(self, master, columns, rows, editable=None, height=20):
+        """
+        columns: [(key, heading, width)]; rows: [(iid, [cell strings])];
+        editable: keys that can be edited (default all but the first).
+        """
+        super().__init__(master, style="TFrame")
+        self.keys = [k for k, _, _ in columns]
+        self.editable = set(editable if editable is not None else self.keys[1:])
+        self.editor = None
+        self.cells  = {}
+
+        self.tree = ttk.Treeview(self, columns=self.keys, show="headings",
+                                 selectmode="extended", height=height)
+        for key, heading, width in columns:
+            self.tree.heading(key, text=heading)
+            self.tree.column(key, width=width, anchor="w", stretch=key != self.keys[0])
+        self.tree.tag_configure("invalid", background="#F8D7DA")
+        ysb = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=ysb.set)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        ysb.grid(row=0, column=1, sticky="ns")
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+
+        self.load(rows)
+
+        self.tree.bind("<Double-1>", self._on_double)
+        self.tree.bind("<Return>", lambda e: self._edit_focus())
+        self.tree.bind("<F2>", lambda e: self._edit_focus())
+        self.tree.bind("<Control-d>", lambda e: self.fill_down())
+        self.tree.bind("<Button-3>", self._on_right)
+        # the editor would float over the wrong row once the view moves
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>", "<Configure>"):
+            self.tree.bind(seq, lambda e: self._commit(), add="+")
+
+    # ─── data ────────────────────────────────────────────────────────────────
+    def load(self, rows):
+        self._commit()
+        self.tree.delete(*self.tree.get_children())
+        self.cells = {}
+        for iid, values in rows:
+            self.cells[iid] = [str(v) for v in values]
+            self.tree.insert("", "end", iid=iid, values=self.cells[iid])
+
+    def ids(self):
+        return list(self.tree.get_children())
+
+    def column(self, key):
+        """All cells of one column, in row order."""
+        c = self.keys.index(key)
+        return [self.cells[i][c] for i in self.tree.get_children()]
+
+    def columns(self):
+        """{key: [cells]} for every column."""
+        rows = [self.cells[i] for i in self.tree.get_children()]
+        return {k: [r[c] for r in rows] for c, k in enumerate(self.keys)}
+
+    def set_cells(self, key, iids, value):
+        c = self.keys.index(key)
+        for iid in iids:
+            self.cells[iid][c] = value
+            self.tree.set(iid, key, value)
+
+    def mark_invalid(self, iids):
+        """Highlight these rows (and clear any earlier marks); scroll to the first."""
+        for iid in self.tree.tag_has("invalid"):
+            self.tree.item(iid, tags=())
+        for iid in iids:
+            if self.tree.exists(iid):
+                self.tree.item(iid, tags=("invalid",))
+        if iids and self.tree.exists(iids[0]):
+            self.tree.see(iids[0])
+
+    # ─── bulk operations ─────────────────────────────────────────────────────
+    def targets(self):
+        """Selected rows, or every row when nothing is selected."""
+        return list(self.tree.selection()) or self.ids()
+
+    def fill(self, key, value=None):
+        if value is None:
+            heading = self.tree.heading(key, "text")
+            value = simpledialog.askstring(
+                "Fill", f"{heading} for {len(self.targets())} row(s):", parent=self)
+            if value is None:
+                return
+        self.set_cells(key, self.targets(), value)
+
+    def fill_down(self, key=None):
+        """Copy the first selected row's cells (one column, or all editable) down the selection."""
+        sel = list(self.tree.selection())
+        if len(sel) < 2:
+            return "break"
+        first = self.cells[sel[0]]
+        for k in ([key] if key else [k for k in self.keys if k in self.editable]):
+            self.set_cells(k, sel[1:], first[self.keys.index(k)])
+        return "break"
+
+    # ─── in-place editing ────────────────────────────────────────────────────
+    def _on_double(self, event):
+        if self.tree.identify_region(event.x, event.y) != "cell":
+            return
+        iid = self.tree.identify_row(event.y)
+        key = self.keys[int(self.tree.identify_column(event.x)[1:]) - 1]
+        self.edit(iid, key)
+
+    def _edit_focus(self):
+        iid = self.tree.focus()
+        first = next((k for k in self.keys if k in self.editable), None)
+        if iid and first:
+            self.edit(iid, first)
+        return "break"
+
+    def edit(self, iid, key):
+        self._commit()
+        if key not in self.editable:
+            return
+        self.tree.see(iid)
+        self.update_idletasks()
+        box = self.tree.bbox(iid, key)
+        if not box:
+            return
+        x, y, w, h = box
+        ent = ttk.Entry(self.tree)
+        old = self.cells[iid][self.keys.index(key)]
+        ent.insert(0, old)
+        ent.select_range(0, "end")
+        ent.place(x=x, y=y, width=w, height=h)
+        ent.focus_set()
+        self.editor = (ent, iid, key, old)
+        ent.bind("<Return>", lambda e: self._step(1, 0))
+        ent.bind("<Tab>", lambda e: self._step(0, 1))
+        ent.bind("<Shift-Tab>", lambda e: self._step(0, -1))
+        ent.bind("<ISO_Left_Tab>", lambda e: self._step(0, -1))
+        ent.bind("<Escape>", lambda e: self._cancel())
+        ent.bind("<FocusOut>", lambda e: self._commit())
+
+    def _commit(self):
+        if self.editor is None:
+            return
+        ent, iid, key, old = self.editor
+        self.editor = None
+        value = ent.get()
+        ent.destroy()
+        if value == old or not self.tree.exists(iid):
+            return
+        sel = self.tree.selection()
+        # typing into one of several selected rows fills them all
+        self.set_cells(key, sel if len(sel) > 1 and iid in sel else [iid], value)
+
+    def _cancel(self):
+        if self.editor is not None:
+            self.editor[0].destroy()
+            self.editor = None
+        self.tree.focus_set()
+        return "break"
+
+    def _step(self, drow, dcol):
+        iid, key = self.editor[1:3]
+        self._commit()
+        ids = self.ids()
+        editable = [k for k in self.keys if k in self.editable]
+        r = ids.index(iid) + drow
+        c = editable.index(key) + dcol
+        if c >= len(editable):
+            r, c = r + 1, 0
+        elif c < 0:
+            r, c = r - 1, len(editable) - 1
+        if 0 <= r < len(ids):
+            if drow:
+                self.tree.selection_set(ids[r])
+            self.tree.focus(ids[r])
+            self.edit(ids[r], editable[c])
+        else:
+            self.tree.focus_set()
+        return "break"
+
+    # ─── column menu ─────────────────────────────────────────────────────────
+    def _on_right(self, event):
+        if self.tree.identify_region(event.x, event.y) != "heading":
+            return
+        key = self.keys[int(self.tree.identify_column(event.x)[1:]) - 1]
+        if key not in self.editable:
+            return
+        scope = "selected rows" if self.tree.selection() else "all rows"
+        menu = tk.Menu(self, tearoff=0)
+        menu.add_command(label=f"Fill {scope}…", command=lambda: self.fill(key))
+        menu.add_command(label=f"Clear {scope}", command=lambda: self.fill(key, ""))
+        menu.add_command(label="Fill down from first selected",
+                         command=lambda: self.fill_down(key))
+        menu.tk_popup(event.x_root, event.y_root)
@@ -1,13 +1,28 @@
 # run_params_frame.py
 import os
-import tkinter as tk
-from tkinter import ttk, messagebox
+import queue
+import threading
+from tkinter import ttk, messagebox, filedialog
+import pandas as pd
 from GUI.frames.Loading_frame import LoadingWindow
+from GUI.frames.param_grid import ParamGrid
 from GUI.colours import GKN_BG, GKN_SECONDARY
-from Scheduler.model import solve_throughput_with_earliest
 from Data.universal_variable import DEFAULT_HORIZON as default_horizon
-from GUI.frames.schedule_frame.frame import ScheduleFrame
-from threading import Thread
+from Scheduler.precedence import compile_precedence, PrecedenceError
+from Scheduler.run_params import (
+    COLUMNS, RunParamsError, default_table, parse_run_params,
+    read_run_params, write_run_params, merge_run_params,
+)
+from Scheduler.precheck import precheck, find_conflict
+from Scheduler.operators import min_operators
+
+# the solver hands over an improved schedule at most every PREVIEW_INTERVAL s;
+# the UI looks for one every PREVIEW_INTERVAL_MS ms
+PREVIEW_INTERVAL = 2.0
+PREVIEW_INTERVAL_MS = 250
+
+GRID_HINT = ("Double-click or F2 to edit · select several rows and type to fill them all · "
+             "Ctrl+D fills down · right-click a heading for column fills")
 
 
 class RunParamsFrame(ttk.Frame):
@@ -37,111 +52,199 @@ class RunParamsFrame(ttk.Frame):
             style="TButton"
         ).pack(side="right", padx=(0,10))
 
-        # ─── SCROLLABLE PARAMETER GRID ──────────────────────────────────────────
-        container = ttk.Frame(self, style="TFrame")
-        container.pack(fill="both", expand=True, padx=10, pady=(0,10))
+        # smallest operator count that runs every job within these parameters
+        ttk.Button(
+            header,
+            text="Min. operators",
+            command=self.on_min_operators,
+            style="TButton"
+        ).pack(side="right", padx=(0,5))
 
-        canvas    = tk.Canvas(container, bg=GKN_BG, highlightthickness=0)
-        scrollbar = ttk.Scrollbar(container, orient="vertical", command=canvas.yview)
-        scrollable = ttk.Frame(canvas, style="TFrame")
+        ttk.Button(
+            header,
+            text="Export CSV…",
+            command=self.on_export_csv,
+            style="TButton"
+        ).pack(side="right", padx=(0,5))
 
-        # place the scrollable frame inside the canvas
-        canvas.create_window((0, 0), window=scrollable, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
+        ttk.Button(
+            header,
+            text="Import CSV…",
+            command=self.on_import_csv,
+            style="TButton"
+        ).pack(side="right", padx=(0,5))
+
+        # ─── PARAMETER GRID ─────────────────────────────────────────────────────
+        # one Treeview row per job; the last table this session starts it off
+        table = default_table(app.selected_ops, app.max_runs)
+        previous = getattr(app, 'run_params', None)
+        if previous is not None:
+            table, _ = merge_run_params(table, previous)
+        self.grid_view = ParamGrid(
+            self,
+            [("job_id",     "Job ID",                   120),
+             ("weight",     "Importance",                80),
+             ("earliest",   "Earliest (HHMM)",          100),
+             ("latest",     "Latest Finish (HHMM)",     130),
+             ("precedence", "Precedence (comma-sep.)",  200)],
+            [(row[0], row) for row in table[list(COLUMNS)].itertuples(index=False, name=None)],
+        )
+        self.grid_view.pack(fill="both", expand=True, padx=10)
+        ttk.Label(
+            self, text=GRID_HINT, background=GKN_BG, foreground=GKN_SECONDARY
+        ).pack(fill="x", padx=10, pady=(2,10))
+
+        # finally, show this frame
+        self.pack(fill="both", expand=True)
 
-        # layout
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+    def _table(self):
+        return pd.DataFrame(self.grid_view.columns())
 
-        # update scrollregion when contents change
-        scrollable.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
+    def on_import_csv(self):
+        path = filedialog.askopenfilename(
+            title="Import run parameters", filetypes=[("CSV", "*.csv"), ("All files", "*.*")]
         )
-        # allow mouse‐wheel scrolling
-        canvas.bind_all(
-            "<MouseWheel>",
-            lambda e: canvas.yview_scroll(int(-1*(e.delta/120)), "units")
+        if not path:
+            return
+        try:
+            table, unknown = merge_run_params(self._table(), read_run_params(path))
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Import", f"Could not read {path}:\n{e}")
+            return
+        self.grid_view.load([(row[0], row) for row in
+                             table[list(COLUMNS)].itertuples(index=False, name=None)])
+        if unknown:
+            messagebox.showwarning(
+                "Import", f"Skipped {len(unknown)} job(s) not in this run: "
+                          + ", ".join(unknown[:10]) + ("…" if len(unknown) > 10 else "")
+            )
+
+    def on_export_csv(self):
+        path = filedialog.asksaveasfilename(
+            title="Export run parameters", initialfile="run_params.csv",
+            defaultextension=".csv", filetypes=[("CSV", "*.csv")]
         )
+        if not path:
+            return
+        try:
+            write_run_params(self._table(), path)
+        except OSError as e:
+            messagebox.showerror("Export", f"Could not write {path}:\n{e}")
 
-        # ─── BUILD YOUR WEIGHT / EARLIEST INPUT ROWS ─────────────────────────────
-        # Now includes Latest Finish Time column
-        # header row
-        hdr = ttk.Frame(scrollable, style="TFrame")
-        hdr.pack(fill="x", pady=(0,2))
-        ttk.Label(hdr, text="Job ID",                width=20, anchor="w")\
-            .grid(row=0, column=0, padx=5)
-        ttk.Label(hdr, text="Importance",                width=10, anchor="w")\
-            .grid(row=0, column=1, padx=5)
-        ttk.Label(hdr, text="Earliest (HHMM)",       width=12, anchor="w")\
-            .grid(row=0, column=2, padx=5)
-        ttk.Label(hdr, text="Latest Finish (HHMM)",  width=15, anchor="w")\
-            .grid(row=0, column=3, padx=5)
-        ttk.Label(hdr, text="Precedence (comma-sep.)", width=20, anchor="w")\
-            .grid(row=0, column=4, padx=5)
-
-
-        self.params = {}
-        for op in app.selected_ops:
-            runs = app.max_runs.get(op, 1)
-            for k in range(runs):
-                frm = ttk.Frame(scrollable, style="TFrame")
-                frm.pack(fill="x", pady=2)
-
-                # Job ID label
-                ttk.Label(frm, text=f"{op}_{k}", width=20, anchor="w").grid(row=0, column=0, padx=(0,5))
-                # Weight entry
-                ws = ttk.Entry(frm, width=10); ws.insert(0, '1')
-                ws.grid(row=0, column=1, padx=5)
-                # Earliest start entry
-                es = ttk.Entry(frm, width=10); es.insert(0, '0700')
-                es.grid(row=0, column=2, padx=5)
-                # Latest finish entry
-                lf = ttk.Entry(frm, width=15); lf.insert(0, '')
-                lf.grid(row=0, column=3, padx=5)
-                # Precedence entry
-                pr = ttk.Entry(frm, width=20, foreground='gray')
-                pr.insert(0, 'e.g. K01_0,K09_0')
-                def _clear(e, entry=pr):
-                    entry.delete(0,'end'); entry.config(foreground='black')
-                pr.bind("<FocusIn>", _clear)
-                pr.grid(row=0, column=4, padx=5)   
-                # store tuple of four
-                self.params[f"{op}_{k}"] = (ws, es, lf, pr)
+    def _gather(self):
+        """(weights, earliest, latest, precedence) from the grid, or None if invalid."""
+        table = self._table()
+        try:
+            weights, earliest, latest, precedence = parse_run_params(
+                table, self.app.program_start_minutes)
+        except RunParamsError as e:
+            self.grid_view.mark_invalid([jid for jid, *_ in e.cells])
+            messagebox.showerror("Invalid run parameters", str(e))
+            return None
 
-        # finally, show this frame
-        self.pack(fill="both", expand=True)
+        # reject unknown jobs and cycles here rather than after a full solve
+        run_counts = {op: self.app.max_runs.get(op, 1) for op in self.app.selected_ops}
+        try:
+            compile_precedence(precedence, run_counts)
+        except PrecedenceError as e:
+            bad = set(e.unknown)
+            self.grid_view.mark_invalid(
+                [jid for jid, ps in precedence.items() if jid in e.cycle or bad & set(ps)])
+            messagebox.showerror("Invalid precedence", str(e))
+            return None
+        self.grid_view.mark_invalid([])
+        # kept so the grid comes back as it was after a failed or cancelled run
+        self.app.run_params = table
+        return weights, earliest, latest, precedence
 
-    def on_run(self):
-        # gather user inputs
-        weights, earliest, latest, precedence = {}, {}, {}, {}
-        earliest['program_start'] = self.app.program_start_minutes
+    def _problem(self, earliest, latest, precedence):
+        return dict(
+            selected_ops    = self.app.selected_ops,
+            stations_dict   = self.app.sd,
+            operations_dict = self.app.ops,
+            max_runs        = self.app.max_runs,
+            horizon         = self.app.horizon,
+            station_caps    = self.app.station_caps,
+            earliest_starts = earliest,
+            latest_finishes = latest,
+            precedence      = precedence,
+        )
 
-        for jid, (we, ee, lf, pr) in self.params.items():
-            op = jid.rsplit('_', 1)[0]
+    def on_min_operators(self):
+        gathered = self._gather()
+        if gathered is None:
+            return
+        problem = self._problem(*gathered[1:])
+        stopped, solvers = [], []
 
+        def on_solver(solver):
+            solvers.append(solver)
+            if stopped:
+                solver.StopSearch()
+
+        def on_cancel():
+            stopped.append(True)
+            for solver in solvers:
+                solver.StopSearch()
+
+        loading = LoadingWindow(self.app, "Finding the minimum operator count…",
+                                on_cancel=on_cancel)
+
+        def work():
             try:
-                weights[op] = float(we.get())
-            except ValueError:
-                weights[op] = 1.0
-            # earliest start
-            try:
-                hh, mm = int(ee.get()[:2]), int(ee.get()[2:])
-                earliest[op] = hh * 60 + mm
-            except:
-                earliest[op] = self.app.program_start_minutes
-            # latest finish
-            try:
-                h2, m2 = int(lf.get()[:2]), int(lf.get()[2:])
-                latest[op] = h2 * 60 + m2
-            except:
-                latest[op] = None
-             # precedence: parse comma-separated job IDs
-            raw = pr.get().strip()
-            if raw:                 # split on commas, strip whitespace
-               precedence[jid] = [s.strip() for s in raw.split(',') if s.strip()]
-            else:
-                precedence[jid] = []
+                ans = min_operators(
+                    **problem, on_solver=on_solver,
+                    progress=lambda ev: loading.update_message(
+                        f"{ev['operators']} operator(s): {ev['status'].lower()}"),
+                )
+            except Exception as e:
+                ans = e
+            self.app.after(0, lambda: show(ans))
+
+        def show(ans):
+            loading.destroy()
+            if stopped:
+                return
+            if isinstance(ans, Exception):
+                messagebox.showerror("Error", str(ans))
+                return
+            tried = ", ".join(f"{k} ({st.lower()})" for k, st, _ in ans.probes)
+            if ans.operators is None:
+                messagebox.showinfo(
+                    "Minimum operators",
+                    ("No operator count can" if ans.certified else
+                     "No operator count was shown to")
+                    + f" run every job with these parameters.\n\nTried: {tried}"
+                )
+                return
+            note = ("" if ans.certified else
+                    f"\n(not proven: {ans.operators - 1} may also be enough)")
+            if messagebox.askyesno(
+                "Minimum operators",
+                f"{ans.operators} operator(s) can run every job.{note}\n\n"
+                f"Tried: {tried}\n\nUse {ans.operators} operator(s) for this run?"
+            ):
+                self.app.station_caps["S"] = ans.operators
+
+        threading.Thread(target=work, name="min-operators", daemon=True).start()
+
+    def on_run(self):
+        # matplotlib comes with the schedule views, once there is a schedule to show
+        from GUI.frames.schedule_frame.frame import ScheduleFrame
+        gathered = self._gather()
+        if gathered is None:
+            return
+        weights, earliest, latest, precedence = gathered
+
+        # windows and loads that can never work are caught in milliseconds
+        problem = self._problem(earliest, latest, precedence)
+        issues = precheck(**problem)
+        if issues:
+            messagebox.showerror(
+                "Cannot be scheduled",
+                "These parameters cannot be met:\n\n" + "\n".join(f"• {i}" for i in issues[:10])
+            )
+            return
 
         # store back on the app
         self.app.weights          = weights
@@ -152,86 +255,151 @@ class RunParamsFrame(ttk.Frame):
         self.app.content.place_forget()
         self.destroy()
 
-        # Create loading window
-        loading = LoadingWindow(self.app, "Preparing to solve…")
-        
-        def solve_schedule():
-            try:
-                # If neither simulation nor Gantt, export & quit
-                if not (self.app.show_simulation or self.app.show_gantt):
-                    loading.update_message("Solving schedule and exporting...")
-                    sched, tasks, ms = solve_throughput_with_earliest(
+        # Start the solve without blocking; it can be cancelled from the loader
+        show_views = self.app.show_simulation or self.app.show_gantt
+        previews = queue.Queue()
+        discard = []
+
+        def on_cancel():
+            discard.append(True)
+            handle.cancel()
+
+        loading = LoadingWindow(
+            self.app, "Generating schedule...",
+            on_cancel=on_cancel, on_use_best=lambda: handle.cancel()
+        )
+        handle = self.app.submit_solve(
+            self.app.selected_ops,
+            self.app.sd,
+            self.app.ops,
+            weights,
+            self.app.max_runs,
+            self.app.horizon,
+            self.app.station_caps,
+            earliest,
+            latest,
+            precedence=self.app.precedence,
+            objective=self.app.objective,
+            progress=loading.post,
+            # anytime preview: improving schedules arrive here from the solver thread
+            on_schedule=(lambda *snap: previews.put(snap)) if show_views else None,
+            schedule_interval=PREVIEW_INTERVAL
+        )
+        preview = {"frame": None}
+
+        def poll_previews():
+            if handle.done() or discard:
+                return
+            latest = None
+            while not previews.empty():
+                latest = previews.get_nowait()
+            if latest is not None and latest[0]:
+                sched, tasks, horizon = latest
+                if preview["frame"] is None:
+                    # first feasible schedule: open the schedule view straight away
+                    loading.destroy()
+                    preview["frame"] = ScheduleFrame(
+                        self.app,
+                        sched, tasks, self.app.sd, horizon,
                         self.app.selected_ops,
-                        self.app.sd,
                         self.app.ops,
                         weights,
                         self.app.max_runs,
-                        self.app.horizon,
-                        self.app.station_caps,
-                        earliest,
-                        latest,
-                        precedence = self.app.precedence
+                        preview=True,
+                        on_accept=handle.cancel
                     )
-                    helper = ScheduleFrame.__new__(ScheduleFrame)
-                    helper.sched = sched
-                    helper.tasks = tasks
-                    helper.selected_ops = self.app.selected_ops
-                    helper.ops = self.app.ops
-                    helper.weights = weights
-                    helper.max_runs = self.app.max_runs
-                    helper.earliest = earliest
-                    helper.base_minutes = self.app.program_start_minutes
-                    helper.export_to_excel()
-                    loading.destroy()
-                    self.app.destroy()
-                    return
-
-                # Otherwise solve for GUI
-                loading.update_message("Generating schedule...")
-                sched, tasks, ms = solve_throughput_with_earliest(
-                    self.app.selected_ops,
-                    self.app.sd,
-                    self.app.ops,
-                    weights,
-                    self.app.max_runs,
-                    self.app.horizon,
-                    self.app.station_caps,
-                    earliest,
-                    latest,
-                    precedence=self.app.precedence
-                )
+                else:
+                    jobs = len({j for j, _ in sched})
+                    preview["frame"].update_schedule(
+                        sched, tasks, f"Solver still improving… {jobs} jobs scheduled so far"
+                    )
+            self.app.after(PREVIEW_INTERVAL_MS, poll_previews)
 
-                # check feasibility
-                if not sched:
-                    loading.destroy()
+        if show_views:
+            self.app.after(PREVIEW_INTERVAL_MS, poll_previews)
+
+        def back_to_params():
+            self.app.show_content()
+            RunParamsFrame(self.master, self.app)
+
+        def on_solved():
+            loading.destroy()
+            if discard:
+                back_to_params()
+                return
+            try:
+                sched, tasks, ms = handle.result()
+            except Exception as e:
+                messagebox.showerror("Error", str(e))
+                if preview["frame"] is None:
+                    back_to_params()
+                return
+
+            # the preview is already on screen: just show the final schedule
+            if preview["frame"] is not None:
+                preview["frame"].end_preview(sched, tasks)
+                return
+
+            # If neither simulation nor Gantt, export & quit
+            if not show_views:
+                helper = ScheduleFrame.__new__(ScheduleFrame)
+                helper.sched = sched
+                helper.tasks = tasks
+                helper.selected_ops = self.app.selected_ops
+                helper.ops = self.app.ops
+                helper.weights = weights
+                helper.max_runs = self.app.max_runs
+                helper.earliest = earliest
+                helper.base_minutes = self.app.program_start_minutes
+                helper.export_to_excel(background=False)
+                self.app.destroy()
+                return
+
+            # check feasibility
+            if not sched:
+                if handle.cancelled() or not any(v is not None for v in latest.values()):
                     messagebox.showerror(
                         "Scheduling Error",
+                        "No schedule was found before the solver stopped."
+                        if handle.cancelled() else
                         "Unable to meet latest-finish constraints. Please adjust your parameters."
                     )
                     # re-open run params
-                    RunParamsFrame(self.master, self.app)
-                    return
-
-                # Update UI in main thread
-                def create_schedule_frame():
-                    self.app.content.place_forget()
-                    self.destroy()
-                    ScheduleFrame(
-                        self.app,
-                        sched, tasks, self.app.sd, ms,
-                        self.app.selected_ops,
-                        self.app.ops,
-                        weights,
-                        self.app.max_runs
-                    )
-                    loading.destroy()
+                    back_to_params()
+                else:
+                    explain_failure()
+                return
 
-                self.after(0, create_schedule_frame)
+            ScheduleFrame(
+                self.app,
+                sched, tasks, self.app.sd, ms,
+                self.app.selected_ops,
+                self.app.ops,
+                weights,
+                self.app.max_runs
+            )
 
-            except Exception as e:
-                loading.destroy()
-                messagebox.showerror("Error", str(e))
-                RunParamsFrame(self.master, self.app)
+        def explain_failure():
+            # name the latest finishes / precedence edges that clash
+            finder = LoadingWindow(self.app, "Looking for conflicting constraints…")
+
+            def work():
+                try:
+                    conflict = find_conflict(**problem)
+                except Exception:
+                    conflict = None
+                self.app.after(0, lambda: show(conflict))
+
+            def show(conflict):
+                finder.destroy()
+                msg = "Unable to meet latest-finish constraints."
+                if conflict:
+                    msg += (" These constraints cannot all hold:\n\n"
+                            + "\n".join(f"• {i}" for i in conflict))
+                messagebox.showerror("Scheduling Error", msg + "\n\nPlease adjust your parameters.")
+                back_to_params()
+
+            threading.Thread(target=work, name="find-conflict", daemon=True).start()
 
-        # Run solving in separate thread
-        Thread(target=solve_schedule, daemon=True).start()
\ No newline at end of file
+        # hand the result back to the UI thread
+        handle.add_done_callback(lambda h: self.app.after(0, on_solved))
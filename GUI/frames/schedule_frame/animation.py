@@ -1,42 +1,93 @@
 # animation.py
+import time
 import tkinter as tk
 
 class Animator:
+    """
+    Wall-clock driven playback: the schedule advances data.rate sim-minutes per
+    real second whatever the render cost, so slow frames are skipped rather
+    than slowing playback down.  Seeks are coalesced to the latest position.
+    """
     def __init__(self, parent, data):
         self.parent  = parent
         self.data    = data
         self.playing = False
+        self.fps     = 0.0
+        self._last_frame = None
+        self._seek_to    = None
+        self._seek_job   = None
 
     def start(self):
         self.play()
 
     def play(self):
         if not self.playing:
+            if self.data.current_time >= self.data.makespan:
+                self.data.current_time = 0.0
             self.playing = True
+            self._anchor()
+            self._last_frame = None
             self.tick()
 
     def pause(self):
         self.playing = False
 
+    def set_rate(self, rate):
+        """Change speed (sim-minutes per second) without jumping"""
+        self.data.rate = float(rate)
+        self._anchor()
+
+    def _anchor(self):
+        # playback position = t0 + (now - wall0) * rate
+        self._wall0 = time.perf_counter()
+        self._t0    = self.data.current_time
+
     def seek(self, t):
-        # Jump to specified time
+        # Jump to specified time; drags only render the latest position
+        if abs(t - self.data.current_time) <= self.data.slider_resolution / 2:
+            # echo of the slider being moved by tick()
+            return
         self.data.current_time = t
-        self.update_components(t)
+        self._anchor()
+        self._seek_to = t
+        if self._seek_job is None:
+            self._seek_job = self.parent.after_idle(self._apply_seek)
+
+    def _apply_seek(self):
+        self._seek_job = None
+        if self._seek_to is not None:
+            t, self._seek_to = self._seek_to, None
+            self.update_components(t)
 
     def tick(self):
         if not self.playing:
             return
-        # Increment time, respecting the makespan
-        t = min(self.data.current_time + self.data.dt, self.data.makespan)
+        frame_start = time.perf_counter()
+        # Position follows the wall clock, respecting the makespan
+        t = min(self._t0 + (frame_start - self._wall0) * self.data.rate, self.data.makespan)
         self.data.current_time = t
         # Update slider if present
         if self.data.slider:
             self.data.slider.set(t)
         # Refresh both simulation and Gantt views
         self.update_components(t)
-        # Schedule next tick
+        self._measure(frame_start)
+        # Schedule next tick, allowing for the time this frame took
         if t < self.data.makespan:
-            self.parent.after(int(self.data.delay), self.tick)
+            spent_ms = (time.perf_counter() - frame_start) * 1000
+            self.parent.after(max(1, int(self.data.delay - spent_ms)), self.tick)
+        else:
+            self.playing = False
+
+    def _measure(self, frame_start):
+        if self._last_frame is not None:
+            interval = frame_start - self._last_frame
+            if interval > 0:
+                # smoothed frames per second
+                inst = 1.0 / interval
+                self.fps = inst if self.fps == 0 else 0.8 * self.fps + 0.2 * inst
+                self.data.update_fps_label(self.fps)
+        self._last_frame = frame_start
 
     def update_components(self, t):
         # Delegate to canvases
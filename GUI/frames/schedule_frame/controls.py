@@ -26,14 +26,33 @@ class ControlPanel(ttk.Frame):
             ("Pause ■", self.parent.anim.pause),
             ("Export",  self.parent.export_to_excel),
             ("Timings", self.parent.show_timings),
+            ("Robustness", self.parent.show_robustness),
         ]
         for txt, cmd in btns:
             tk.Button(ctl, text=txt, command=cmd).pack(side="left", padx=5)
 
+        # Playback speed in sim-minutes per second
+        ttk.Label(ctl, text="Speed (min/s):").pack(side="left", padx=(10,2))
+        speed = ttk.Combobox(ctl, values=["1", "2", "5", "10", "30", "60"], width=4)
+        speed.set(f"{self.data.rate:g}")
+        speed.pack(side="left")
+        def on_speed(e=None):
+            try:
+                self.parent.anim.set_rate(float(speed.get()))
+            except ValueError:
+                speed.set(f"{self.data.rate:g}")
+        speed.bind("<<ComboboxSelected>>", on_speed)
+        speed.bind("<Return>", on_speed)
+
+        # Measured frame rate
+        fps = ttk.Label(ctl, text="-- fps", width=8)
+        fps.pack(side="left", padx=(10,0))
+        self.data.update_fps_label = lambda f: fps.config(text=f"{f:4.1f} fps")
+
         # Slider
         sld = tk.Scale(
             ctl, from_=0, to=self.data.makespan,
-            orient='horizontal', resolution=0.5,
+            orient='horizontal', resolution=self.data.slider_resolution,
             command=lambda v: self.parent.anim.seek(float(v))
         )
         sld.pack(side="left", fill="x", expand=True, padx=5)
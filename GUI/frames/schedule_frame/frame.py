@@ -1,21 +1,24 @@
 # frame.py
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 from .controls import ControlPanel
 from .sim_canvas import SimulationCanvas
 from .gantt_canvas import GanttCanvas
 from .animation import Animator
-from .utils import preprocess_schedule, format_time_for_axis
-import pandas as pd
+from .utils import preprocess_schedule, index_schedule, format_time_for_axis
 import os
+import threading
+from Scheduler.export import export_schedule, export_async, unique_path
 
 class ScheduleFrame(tk.Frame):
     def __init__(self, master, sched, tasks, sd, makespan,
-                 selected_ops, ops, weights, max_runs):
+                 selected_ops, ops, weights, max_runs,
+                 preview=False, on_accept=None):
         super().__init__(master)
         # Store for export
         self.sched = sched
         self.tasks = tasks
+        self.sd = sd
         self.selected_ops = selected_ops
         self.ops = ops
         self.weights = weights
@@ -32,6 +35,19 @@ class ScheduleFrame(tk.Frame):
         data.max_runs      = max_runs
         data.base_minutes  = self.base_minutes
         data.formatter     = format_time_for_axis(self.base_minutes)
+        self.data = data
+
+        # While the solver is still running, show a banner to accept early
+        self.banner = None
+        if preview:
+            self.banner = ttk.Frame(self)
+            self.banner.pack(side="top", fill="x", padx=5, pady=(5,0))
+            self.banner_label = ttk.Label(self.banner, text="Solver still improving this schedule…")
+            self.banner_label.pack(side="left")
+            if on_accept:
+                ttk.Button(
+                    self.banner, text="Accept current schedule", command=on_accept
+                ).pack(side="right")
 
         # Controls panel first
         self.anim     = Animator(self, data)
@@ -45,45 +61,105 @@ class ScheduleFrame(tk.Frame):
         self.pack(fill="both", expand=True)
         self.anim.start()
 
+    def update_schedule(self, sched, tasks, note=None):
+        """Swap in an improved schedule without rebuilding the frame"""
+        self.sched = sched
+        self.tasks = tasks
+        index_schedule(self.data, sched, tasks)
+        self.sim.refresh()
+        self.gantt.refresh()
+        self.gantt.update(self.data.current_time)
+        if note and self.banner is not None:
+            self.banner_label.configure(text=note)
+
+    def end_preview(self, sched, tasks):
+        """Show the final schedule and drop the preview banner"""
+        self.update_schedule(sched, tasks)
+        if self.banner is not None:
+            self.banner.destroy()
+            self.banner = None
+
     def _minutes_to_clock(self, minutes):
         hh = int(minutes // 60) % 24
         mm = int(minutes % 60)
         return f"{hh:02d}:{mm:02d}"
 
-    def export_to_excel(self):
-        base_file = "schedule_output"
-        counter = 0
-        while True:
-            file_path = f"{base_file}{'' if counter==0 else f'_{counter}'}.xlsx"
-            if not os.path.exists(file_path):
-                break
-            counter += 1
-
-        # Build schedule rows
-        rows = []
-        for jid in sorted({j for j,_ in self.sched}):
-            op = jid.rsplit('_',1)[0]
-            ivs = [(s,e) for (j,i),(s,e) in self.sched.items() if j==jid and self.tasks[(j,i)]['type']=='PROCESS']
-            entry = min((s for s,e in ivs), default=0)
-            exit_ = max((e for s,e in ivs), default=0)
-            rows.append({
-                'Job ID': jid,
-                'Weight': self.weights.get(op, 1.0),
-                'Entry (min)': entry,
-                'Entry (clock)': self._minutes_to_clock(self.base_minutes+entry),
-                'Exit (min)': exit_,
-                'Exit (clock)': self._minutes_to_clock(self.base_minutes+exit_)
-            })
-        df = pd.DataFrame(rows)
-
-        # Write single sheet
-        with pd.ExcelWriter(file_path, engine="openpyxl") as writer:
-            df.to_excel(writer, sheet_name='Schedule', index=False)
-        messagebox.showinfo('Export', f'Schedule exported to {file_path}')
+    def export_to_excel(self, background=True):
+        """
+        Export job summaries and task detail.  From the GUI this asks for a
+        file (xlsx/csv/parquet/arrow) and writes it off the UI thread; headless
+        callers pass background=False to write schedule_output*.xlsx in place.
+        """
+        kwargs = dict(weights=self.weights, base_minutes=self.base_minutes)
+        if not background:
+            file_path = unique_path("schedule_output", ".xlsx")
+            export_schedule(self.sched, self.tasks, file_path, **kwargs)
+            messagebox.showinfo('Export', f'Schedule exported to {file_path}')
+            return
+
+        file_path = filedialog.asksaveasfilename(
+            title="Export schedule",
+            initialfile=os.path.basename(unique_path("schedule_output", ".xlsx")),
+            defaultextension=".xlsx",
+            filetypes=[("Excel workbook", "*.xlsx"), ("CSV", "*.csv"),
+                       ("Parquet", "*.parquet"), ("Arrow IPC", "*.arrow")]
+        )
+        if not file_path:
+            return
+
+        def on_done(paths, error):
+            # called on the export thread: report back on the UI thread
+            def report():
+                if error is not None:
+                    messagebox.showerror('Export', f'Could not export schedule:\n{error}')
+                else:
+                    messagebox.showinfo('Export', 'Schedule exported to\n' + '\n'.join(paths))
+            self.after(0, report)
+
+        export_async(self.sched, self.tasks, file_path, on_done, **kwargs)
 
     def show_timings(self):
         messagebox.showinfo('Timings', 'Not yet implemented')
 
+    def show_robustness(self, samples=2000):
+        """
+        Replay this schedule with process times drawn between each step's
+        min and max (Scheduler.robustness) and show the spread.
+        """
+        from Scheduler.robustness import simulate
+        app = self.winfo_toplevel()
+        sched, tasks = self.sched, self.tasks
+        horizon = getattr(app, 'horizon', None)
+
+        def work():
+            try:
+                rep = simulate(sched, tasks, self.sd, self.ops, app.station_caps,
+                               horizon, samples=samples)
+            except Exception as e:
+                # e is cleared when the except block ends; keep its message
+                msg = str(e)
+                self.after(0, lambda msg=msg: messagebox.showerror(
+                    'Robustness', f'Simulation failed:\n{msg}'))
+                return
+            self.after(0, lambda: self._robustness_window(rep, samples))
+
+        threading.Thread(target=work, daemon=True).start()
+
+    def _robustness_window(self, rep, samples):
+        win = tk.Toplevel(self)
+        win.title(f"Robustness ({samples} samples, durations min→max)")
+        text = tk.Text(win, width=90, height=30, font=("Courier", 9))
+        text.pack(fill="both", expand=True)
+        fmt = lambda df: df.to_string(float_format=lambda v: f"{v:.1f}")
+        late = rep.job_finish()
+        text.insert("end", f"Planned makespan: {rep.planned_makespan:.1f} min\n\n")
+        text.insert("end", fmt(rep.summary()) + "\n\n")
+        text.insert("end", "Start delay per resource (min)\n" + fmt(rep.station_delays().head(10)) + "\n\n")
+        text.insert("end", "Jobs most at risk\n")
+        key = "p_late" if "p_late" in late else "p95"
+        text.insert("end", fmt(late.sort_values(key, ascending=False).head(10)))
+        text.configure(state="disabled")
+
     def toggle_gantt_fullscreen(self):
         if self.sim.winfo_viewable():
             self.sim.pack_forget()
@@ -1,88 +1,312 @@
 # GUI/frames/schedule_frame/gantt_canvas.py
-import tkinter as tk
+import bisect
 from tkinter import ttk
+import numpy as np
 from matplotlib.figure import Figure
+from matplotlib.collections import PolyCollection
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
+MOVE_COLOR = "#777777"
+ROW_PX     = 22     # default pixel height of one job row
+MIN_BAR_PX = 2.0    # MOVE bars narrower than this are merged when zoomed out
+MIN_SPAN   = 5.0    # narrowest time window (minutes)
+
+
+class GanttIndex:
+    """
+    Every bar of the schedule as flat arrays sorted by (row, start), with
+    rows in chronological order of each job's first PROCESS start.  A
+    viewport query only slices the rows in view and masks the time window.
+    """
+
+    def __init__(self, data):
+        first_start = {}
+        for jid in data.sorted_jobs:
+            first_start[jid] = next(
+                (s for s, e, info in data.intervals[jid] if info['type'] == 'PROCESS'), 0
+            )
+        self.jobs = sorted(data.sorted_jobs, key=first_start.__getitem__)
+        self.palette = [MOVE_COLOR]
+        colour_idx = {MOVE_COLOR: 0}
+
+        start, end, row, colour, is_move = [], [], [], [], []
+        # per-row bisect index for hover: sorted starts and the matching intervals
+        self.row_starts, self.row_ivs = [], []
+        for r, jid in enumerate(self.jobs):
+            ivs = data.intervals[jid]
+            self.row_starts.append([s for s, e, info in ivs])
+            self.row_ivs.append(ivs)
+            for s, e, info in ivs:
+                move = info["type"] == "MOVE"
+                c = MOVE_COLOR if move else data.colors.get(info.get("station","S"), "#CCCCCC")
+                if c not in colour_idx:
+                    colour_idx[c] = len(self.palette)
+                    self.palette.append(c)
+                start.append(s); end.append(e); row.append(r)
+                colour.append(colour_idx[c]); is_move.append(move)
+
+        self.start   = np.asarray(start, dtype=float)
+        self.end     = np.asarray(end, dtype=float)
+        self.row     = np.asarray(row, dtype=int)
+        self.colour  = np.asarray(colour, dtype=int)
+        self.is_move = np.asarray(is_move, dtype=bool)
+        # task range of row r is offsets[r]:offsets[r+1]
+        self.offsets = np.searchsorted(self.row, np.arange(len(self.jobs) + 1))
+
+    def query(self, r0, r1, t0, t1, min_dur=0.0):
+        """
+        Bars of rows [r0, r1) overlapping [t0, t1] as (start, end, row, colour).
+        MOVE bars shorter than min_dur are merged into the bar before them.
+        """
+        lo, hi = self.offsets[r0], self.offsets[min(r1, len(self.jobs))]
+        s, e = self.start[lo:hi], self.end[lo:hi]
+        keep = (e > t0) & (s < t1)
+        s, e = s[keep], e[keep].copy()
+        row, col = self.row[lo:hi][keep], self.colour[lo:hi][keep]
+        if min_dur > 0 and len(s) > 1:
+            short = self.is_move[lo:hi][keep] & ((e - s) < min_dur)
+            short[1:] &= row[1:] == row[:-1]
+            short[0] = False
+            if short.any():
+                # each dropped bar extends the nearest kept bar before it
+                kept_idx = np.where(~short, np.arange(len(s)), 0)
+                owner = np.maximum.accumulate(kept_idx)
+                np.maximum.at(e, owner, e)
+                s, e, row, col = s[~short], e[~short], row[~short], col[~short]
+        return s, e, row, col
+
+
 class GanttCanvas(ttk.Frame):
+    """
+    Virtualised Gantt chart: only the job rows and the time window in view
+    are turned into artists.
+
+    - mouse wheel / scrollbar: scroll jobs
+    - Shift+wheel / bottom scrollbar: pan time
+    - Ctrl+wheel: zoom time around the cursor
+    - Ctrl+Shift+wheel: zoom rows (more or fewer jobs in view)
+    - drag with the left button: pan both
+    """
     def __init__(self, parent, data):
         super().__init__(parent)
         self.data = data
 
         # bump bar_height so bars render thicker (~0.8 cm)
         self.bar_height = data.bar_height * 2.5
-        spacing = self.bar_height * 0.5
-
-        # ——— build scrollable container ———
-        container = ttk.Frame(self)
-        container.pack(fill="both", expand=True)
-
-        canvas = tk.Canvas(container)
-        vscroll = ttk.Scrollbar(container, orient="vertical", command=canvas.yview)
-        canvas.configure(yscrollcommand=vscroll.set)
-
-        inner = ttk.Frame(canvas)
-        canvas.create_window((0,0), window=inner, anchor="nw")
+        self.spacing = self.bar_height * 0.5
+        self.row_pitch = self.bar_height + self.spacing
+        self.row_px = ROW_PX
 
-        vscroll.pack(side="right", fill="y")
-        canvas.pack(side="left", fill="both", expand=True)
-
-        def on_inner_config(e):
-            canvas.configure(scrollregion=canvas.bbox("all"))
-        inner.bind("<Configure>", on_inner_config)
-        canvas.bind_all(
-            "<MouseWheel>",
-            lambda e: canvas.yview_scroll(int(-1*(e.delta/120)), "units")
-        )
+        # viewport: first row, number of rows, time window
+        self.top_row = 0
+        self.n_rows  = 30
+        self.t0, self.t1 = 0.0, float(max(data.makespan, MIN_SPAN))
+        self._pending = None
+        self._drag = None
 
         # ——— build the Matplotlib figure ———
-        self.fig = Figure(figsize=(data.width/100, data.height/100), dpi=100)
+        self.fig = Figure(figsize=(data.width/100, data.height/200), dpi=100)
         self.ax  = self.fig.add_subplot(111)
         self.ax.xaxis.set_major_formatter(data.formatter)
-        self.timeline = self.ax.axvline(0, color="red", linewidth=2)
+        self.ax.set_xlabel("Time (min)")
+        # the timeline is animated: it is blitted over a cached background
+        self.timeline = self.ax.axvline(0, color="red", linewidth=2, animated=True)
+        self._background = None
+        self._bars = []
 
-        # draw all the bars
-        self._draw_bars(spacing)
+        # embed figure with scrollbars for jobs and time
+        grid = ttk.Frame(self)
+        grid.pack(fill="both", expand=True)
+        grid.rowconfigure(0, weight=1)
+        grid.columnconfigure(0, weight=1)
+        self.canvas = FigureCanvasTkAgg(self.fig, master=grid)
+        widget = self.canvas.get_tk_widget()
+        widget.grid(row=0, column=0, sticky="nsew")
+        self.vscroll = ttk.Scrollbar(grid, orient="vertical", command=self._on_vscroll)
+        self.vscroll.grid(row=0, column=1, sticky="ns")
+        self.hscroll = ttk.Scrollbar(grid, orient="horizontal", command=self._on_hscroll)
+        self.hscroll.grid(row=1, column=0, sticky="ew")
 
-        # embed figure
-        self.canvas = FigureCanvasTkAgg(self.fig, master=inner)
-        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+        self.canvas.mpl_connect("resize_event", lambda e: self._fit_rows())
+        self.canvas.mpl_connect("motion_notify_event", self._on_motion)
+        self.canvas.mpl_connect("scroll_event", self._on_scroll)
+        self.canvas.mpl_connect("button_press_event", self._on_press)
+        self.canvas.mpl_connect("button_release_event", lambda e: setattr(self, "_drag", None))
 
+        # hover read-out for the bar under the mouse
+        self.hover_label = ttk.Label(self, text="", anchor="w")
+        self.hover_label.pack(fill="x")
+
+        self.index = GanttIndex(data)
+        self._render()
         self.pack(fill="both", expand=True)
 
-    def _draw_bars(self, spacing):
-        # jobs in chronological order (earliest start at top)
-        # compute each job's first process start
-        def start_time(jid):
-            ivs = [(s,e,info) for (s,e,info) in [(s,e,info) for (s,e,info) in self.data.intervals[jid]] if info['type']=='PROCESS']
-            return min((s for s,e,info in ivs), default=0)
-        jobs = sorted(self.data.sorted_jobs, key=lambda j: start_time(j))
-        self.y_map = {jid: idx*(self.bar_height+spacing) for idx,jid in enumerate(jobs)}
-
-        for jid in jobs:
-            y = self.y_map[jid]
-            ivs = self.data.intervals[jid]
-            for s,e,info in ivs:
-                dur = e - s
-                color = (
-                    "#777777" if info["type"] == "MOVE"
-                    else self.data.colors.get(info.get("station","S"), "#CCCCCC")
-                )
-                self.ax.broken_barh(
-                    [(s, dur)],
-                    (y, self.bar_height),
-                    facecolors=color,
-                    edgecolors="black",
-                    picker=True
-                )
-
-        max_y = max(self.y_map.values()) + self.bar_height
-        self.ax.set_ylim(-spacing, max_y + spacing)
-        self.ax.set_xlim(0, self.data.makespan)
-        self.ax.set_xlabel("Time (min)")
-        self.ax.set_yticks([self.y_map[j] + self.bar_height/2 for j in jobs])
-        self.ax.set_yticklabels(jobs, fontsize=8)
+    # ─── viewport ──────────────────────────────────────────────────────────
+    def _clamp(self):
+        n_jobs = len(self.index.jobs)
+        self.n_rows = max(1, min(self.n_rows, max(n_jobs, 1)))
+        self.top_row = max(0, min(self.top_row, n_jobs - self.n_rows))
+        span = min(max(self.t1 - self.t0, MIN_SPAN), max(self.data.makespan, MIN_SPAN))
+        self.t0 = max(0.0, min(self.t0, self.data.makespan - span))
+        self.t1 = self.t0 + span
+
+    def set_view(self, top_row=None, n_rows=None, t0=None, t1=None):
+        """Move/zoom the viewport; the redraw is coalesced to the next idle"""
+        if top_row is not None: self.top_row = int(top_row)
+        if n_rows  is not None: self.n_rows  = int(n_rows)
+        if t0 is not None: self.t0 = float(t0)
+        if t1 is not None: self.t1 = float(t1)
+        self._clamp()
+        if self._pending is None:
+            self._pending = self.after_idle(self._render)
+
+    def _fit_rows(self):
+        h = self.ax.get_window_extent().height
+        self.set_view(n_rows=max(1, int(h // self.row_px)))
+
+    def _render(self):
+        self._pending = None
+        self._clamp()
+        r0, r1 = self.top_row, self.top_row + self.n_rows
+        px_per_min = self.ax.get_window_extent().width / max(self.t1 - self.t0, 1e-9)
+        s, e, row, col = self.index.query(r0, r1, self.t0, self.t1,
+                                          min_dur=MIN_BAR_PX / max(px_per_min, 1e-9))
+        for artist in self._bars:
+            artist.remove()
+        self._bars = []
+        if len(s):
+            y0 = row * self.row_pitch
+            y1 = y0 + self.bar_height
+            verts = np.stack([
+                np.column_stack([s, y0]),
+                np.column_stack([s, y1]),
+                np.column_stack([e, y1]),
+                np.column_stack([e, y0]),
+            ], axis=1)
+            # thin edges only when bars are wide enough to show them
+            lw = 0.5 if px_per_min > 1 else 0.0
+            for c in np.unique(col):
+                coll = PolyCollection(verts[col == c], facecolors=self.index.palette[c],
+                                      edgecolors="black", linewidths=lw)
+                self.ax.add_collection(coll)
+                self._bars.append(coll)
+
+        # earliest job at the top
+        self.ax.set_ylim(r1 * self.row_pitch, r0 * self.row_pitch - self.spacing)
+        self.ax.set_xlim(self.t0, self.t1)
+        rows = range(r0, min(r1, len(self.index.jobs)))
+        self.ax.set_yticks([r * self.row_pitch + self.bar_height/2 for r in rows])
+        self.ax.set_yticklabels([self.index.jobs[r] for r in rows], fontsize=8)
+        self._update_scrollbars()
+        self._background = None
+        self.canvas.draw_idle()
+
+    def _update_scrollbars(self):
+        n_jobs = max(len(self.index.jobs), 1)
+        self.vscroll.set(self.top_row / n_jobs, (self.top_row + self.n_rows) / n_jobs)
+        total = max(self.data.makespan, MIN_SPAN)
+        self.hscroll.set(self.t0 / total, self.t1 / total)
+
+    def _on_vscroll(self, *args):
+        n_jobs = len(self.index.jobs)
+        if args[0] == "moveto":
+            self.set_view(top_row=round(float(args[1]) * n_jobs))
+        else:
+            step = self.n_rows if args[2] == "pages" else 1
+            self.set_view(top_row=self.top_row + int(args[1]) * step)
+
+    def _on_hscroll(self, *args):
+        span = self.t1 - self.t0
+        total = max(self.data.makespan, MIN_SPAN)
+        if args[0] == "moveto":
+            t0 = float(args[1]) * total
+        else:
+            step = span if args[2] == "pages" else span / 10
+            t0 = self.t0 + int(args[1]) * step
+        self.set_view(t0=t0, t1=t0 + span)
+
+    def _on_scroll(self, event):
+        up = event.button == "up"
+        key = event.key or ""
+        if "control" in key and "shift" in key:
+            # zoom rows; keep the new row height for later resizes
+            n = int(self.n_rows * 0.8) if up else max(self.n_rows + 1, int(self.n_rows * 1.25))
+            self.set_view(n_rows=n)
+            self.row_px = max(1.0, self.ax.get_window_extent().height / self.n_rows)
+        elif "control" in key:
+            # zoom time around the cursor
+            x = event.xdata if event.xdata is not None else (self.t0 + self.t1) / 2
+            f = 0.8 if up else 1.25
+            self.set_view(t0=x - (x - self.t0) * f, t1=x + (self.t1 - x) * f)
+        elif "shift" in key:
+            shift = (self.t1 - self.t0) * (-0.1 if up else 0.1)
+            self.set_view(t0=self.t0 + shift, t1=self.t1 + shift)
+        else:
+            self.set_view(top_row=self.top_row + (-3 if up else 3))
+
+    def _on_press(self, event):
+        if event.button == 1 and event.inaxes is self.ax:
+            self._drag = (event.x, event.y, self.t0, self.t1, self.top_row)
+
+    def _on_motion(self, event):
+        if self._drag is not None:
+            x, y, t0, t1, top = self._drag
+            bbox = self.ax.get_window_extent()
+            dt = (event.x - x) * (t1 - t0) / max(bbox.width, 1)
+            drows = (event.y - y) / max(self.row_px, 1)
+            self.set_view(t0=t0 - dt, t1=t1 - dt, top_row=top + round(drows))
+            return
+        self._on_hover(event)
+
+    # ─── hover / pick ──────────────────────────────────────────────────────
+    def interval_at(self, x, y):
+        """
+        (job_id, start, end, info) of the bar at data coordinates (x, y), or None.
+        Rows are found arithmetically and bars by bisecting the row's starts.
+        """
+        if x is None or y is None or not self.index.jobs:
+            return None
+        row = int(y // self.row_pitch)
+        if not 0 <= row < len(self.index.jobs) or y - row*self.row_pitch > self.bar_height:
+            return None
+        k = bisect.bisect_right(self.index.row_starts[row], x) - 1
+        if k < 0:
+            return None
+        s, e, info = self.index.row_ivs[row][k]
+        if x >= e:
+            return None
+        return self.index.jobs[row], s, e, info
+
+    def _on_hover(self, event):
+        hit = self.interval_at(event.xdata, event.ydata) if event.inaxes is self.ax else None
+        if hit is None:
+            text = ""
+        else:
+            jid, s, e, info = hit
+            where = info.get("station") or f"{info.get('from_st')} → {info.get('to_st')}"
+            fmt = self.data.formatter
+            text = f"{jid}  ·  {info['type']} {where}  ·  {fmt(s, None)}–{fmt(e, None)}"
+        if text != self.hover_label.cget("text"):
+            self.hover_label.configure(text=text)
+
+    # ─── drawing ───────────────────────────────────────────────────────────
+    def _on_draw(self, event):
+        # cache everything except the timeline, then put the timeline back
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.ax.draw_artist(self.timeline)
+
+    def refresh(self):
+        """Rebuild the index after data was re-indexed for a new schedule"""
+        self.index = GanttIndex(self.data)
+        self._render()
 
     def update(self, t):
         self.timeline.set_xdata([t, t])
-        self.canvas.draw_idle()
+        if self._background is None:
+            # no cached background yet: the next full draw will capture one
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self._background)
+        self.ax.draw_artist(self.timeline)
+        self.canvas.blit(self.fig.bbox)
@@ -1,5 +1,6 @@
 # sim_canvas.py
 import tkinter as tk
+import numpy as np
 
 class SimulationCanvas(tk.Canvas):
     """
@@ -33,27 +34,53 @@ class SimulationCanvas(tk.Canvas):
         Pre-create ovals and text for each job, hidden initially.
         """
         self.data.job_items = {}
+        self._items = []
         for jid in self.data.sorted_jobs:
-            oval = self.create_oval(0,0,30,30, fill="black", outline="white", width=2)
-            lbl  = self.create_text(0,0, text=jid, font=("Arial",10,"bold"), fill="white")
+            oval = self.create_oval(0,0,30,30, fill="black", outline="white", width=2, state='hidden')
+            lbl  = self.create_text(0,0, text=jid, font=("Arial",10,"bold"), fill="white", state='hidden')
             self.data.job_items[jid] = (oval, lbl)
+            self._items.append((oval, lbl))
+        # last drawn state per job, so only changed items are touched
+        n = len(self._items)
+        self._shown  = np.zeros(n, dtype=bool)
+        self._xy     = np.full((n, 2), np.nan)
+        self._colour = np.full(n, -1)
+
+    def refresh(self):
+        """Recreate the job markers after data was re-indexed for a new schedule"""
+        for oval, lbl in self.data.job_items.values():
+            self.delete(oval)
+            self.delete(lbl)
+        self._init_jobs()
+        self.update(self.data.current_time)
 
     def update(self, t):
         """
         Move each job oval/text to its position at time t.
         """
-        for jid, (oval, lbl) in self.data.job_items.items():
-            pos = self.data.compute_position(jid, t)
-            if pos is None:
+        visible, x, y, colour = self.data.engine.positions(t)
+        xy = np.column_stack([x, y])
+        moved   = visible & (np.abs(xy - self._xy) >= 0.5).any(axis=1)
+        recolor = visible & (colour != self._colour)
+        toggled = visible != self._shown
+        palette = self.data.engine.palette
+        for j in np.flatnonzero(moved | recolor | toggled):
+            oval, lbl = self._items[j]
+            if not visible[j]:
                 # Hide before job starts or after finish
                 self.itemconfig(oval, state='hidden')
                 self.itemconfig(lbl, state='hidden')
-            else:
-                x, y, color = pos
-                # Show and move
-                self.itemconfig(oval, state='normal', fill=color)
-                self.coords(oval, x-15, y-15, x+15, y+15)
-                self.coords(lbl, x, y)
+                continue
+            if toggled[j] or recolor[j]:
+                self.itemconfig(oval, state='normal', fill=palette[colour[j]])
+                self.itemconfig(lbl, state='normal')
+            if moved[j] or toggled[j]:
+                px, py = xy[j]
+                self.coords(oval, px-15, py-15, px+15, py+15)
+                self.coords(lbl, px, py)
+        self._shown = visible
+        self._xy = np.where(visible[:, None], xy, self._xy)
+        self._colour = np.where(visible, colour, self._colour)
         # Optionally update a clock label if bound
         if hasattr(self.data, 'update_clock_label'):
-            self.data.update_clock_label(t)
\ No newline at end of file
+            self.data.update_clock_label(t)
@@ -1,5 +1,6 @@
 # utils.py
 import tkinter as tk
+import numpy as np
 from matplotlib.ticker import FuncFormatter
 
 
@@ -41,6 +42,102 @@ def make_scrollable(parent, **opts):
     return cont, scroll_frame
 
 
+def index_schedule(data, sched, tasks):
+    """
+    (Re)build the per-job interval lists on data for a new schedule, so the
+    canvases can be refreshed in place while the solver is still improving it.
+    """
+    data.sched = sched
+    data.tasks = tasks
+    by_job = {}
+    for (j, i), (s, e) in sched.items():
+        by_job.setdefault(j, []).append((s, e, tasks[(j, i)]))
+    data.intervals = {}
+    data.sorted_jobs = []
+    for j in sorted(by_job):
+        ivs = by_job[j]
+        ivs.sort(key=lambda x: x[0])
+        data.intervals[j] = ivs
+        data.sorted_jobs.append(j)
+    data.engine = PositionEngine(data)
+    return data
+
+
+class PositionEngine:
+    """
+    Flat per-task arrays (start, end, from/to coordinates, colour) for every
+    job, ordered by job then start time.  Positions of all jobs at time t
+    come from one searchsorted plus a linear interpolation.
+    """
+
+    def __init__(self, data):
+        self.jobs = list(data.sorted_jobs)
+        self.job_index = {jid: j for j, jid in enumerate(self.jobs)}
+        self.palette = []
+        colour_idx = {}
+
+        def colour(c):
+            if c not in colour_idx:
+                colour_idx[c] = len(self.palette)
+                self.palette.append(c)
+            return colour_idx[c]
+
+        job, start, end, fx, fy, tx, ty, col = [], [], [], [], [], [], [], []
+        for j, jid in enumerate(self.jobs):
+            for s, e, info in data.intervals[jid]:
+                if info['type'] in ('PROCESS', 'STORAGE'):
+                    a = b = info.get('station') or 'S'
+                    c = data.colors.get(a)
+                else:
+                    a, b = info['from_st'], info['to_st']
+                    c = data.colors.get(b, 'black')
+                (x1, y1), (x2, y2) = data.station_xy(a), data.station_xy(b)
+                job.append(j); start.append(s); end.append(e)
+                fx.append(x1); fy.append(y1); tx.append(x2); ty.append(y2)
+                col.append(colour(c))
+
+        self.start = np.asarray(start, dtype=float)
+        self.end   = np.asarray(end, dtype=float)
+        self.fx, self.fy = np.asarray(fx, dtype=float), np.asarray(fy, dtype=float)
+        self.tx, self.ty = np.asarray(tx, dtype=float), np.asarray(ty, dtype=float)
+        self.colour = np.asarray(col, dtype=int)
+        self.job = job = np.asarray(job, dtype=int)
+        # one sorted key for all jobs: job j's tasks live in [j*span, (j+1)*span)
+        self.span = float(self.end.max()) + 1.0 if len(self.end) else 1.0
+        self.key = job * self.span + self.start
+        self.finish_point = data.finish_point
+
+    def positions(self, t):
+        """
+        Arrays (visible, x, y, colour_index) with one entry per job in
+        data.sorted_jobs; a job is visible while one of its tasks is running.
+        """
+        n = len(self.jobs)
+        if n == 0 or len(self.key) == 0:
+            empty = np.zeros(n)
+            return empty.astype(bool), empty, empty, empty.astype(int)
+        jobs = np.arange(n)
+        k = np.searchsorted(self.key, jobs * self.span + t, side='right') - 1
+        k = np.maximum(k, 0)
+        visible = (self.job[k] == jobs) & (self.start[k] <= t) & (t < self.end[k])
+        dur = self.end[k] - self.start[k]
+        frac = np.where(dur > 0, (t - self.start[k]) / np.where(dur > 0, dur, 1.0), 1.0)
+        frac = np.clip(frac, 0.0, 1.0)
+        x = self.fx[k] + frac * (self.tx[k] - self.fx[k])
+        y = self.fy[k] + frac * (self.ty[k] - self.fy[k])
+        return visible, x, y, self.colour[k]
+
+    def position(self, jid, t):
+        """(x, y, colour) of one job at time t; the finish point when idle."""
+        j = self.job_index.get(jid)
+        if j is not None:
+            visible, x, y, c = self.positions(t)
+            if visible[j]:
+                return (x[j], y[j], self.palette[c[j]])
+        xf, yf = self.finish_point
+        return (xf, yf, 'black')
+
+
 def preprocess_schedule(sched, tasks, sd, makespan):
     """
     Build a Data object holding processed schedule info for the GUI.
@@ -54,10 +151,13 @@ def preprocess_schedule(sched, tasks, sd, makespan):
     data.sd = sd
     data.makespan = makespan
 
-    # Playback state
+    # Playback state: time advances at `rate` sim-minutes per wall-clock second;
+    # `delay` is the target frame interval in ms (frames are dropped if slower)
     data.current_time = 0.0
     data.dt = 0.5
     data.delay = 100
+    data.rate = data.dt * 1000 / data.delay
+    data.slider_resolution = 0.5
 
     # Screen dims and sim ratio
     data.width = tk._default_root.winfo_screenwidth()
@@ -71,48 +171,24 @@ def preprocess_schedule(sched, tasks, sd, makespan):
     data.bar_height = 0.8
     data.bar_spacing = 1.0
 
-    # Prepare intervals and sorted job list
-    jobs = sorted({j for j,_ in sched})
-    data.intervals = {}
-    data.sorted_jobs = []
-    for j in jobs:
-        ivs = [(s, e, tasks[(jj, i)])
-               for (jj, i), (s, e) in sched.items() if jj == j]
-        ivs.sort(key=lambda x: x[0])
-        data.intervals[j] = ivs
-        data.sorted_jobs.append(j)
-
-    # Station positioning & finish marker
-    data.station_xy = lambda st: station_xy(
-        st, sd, data.width, int(data.height * data.sim_ratio)
-    )
+    # Station positioning & finish marker: every station's pixel position is
+    # computed once, instead of rescanning all stations per lookup
+    sim_h = int(data.height * data.sim_ratio)
+    station_pos = {st: station_xy(st, sd, data.width, sim_h) for st in sd}
+    fallback = station_xy(None, sd, data.width, sim_h)
+    data.station_pos = station_pos
+    data.station_xy = lambda st: station_pos.get(st, fallback)
     data.finish_point = data.station_xy('S')
 
-    # Stubs to be wired by GUI
+    # Prepare intervals, sorted job list and the vectorised position engine
+    index_schedule(data, sched, tasks)
+
     def compute_position(jid, t):
-        # replicate your old get_job_pos: find the (s,e) interval containing t
-        ivs = sorted(
-            ((i, (s,e)) for (j,i),(s,e) in data.sched.items() if j==jid),
-            key=lambda x: x[1][0]
-        )
-        for idx, (s,e) in ivs:
-            if s <= t < e:
-                info = data.tasks[(jid, idx)]
-                if info['type'] in ('PROCESS','STORAGE'):
-                    x,y = data.station_xy(info.get('station') or 'S')
-                    return (x, y, data.colors.get(info.get('station') or 'S'))
-                # else it’s a MOVE: interpolate between stations
-                a,b = info['from_st'], info['to_st']
-                x1,y1 = data.station_xy(a)
-                x2,y2 = data.station_xy(b)
-                frac = (t-s)/(e-s) if e>s else 1
-                return (x1 + frac*(x2-x1), y1 + frac*(y2-y1),
-                        data.colors.get(b, 'black'))
-        # if past all tasks, return finish point
-        xf,yf = data.finish_point
-        return (xf, yf, 'black')
+        # single-job lookup; the canvas uses data.engine.positions(t) for all jobs
+        return data.engine.position(jid, t)
     data.compute_position = compute_position
     data.update_clock_label = lambda t: None
+    data.update_fps_label = lambda fps: None
     data.slider = None
 
     # GUI will attach these before running
@@ -1,33 +1,51 @@
 # main_app.py
 import os
+import queue
+import threading
+import time
+import importlib
 import tkinter as tk
 from tkinter import ttk, messagebox
 from ttkthemes import ThemedTk
 from Scheduler.load_data import load_data
-from Scheduler.model import solve_throughput_with_earliest
-from .frames.initial_frame import InitialFrame
 from .colours import GKN_BG, GKN_PRIMARY, GKN_SECONDARY, GKN_TEXT
 import sys
-import os
 
 # planning horizon default
 default_horizon = 22 * 60
+
+# Loaded on a background thread while the window comes up.  The first page
+# shows as soon as the plant data is in; the rest follows behind it so that later
+# pages and the first solve do not stall on their imports.
+STARTUP_STEPS = [
+    ("Loading first page…",       "GUI.frames.initial_frame"),
+    ("Loading plant data…",       None),
+    ("Loading pandas…",           "pandas"),
+    ("Loading the solver…",       "Scheduler.model"),
+    ("Loading reports…",          "Scheduler.archive"),
+    ("Loading charts…",           "matplotlib.backends.backend_tkagg"),
+    ("Loading schedule views…",   "GUI.frames.run_params_frame"),
+]
+STARTUP_POLL_MS = 20
+
+
 # ─── SPLASH SCREEN ────────────────────────────────────────────────────────────
 class Splash(tk.Toplevel):
-    def __init__(self, parent, img_path):
+    def __init__(self, parent, image):
         super().__init__(parent)
         self.overrideredirect(True)       # no window decorations
         self.attributes('-topmost', True) # stay on top
 
-        # Load the same background image
-        self.bg = tk.PhotoImage(file=img_path)
-        lbl = tk.Label(self, image=self.bg)
+        # the root's background image, not a second copy of it
+        lbl = tk.Label(self, image=image)
         lbl.pack(fill="both", expand=True)
 
-        # “Loading…” text
-        self.msg = tk.Label(self, text="Loading Scheduler…", 
+        # “Loading…” text and progress over the startup steps
+        self.msg = tk.Label(self, text="Loading Scheduler…",
                             font=("Segoe UI",12,"bold"), bg=GKN_TEXT, fg=GKN_BG)
-        self.msg.place(relx=0.5, rely=0.9, anchor="center")
+        self.msg.place(relx=0.5, rely=0.85, anchor="center")
+        self.bar = ttk.Progressbar(self, mode="determinate", maximum=len(STARTUP_STEPS))
+        self.bar.place(relx=0.5, rely=0.92, anchor="center", relwidth=0.6)
 
         # Center on screen
         self.update_idletasks()
@@ -35,9 +53,32 @@ class Splash(tk.Toplevel):
         sw, sh = self.winfo_screenwidth(), self.winfo_screenheight()
         self.geometry(f"{w}x{h}+{(sw-w)//2}+{(sh-h)//2}")
 
+    def progress(self, done, message):
+        self.bar.configure(value=done)
+        self.msg.configure(text=message)
+
+
+def _startup_worker(events):
+    """Run STARTUP_STEPS, posting (kind, step, payload) to the UI thread."""
+    for i, (label, module) in enumerate(STARTUP_STEPS):
+        events.put(("step", i, label))
+        try:
+            if module is None:
+                events.put(("data", i, load_data()))
+            else:
+                importlib.import_module(module)
+        except Exception as e:
+            events.put(("error", i, e))
+            if module is None:
+                return
+    events.put(("done", len(STARTUP_STEPS), None))
+
 
 class MainApp(ThemedTk):
     def __init__(self):
+        # perf_counter marks of the startup ("window", "interactive", "loaded")
+        self.timings = {"start": time.perf_counter()}
+
         # 1) create the real root first
         super().__init__(theme="arc")
 
@@ -47,16 +88,14 @@ class MainApp(ThemedTk):
         self.bg_image = tk.PhotoImage(file=bg_path)
 
         # 3) show a splash on top of this root
-        splash = Splash(self, bg_path)
-        splash.update()
+        self.splash = Splash(self, self.bg_image)
+        self.splash.update()
 
         # Fullscreen
         try:
             self.state('zoomed')
         except:
             self.attributes('-fullscreen', True)
-            
-        splash.destroy()
 
         # Style configuration
         style = ttk.Style(self)
@@ -70,11 +109,6 @@ class MainApp(ThemedTk):
         # Window title & background
         self.title("Scheduler Simulator")
         self.configure(bg=GKN_BG)
-
-        # Background image
-        script_dir = os.path.dirname(__file__)
-        bg_path = os.path.abspath(os.path.join(script_dir, '..', 'data', 'background.png'))
-        self.bg_image = tk.PhotoImage(file=bg_path)
         bg_lbl = tk.Label(self, image=self.bg_image)
         bg_lbl.place(x=0, y=0, relwidth=1, relheight=1)
 
@@ -82,36 +116,107 @@ class MainApp(ThemedTk):
         self.program_start_minutes = 7 * 60
         self.show_simulation       = True
         self.show_gantt            = True
+        # "weighted", "lexicographic" or "makespan" (see Scheduler.model.OBJECTIVES)
+        self.objective             = "weighted"
+        # thin-client mode: send solves to a local scheduling service
+        self.service_url = os.environ.get("GKN_SCHEDULER_SERVICE") or None
 
-        # Load data
-        self.sd, self.ops = load_data()
-        self.station_caps = {st: 1 for st in self.sd if st not in ('S', 'FIN')}
-
-        # Content container
+        # Content container, placed once the plant data is in
         self.content = ttk.Frame(self, style="TFrame")
-        self.content.place(
-            relx=0.5, rely=0.5, anchor="center",
-            relwidth=0.75, relheight=0.75
-        )
 
         # Helper for resizing content
         def set_content_size(w):
             self.content.place_configure(relwidth=w)
         self.set_content_size = set_content_size
 
-        # Kick off initial page
-        InitialFrame(self.content, self)
-
-        # Status bar
-        status = ttk.Label(
+        # Status bar: startup progress once the splash is gone
+        self.status = ttk.Label(
             self,
             relief="sunken",
             anchor="w",
-            text="Ready",
+            text="Starting…",
             background=GKN_BG,
             foreground=GKN_TEXT
         )
-        status.pack(fill="x", side="bottom")
+        self.status.pack(fill="x", side="bottom")
+        self.timings["window"] = time.perf_counter()
+
+        # Load data and modules off the UI thread
+        self._startup = queue.Queue()
+        threading.Thread(
+            target=_startup_worker, args=(self._startup,), name="startup", daemon=True
+        ).start()
+        self.after(STARTUP_POLL_MS, self._poll_startup)
+
+    def _poll_startup(self):
+        while True:
+            try:
+                kind, i, payload = self._startup.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "step":
+                if self.splash is not None:
+                    self.splash.progress(i, payload)
+                else:
+                    self.status.configure(text=f"{payload} ({i}/{len(STARTUP_STEPS)})")
+            elif kind == "data":
+                self._show_first_frame(*payload)
+            elif kind == "error":
+                label, module = STARTUP_STEPS[i]
+                if module is None:
+                    messagebox.showerror("Scheduler", f"Could not load the plant data:\n{payload}")
+                    self.destroy()
+                    return
+                # the page that needs it will raise the real error on use
+                self.status.configure(text=f"{label} failed: {payload}")
+            elif kind == "done":
+                self.timings["loaded"] = time.perf_counter()
+                self.status.configure(text="Ready")
+                return
+        self.after(STARTUP_POLL_MS, self._poll_startup)
+
+    def _show_first_frame(self, sd, ops):
+        from .frames.initial_frame import InitialFrame
+        self.sd, self.ops = sd, ops
+        self.station_caps = {st: 1 for st in self.sd if st not in ('S', 'FIN')}
+
+        # Kick off initial page
+        self.show_content()
+        InitialFrame(self.content, self)
+        if self.splash is not None:
+            self.splash.destroy()
+            self.splash = None
+        self.update_idletasks()
+        self.timings["interactive"] = time.perf_counter()
+
+    def show_content(self):
+        """(Re)place the centred content container, e.g. after a cancelled solve"""
+        self.content.place(
+            relx=0.5, rely=0.5, anchor="center",
+            relwidth=0.75, relheight=0.75
+        )
+
+    def solve(self, *args, priority="interactive", **kwargs):
+        """
+        Solve locally, or through the scheduling service when service_url is set.
+        Same arguments and return value as solve_throughput_with_earliest.
+        """
+        from Scheduler.service import ServiceClient
+        from Scheduler.model import solve_throughput_with_earliest
+        if self.service_url:
+            return ServiceClient(self.service_url, priority).solve(*args, **kwargs)
+        return solve_throughput_with_earliest(*args, **kwargs)
+
+    def submit_solve(self, *args, priority="interactive", **kwargs):
+        """
+        Like solve(), but returns a cancellable SolveHandle immediately.
+        """
+        from Scheduler.service import ServiceClient
+        from Scheduler.solve_async import submit_solve
+        if self.service_url:
+            client = ServiceClient(self.service_url, priority)
+            return submit_solve(*args, solve=client.solve, **kwargs)
+        return submit_solve(*args, **kwargs)
 
     def on_closing(self):
         if messagebox.askokcancel("Quit", "Do you want to quit?"):
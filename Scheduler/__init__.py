@@ -1,6 +1,5 @@
 from .load_data import load_data, movement_time
 from .tasks     import build_tasks, build_tasks_with_storage
-from .model     import solve_throughput_with_earliest
 from .utils import (station_xy,make_station_colors,minutes_to_hhmm,hhmm_to_minutes,axis_time_formatter,find_json,)
 from Data.universal_variable import TIME_UNIT, DEFAULT_HORIZON
 
@@ -10,4 +9,12 @@ __all__ = [
     "build_tasks",
     "build_tasks_with_storage",
     "solve_throughput_with_earliest",
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    # the solver pulls in ortools: load it on first use, not with the package
+    if name == "solve_throughput_with_earliest":
+        from .model import solve_throughput_with_earliest
+        return solve_throughput_with_earliest
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,230 @@
+# scheduler/archive.py
+"""
+Local, indexed store of every solved schedule (SQLite, standard library only).
+
+    with ScheduleArchive() as db:
+        run = db.start_run("history replay", kind="history", params={...})
+        db.record(run, sched, tasks, problem, date=day, report=report)
+        db.throughput(op="K15", operators=3)        # DataFrame, one row per day
+
+Tables
+- runs      one row per history replay / test / GUI session
+- problems  one row per solved scenario: problem signature (problem_key),
+            date, operator count, time limit, objective, status, solver report
+            and the headline KPIs (Scheduler.kpi)
+- problem_ops  runs requested and scheduled per op, so "days with K15" is an
+               index lookup
+- tasks     the task-level schedule, one row per task
+
+Every column used for filtering is indexed; tasks are written with
+executemany in a single transaction, so millions of rows stay cheap.
+"""
+import json
+import os
+import sqlite3
+import time
+
+import pandas as pd
+
+from .kpi import schedule_arrays, batch_kpis, KPI_COLUMNS
+from .problem import problem_key
+
+__all__ = ["ScheduleArchive", "DEFAULT_PATH"]
+
+DEFAULT_PATH = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), "..", "cache", "schedule_archive.sqlite"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      INTEGER PRIMARY KEY,
+    created     REAL NOT NULL,
+    label       TEXT,
+    kind        TEXT,
+    params      TEXT
+);
+CREATE TABLE IF NOT EXISTS problems (
+    problem_id  INTEGER PRIMARY KEY,
+    run_id      INTEGER NOT NULL REFERENCES runs(run_id),
+    signature   TEXT,
+    date        TEXT,
+    operators   INTEGER,
+    time_limit  REAL,
+    objective   TEXT,
+    status      TEXT,
+    report      TEXT,
+    throughput          INTEGER,
+    weighted_throughput REAL,
+    total_runtime       REAL,
+    makespan            REAL,
+    mean_flow           REAL,
+    max_flow            REAL
+);
+CREATE TABLE IF NOT EXISTS problem_ops (
+    problem_id  INTEGER NOT NULL REFERENCES problems(problem_id),
+    op          TEXT NOT NULL,
+    requested   INTEGER,
+    scheduled   INTEGER,
+    PRIMARY KEY (op, problem_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS tasks (
+    problem_id  INTEGER NOT NULL REFERENCES problems(problem_id),
+    job         TEXT NOT NULL,
+    op          TEXT NOT NULL,
+    run         INTEGER,
+    step        INTEGER NOT NULL,
+    type        TEXT,
+    station     TEXT,
+    from_st     TEXT,
+    to_st       TEXT,
+    start       REAL,
+    "end"       REAL
+);
+CREATE INDEX IF NOT EXISTS problems_run       ON problems(run_id);
+CREATE INDEX IF NOT EXISTS problems_date      ON problems(date);
+CREATE INDEX IF NOT EXISTS problems_operators ON problems(operators, date);
+CREATE INDEX IF NOT EXISTS problems_signature ON problems(signature);
+CREATE INDEX IF NOT EXISTS problem_ops_pid    ON problem_ops(problem_id);
+CREATE INDEX IF NOT EXISTS tasks_problem      ON tasks(problem_id, job, step);
+CREATE INDEX IF NOT EXISTS tasks_op           ON tasks(op, problem_id);
+"""
+
+
+class ScheduleArchive:
+    """One SQLite file; open it per thread (connections are not shared)."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ─── writing ────────────────────────────────────────────────────────────
+    def start_run(self, label=None, kind=None, params=None):
+        """New run id grouping the problems recorded after it."""
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO runs (created, label, kind, params) VALUES (?, ?, ?, ?)",
+                (time.time(), label, kind, json.dumps(params or {}, default=str)),
+            )
+        return cur.lastrowid
+
+    def record(self, run_id, sched, all_tasks, problem=None, date=None,
+               operators=None, report=None, weights=None, status=None):
+        """
+        Store one solved schedule; returns its problem_id.
+        - problem:   make_problem() dict (signature, time limit, objective,
+                     requested runs and operator count are taken from it)
+        - report:    solver report dict (see solve_throughput_with_earliest)
+        """
+        problem = problem or {}
+        if operators is None:
+            operators = (problem.get("station_caps") or {}).get("S")
+        weights = weights or problem.get("weights")
+        arrays = schedule_arrays([(sched, all_tasks)])
+        kpi = batch_kpis(None, weights, arrays=arrays).iloc[0]
+        if status is None:
+            phases = (report or {}).get("phases") or [{}]
+            status = phases[-1].get("status") or ("FEASIBLE" if sched else "NO_SOLUTION")
+
+        scheduled = {}
+        for jid in arrays.job_ids:
+            op = jid.rsplit("_", 1)[0]
+            scheduled[op] = scheduled.get(op, 0) + 1
+        requested = dict(problem.get("max_runs") or {})
+
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO problems (run_id, signature, date, operators, time_limit, objective,"
+                " status, report, " + ", ".join(KPI_COLUMNS) + ")"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?" + ", ?" * len(KPI_COLUMNS) + ")",
+                (run_id, problem_key(problem) if problem else None,
+                 None if date is None else str(date), operators,
+                 problem.get("time_limit"), problem.get("objective", "weighted" if problem else None),
+                 status, json.dumps(report, default=str) if report else None,
+                 *[None if pd.isna(kpi[c]) else float(kpi[c]) for c in KPI_COLUMNS]),
+            )
+            pid = cur.lastrowid
+            self.conn.executemany(
+                "INSERT INTO problem_ops (problem_id, op, requested, scheduled) VALUES (?, ?, ?, ?)",
+                [(pid, op, requested.get(op), scheduled.get(op, 0))
+                 for op in sorted(set(requested) | set(scheduled))],
+            )
+            jobs = arrays.job_ids[arrays.job]
+            split = [jid.rsplit("_", 1) for jid in jobs]
+            self.conn.executemany(
+                'INSERT INTO tasks (problem_id, op, run, job, step, type, station, from_st,'
+                ' to_st, start, "end") VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [(pid, sp[0], int(sp[1]) if len(sp) > 1 and sp[1].isdigit() else None,
+                  jid, int(step), kind, st, fr, to, float(s), float(e))
+                 for sp, jid, step, kind, st, fr, to, s, e in zip(
+                     split, jobs, arrays.step, arrays.kind, arrays.station,
+                     arrays.from_st, arrays.to_st, arrays.start, arrays.end)],
+            )
+        return pid
+
+    # ─── reading ────────────────────────────────────────────────────────────
+    def query(self, sql, params=()):
+        """Any SELECT as a DataFrame."""
+        return pd.read_sql_query(sql, self.conn, params=params)
+
+    def runs(self):
+        return self.query(
+            "SELECT r.run_id, r.created, r.label, r.kind, COUNT(p.problem_id) AS problems"
+            " FROM runs r LEFT JOIN problems p USING (run_id)"
+            " GROUP BY r.run_id ORDER BY r.run_id")
+
+    def problems(self, op=None, operators=None, run_id=None, date_from=None,
+                 date_to=None, signature=None):
+        """
+        Problems matching every given filter, with their KPIs.  With op, only
+        scenarios that requested or scheduled that op, plus its own counts.
+        """
+        where, params = [], []
+        cols = "p.*"
+        src = "problems p"
+        if op is not None:
+            src += " JOIN problem_ops o ON o.problem_id = p.problem_id AND o.op = ?"
+            params.append(op)
+            cols += ", o.requested AS op_requested, o.scheduled AS op_scheduled"
+        for clause, value in (("p.operators = ?", operators), ("p.run_id = ?", run_id),
+                              ("p.date >= ?", date_from), ("p.date <= ?", date_to),
+                              ("p.signature = ?", signature)):
+            if value is not None:
+                where.append(clause)
+                params.append(str(value) if clause.startswith("p.date") else value)
+        sql = f"SELECT {cols} FROM {src}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return self.query(sql + " ORDER BY p.date, p.problem_id", params)
+
+    def throughput(self, op=None, operators=None, run_id=None, date_from=None, date_to=None):
+        """Date, run, operator count and throughput KPIs per matching problem."""
+        df = self.problems(op, operators, run_id, date_from, date_to)
+        keep = ["problem_id", "run_id", "date", "operators", "throughput",
+                "weighted_throughput", "total_runtime"]
+        if op is not None:
+            keep += ["op_requested", "op_scheduled"]
+        return df[keep]
+
+    def schedule(self, problem_id):
+        """(sched, all_tasks) of one archived problem, in the solver's format."""
+        rows = self.conn.execute(
+            'SELECT job, step, type, station, from_st, to_st, start, "end" FROM tasks'
+            " WHERE problem_id = ? ORDER BY job, step", (problem_id,)).fetchall()
+        sched = {(j, i): (s, e) for j, i, _, _, _, _, s, e in rows}
+        tasks = {(j, i): {"type": t, "station": st, "from_st": fr, "to_st": to}
+                 for j, i, t, st, fr, to, _, _ in rows}
+        return sched, tasks
@@ -0,0 +1,195 @@
+# scheduler/export.py
+"""
+Schedule export: job summaries plus full task-level detail.
+
+Rows are grouped with vectorised pandas operations (one pass over the
+schedule, not one scan per job) and written through streaming writers:
+
+- .xlsx      openpyxl write-only workbook ("Schedule" and "Tasks" sheets)
+- .csv       <name>.csv (summary) and <name>_tasks.csv
+- .parquet   <name>.parquet and <name>_tasks.parquet      (needs pyarrow)
+- .arrow     Arrow IPC files, same naming as parquet       (needs pyarrow)
+
+export_async() runs the same export on a worker thread and reports back
+through a completion callback.
+"""
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+__all__ = ["schedule_tables", "export_schedule", "export_async", "unique_path", "FORMATS"]
+
+FORMATS = (".xlsx", ".csv", ".parquet", ".arrow")
+
+# rows handed to the writers per batch
+CHUNK_ROWS = 50_000
+
+
+def unique_path(base, ext):
+    """base.ext, or base_1.ext, base_2.ext… whichever does not exist yet."""
+    idx = 0
+    while True:
+        path = f"{base}{'' if idx == 0 else f'_{idx}'}{ext}"
+        if not os.path.exists(path):
+            return path
+        idx += 1
+
+
+def _clock(minutes):
+    """Vectorised HH:MM (24h) for a Series of absolute minutes."""
+    m = minutes.astype(float).fillna(0).astype(np.int64)
+    hh = ((m // 60) % 24).astype(str).str.zfill(2)
+    mm = (m % 60).astype(str).str.zfill(2)
+    return hh + ":" + mm
+
+
+def schedule_tables(sched, tasks, weights=None, base_minutes=0):
+    """
+    Return (summary, detail) DataFrames.
+    - summary: one row per job with weight and PROCESS entry/exit.
+    - detail:  one row per scheduled task, ordered by job then start.
+    """
+    weights = weights or {}
+    if sched:
+        keys = list(sched)
+        se = np.asarray([sched[k] for k in keys], dtype=float)
+        info = [tasks[k] for k in keys]
+        detail = pd.DataFrame({
+            "Job ID":      [k[0] for k in keys],
+            "Step":        [k[1] for k in keys],
+            "Type":        [i["type"] for i in info],
+            "Station":     [i.get("station") for i in info],
+            "From":        [i.get("from_st") for i in info],
+            "To":          [i.get("to_st") for i in info],
+            "Start (min)": se[:, 0],
+            "End (min)":   se[:, 1],
+        })
+    else:
+        detail = pd.DataFrame(columns=["Job ID", "Step", "Type", "Station", "From", "To",
+                                       "Start (min)", "End (min)"])
+    split = detail["Job ID"].astype(str).str.rsplit("_", n=1)
+    detail.insert(1, "Op", split.str[0])
+    detail.insert(2, "Run", pd.to_numeric(split.str[1], errors="coerce"))
+    detail["Duration"] = detail["End (min)"] - detail["Start (min)"]
+    detail["Start (clock)"] = _clock(detail["Start (min)"] + base_minutes)
+    detail["End (clock)"]   = _clock(detail["End (min)"] + base_minutes)
+    detail = detail.sort_values(["Job ID", "Start (min)", "Step"], kind="stable",
+                                ignore_index=True)
+
+    # entry/exit from PROCESS tasks only; jobs without one report 0 as before
+    procs = detail[detail["Type"] == "PROCESS"]
+    spans = procs.groupby("Job ID").agg(entry=("Start (min)", "min"),
+                                        exit_=("End (min)", "max"))
+    jobs = pd.Index(sorted(detail["Job ID"].unique()), name="Job ID")
+    spans = spans.reindex(jobs).fillna(0.0)
+    ops = pd.Series(jobs, index=jobs).str.rsplit("_", n=1).str[0]
+    summary = pd.DataFrame({
+        "Job ID":        jobs,
+        "Weight":        ops.map(lambda op: weights.get(op, 1.0)).to_numpy(),
+        "Entry (min)":   spans["entry"].to_numpy(),
+        "Entry (clock)": _clock(spans["entry"] + base_minutes).to_numpy(),
+        "Exit (min)":    spans["exit_"].to_numpy(),
+        "Exit (clock)":  _clock(spans["exit_"] + base_minutes).to_numpy(),
+    })
+    return summary, detail
+
+
+# ----------------------------------------------------------------------------
+# -- Writers
+# ----------------------------------------------------------------------------
+
+def _py(v):
+    # openpyxl wants plain Python scalars; NaN/None become empty cells
+    if v is None or (isinstance(v, float) and np.isnan(v)):
+        return None
+    return v.item() if isinstance(v, np.generic) else v
+
+
+def _write_xlsx(path, sheets):
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)   # rows are streamed, not kept as cell objects
+    for name, df in sheets:
+        ws = wb.create_sheet(name)
+        ws.append(list(df.columns))
+        for row in df.itertuples(index=False, name=None):
+            ws.append([_py(v) for v in row])
+    wb.save(path)
+    return [path]
+
+
+def _write_csv(path, sheets):
+    stem, _ = os.path.splitext(path)
+    out = []
+    for i, (name, df) in enumerate(sheets):
+        p = path if i == 0 else f"{stem}_{name.lower()}.csv"
+        df.to_csv(p, index=False, chunksize=CHUNK_ROWS)
+        out.append(p)
+    return out
+
+
+def _arrow():
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError("Parquet/Arrow export needs the 'pyarrow' package") from e
+    return pa
+
+
+def _write_arrow(path, sheets, parquet):
+    pa = _arrow()
+    stem, ext = os.path.splitext(path)
+    out = []
+    for i, (name, df) in enumerate(sheets):
+        p = path if i == 0 else f"{stem}_{name.lower()}{ext}"
+        # convert CHUNK_ROWS rows at a time: never a full Arrow copy of the sheet
+        schema = pa.Schema.from_pandas(df.iloc[:CHUNK_ROWS], preserve_index=False)
+        if parquet:
+            import pyarrow.parquet as pq
+            writer = pq.ParquetWriter(p, schema)
+        else:
+            import pyarrow.ipc as ipc
+            writer = ipc.new_file(p, schema)
+        with writer:
+            for start in range(0, max(len(df), 1), CHUNK_ROWS):
+                chunk = df.iloc[start:start + CHUNK_ROWS]
+                writer.write_batch(pa.RecordBatch.from_pandas(
+                    chunk, schema=schema, preserve_index=False))
+        out.append(p)
+    return out
+
+
+def export_schedule(sched, tasks, path, weights=None, base_minutes=0, detail=True):
+    """
+    Write the schedule to path; the format follows the extension (see FORMATS).
+    Returns the list of files written.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"Unsupported export format {ext!r}; use one of {', '.join(FORMATS)}")
+    summary, tasks_df = schedule_tables(sched, tasks, weights, base_minutes)
+    sheets = [("Schedule", summary)] + ([("Tasks", tasks_df)] if detail else [])
+    if ext == ".xlsx":
+        return _write_xlsx(path, sheets)
+    if ext == ".csv":
+        return _write_csv(path, sheets)
+    return _write_arrow(path, sheets, parquet=(ext == ".parquet"))
+
+
+def export_async(sched, tasks, path, on_done, **kwargs):
+    """
+    Run export_schedule on a worker thread; on_done(paths, error) is called
+    from that thread when it finishes (error is None on success).
+    """
+    def run():
+        try:
+            paths = export_schedule(sched, tasks, path, **kwargs)
+        except Exception as e:
+            on_done(None, e)
+        else:
+            on_done(paths, None)
+
+    t = threading.Thread(target=run, name="export", daemon=True)
+    t.start()
+    return t
@@ -0,0 +1,282 @@
+# scheduler/flightbar.py
+"""
+Headless FlightBar JSON pipeline.
+
+    python -m Scheduler.flightbar batch  D:/flightbars            # every *.json once
+    python -m Scheduler.flightbar watch  D:/flightbars --debounce 5
+
+- Each <name>.json is solved and written next to it as <name>_schedule.xlsx.
+- Inputs are fingerprinted by content (sha256); a file whose content and
+  output are unchanged since the last run is skipped.  Fingerprints live in
+  .flightbar_state.json in the same folder.
+- watch mode polls the folder and only starts once a file has stopped
+  changing for `debounce` seconds, so a copy in progress is never read.
+- flightBars are read one object at a time; the file is never loaded whole.
+- Solves run one after another with a capped number of CP-SAT threads, at
+  lowered process priority, so the line PC stays responsive.
+"""
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+from .history import file_hash
+
+__all__ = ["iter_flightbars", "flightbar_problem", "process_file", "process_dir",
+           "watch", "output_path"]
+
+STATE_FILE = ".flightbar_state.json"
+OUTPUT_SUFFIX = "_schedule"
+# default CP-SAT threads: leave half the machine to everything else
+DEFAULT_THREADS = max(1, multiprocessing.cpu_count() // 2)
+
+_decoder = json.JSONDecoder()
+
+
+def iter_flightbars(path, key="flightBars", chunk=1 << 16):
+    """
+    Yield each object of the top-level `key` array of a JSON file, reading
+    `chunk` characters at a time.
+    """
+    with open(path, "r", encoding="utf-8-sig") as f:
+        buf, pos, eof = "", 0, False
+
+        def more():
+            nonlocal buf, pos, eof
+            data = f.read(chunk)
+            if not data:
+                eof = True
+            buf = buf[pos:] + data      # drop what was already consumed
+            pos = 0
+
+        # find  "flightBars" : [
+        marker = f'"{key}"'
+        while True:
+            i = buf.find(marker, pos)
+            if i >= 0:
+                pos = i + len(marker)
+                break
+            if eof:
+                return
+            pos = max(pos, len(buf) - len(marker))
+            more()
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n:":
+                pos += 1
+            if pos < len(buf):
+                break
+            if eof:
+                return
+            more()
+        if buf[pos] != "[":
+            return
+        pos += 1
+
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buf):
+                if eof:
+                    raise ValueError(f"{path}: unterminated {key} array")
+                more()
+                continue
+            if buf[pos] == "]":
+                return
+            try:
+                obj, end = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                more()
+                continue
+            pos = end
+            yield obj
+
+
+def flightbar_problem(path, operations_dict):
+    """
+    (counts, weights) from a FlightBar file: one run per flight bar whose
+    kNumber is a known operation; weight is its efficiency (last one wins).
+    """
+    counts, weights = {}, {}
+    for fb in iter_flightbars(path):
+        k = fb.get("kNumber")
+        if not k or k not in operations_dict:
+            continue
+        counts[k] = counts.get(k, 0) + 1
+        weights[k] = fb.get("efficiency", 1.0)
+    return counts, weights
+
+
+def output_path(path, ext=".xlsx"):
+    stem, _ = os.path.splitext(path)
+    return f"{stem}{OUTPUT_SUFFIX}{ext}"
+
+
+def _lower_priority():
+    # best effort; a failure just leaves the normal priority
+    try:
+        if sys.platform == "win32":
+            import ctypes
+            BELOW_NORMAL_PRIORITY_CLASS = 0x4000
+            ctypes.windll.kernel32.SetPriorityClass(
+                ctypes.windll.kernel32.GetCurrentProcess(), BELOW_NORMAL_PRIORITY_CLASS)
+        else:
+            os.nice(10)
+    except Exception:
+        pass
+
+
+class _Context:
+    # static data and settings shared by every file of one batch/watch session
+    def __init__(self, horizon, operators, time_limit, threads, ext):
+        from .load_data import load_data
+        from Data.universal_variable import DEFAULT_HORIZON
+        self.sd, self.ops = load_data()
+        self.caps = {st: 1 for st in self.sd if st not in ("S", "FIN")}
+        self.caps["S"] = operators
+        self.horizon = horizon or DEFAULT_HORIZON
+        self.time_limit = time_limit
+        self.threads = threads
+        self.ext = ext
+
+
+def process_file(path, ctx, log=print):
+    """Solve one FlightBar file and export next to it; returns the output path or None."""
+    from .model import solve_throughput_with_earliest
+    from .export import export_schedule
+
+    counts, weights = flightbar_problem(path, ctx.ops)
+    if not counts:
+        log(f"{os.path.basename(path)}: no known flightBars, skipped")
+        return None
+    sched, tasks, _ = solve_throughput_with_earliest(
+        list(counts), ctx.sd, ctx.ops, weights, counts, ctx.horizon, ctx.caps,
+        {"program_start": 0, **{k: 0 for k in counts}},
+        time_limit=ctx.time_limit, num_workers=ctx.threads,
+    )
+    out = output_path(path, ctx.ext)
+    export_schedule(sched, tasks, out, weights=weights)
+    log(f"{os.path.basename(path)}: {len({j for j, _ in sched})} jobs → {os.path.basename(out)}")
+    return out
+
+
+def _load_state(directory):
+    try:
+        with open(os.path.join(directory, STATE_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_state(directory, state):
+    tmp = os.path.join(directory, STATE_FILE + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=1)
+    os.replace(tmp, os.path.join(directory, STATE_FILE))
+
+
+def _inputs(directory, pattern):
+    return sorted(p for p in glob.glob(os.path.join(directory, pattern))
+                  if not os.path.basename(p).startswith("."))
+
+
+def _process_if_changed(path, ctx, state, log):
+    """(processed, output path or None); unchanged files are not processed again."""
+    name = os.path.basename(path)
+    digest = file_hash(path)
+    prev = state.get(name, {})
+    # a recorded failure (output None) stands until the file changes; a
+    # recorded output only while it is still on disk
+    if prev.get("sha256") == digest and "output" in prev and (
+            prev["output"] is None or os.path.exists(prev["output"])):
+        return False, None
+    try:
+        out = process_file(path, ctx, log)
+    except Exception as e:
+        log(f"{name}: failed: {e}")
+        out = None
+    # failures are remembered too, so a bad file is not retried until it changes
+    state[name] = {"sha256": digest, "output": out, "processed": time.time()}
+    return True, out
+
+
+def process_dir(directory, pattern="*.json", horizon=None, operators=1, time_limit=None,
+                threads=DEFAULT_THREADS, ext=".xlsx", log=print):
+    """Process every changed input in directory once; returns how many were solved."""
+    from Data.universal_variable import Timespan
+    _lower_priority()
+    ctx = _Context(horizon, operators, time_limit or Timespan, threads, ext)
+    state, n = _load_state(directory), 0
+    for path in _inputs(directory, pattern):
+        processed, out = _process_if_changed(path, ctx, state, log)
+        if processed:
+            n += out is not None
+            _save_state(directory, state)
+    return n
+
+
+def watch(directory, pattern="*.json", poll=2.0, debounce=3.0, horizon=None, operators=1,
+          time_limit=None, threads=DEFAULT_THREADS, ext=".xlsx", stop=None, log=print):
+    """
+    Re-solve inputs as they appear or change, until `stop` (a threading.Event)
+    is set.  A file is processed once its size and mtime have not changed for
+    `debounce` seconds.
+    """
+    from Data.universal_variable import Timespan
+    _lower_priority()
+    ctx = _Context(horizon, operators, time_limit or Timespan, threads, ext)
+    state = _load_state(directory)
+    stop = stop or threading.Event()
+    seen = {}           # path → ((mtime, size), first time seen with that signature)
+    log(f"watching {os.path.abspath(directory)} for {pattern}")
+    while not stop.is_set():
+        now = time.time()
+        current = set()
+        for path in _inputs(directory, pattern):
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            current.add(path)
+            sig = (st.st_mtime, st.st_size)
+            if path not in seen or seen[path][0] != sig:
+                seen[path] = (sig, now)         # still being written: restart its clock
+                continue
+            if seen[path][1] is not None and now - seen[path][1] >= debounce:
+                seen[path] = (sig, None)        # settled; handled until it changes again
+                if _process_if_changed(path, ctx, state, log)[0]:
+                    _save_state(directory, state)
+        for gone in set(seen) - current:
+            del seen[gone]
+        stop.wait(poll)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Headless FlightBar JSON scheduling")
+    ap.add_argument("mode", choices=("batch", "watch"))
+    ap.add_argument("directory")
+    ap.add_argument("--pattern", default="*.json")
+    ap.add_argument("--time-limit", type=float, default=None)
+    ap.add_argument("--operators", type=int, default=1)
+    ap.add_argument("--horizon", type=int, default=None, help="minutes")
+    ap.add_argument("--threads", type=int, default=DEFAULT_THREADS,
+                    help="CP-SAT threads per solve")
+    ap.add_argument("--format", default=".xlsx", choices=(".xlsx", ".csv", ".parquet", ".arrow"))
+    ap.add_argument("--poll", type=float, default=2.0)
+    ap.add_argument("--debounce", type=float, default=3.0)
+    args = ap.parse_args()
+    common = dict(pattern=args.pattern, horizon=args.horizon, operators=args.operators,
+                  time_limit=args.time_limit, threads=args.threads, ext=args.format)
+    if args.mode == "batch":
+        n = process_dir(args.directory, **common)
+        print(f"solved {n} file(s)")
+    else:
+        try:
+            watch(args.directory, poll=args.poll, debounce=args.debounce, **common)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,130 @@
+# scheduler/history.py
+"""
+Historical order-book loading for history replays and tests.
+
+- read_history() parses an Excel/CSV history once and keeps a columnar copy
+  under cache/history/, keyed by the file's content hash, so re-imports skip
+  the Excel parse entirely.
+- Column-name variants ("Sequnce label", "sequence_label", a BOM on "Date"…)
+  are normalised to "Date" and "Sequence label".
+- iter_day_problems() groups dates and labels in one pass and yields each
+  day's {op: runs} lazily.
+"""
+import hashlib
+import itertools
+import os
+import re
+
+import pandas as pd
+
+__all__ = ["read_history", "iter_day_problems", "day_counts", "file_hash"]
+
+CACHE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "cache", "history"))
+
+# normalised header → canonical column
+_COLUMNS = {
+    "date":          "Date",
+    "day":           "Date",
+    "sequencelabel": "Sequence label",
+    "sequncelabel":  "Sequence label",
+    "seqlabel":      "Sequence label",
+    "sequence":      "Sequence label",
+    "knumber":       "Sequence label",
+}
+
+
+def _norm(name):
+    return re.sub(r"[^a-z]", "", str(name).lower())
+
+
+def file_hash(path, chunk=1 << 20):
+    """sha256 of a file's contents, read in 1 MiB chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _normalise(df):
+    renamed = {}
+    for col in df.columns:
+        canon = _COLUMNS.get(_norm(col))
+        if canon and canon not in renamed.values():
+            renamed[col] = canon
+    df = df.rename(columns=renamed)
+    missing = {"Date", "Sequence label"} - set(df.columns)
+    if missing:
+        raise ValueError(f"History file is missing column(s): {', '.join(sorted(missing))}")
+    df = df[["Date", "Sequence label"]].dropna()
+    if not pd.api.types.is_datetime64_any_dtype(df["Date"]):
+        # UK exports: 01/03/2024 is the 1st of March
+        df["Date"] = pd.to_datetime(df["Date"], dayfirst=True)
+    df["Date"] = df["Date"].dt.date
+    df["Sequence label"] = df["Sequence label"].astype(str).str.strip()
+    return df.reset_index(drop=True)
+
+
+def _parse(path):
+    if path.lower().endswith((".xlsx", ".xls")):
+        return pd.read_excel(path)
+    return pd.read_csv(path, encoding="utf-8-sig")
+
+
+def _cache_paths(digest):
+    return (os.path.join(CACHE_DIR, f"{digest}.parquet"),
+            os.path.join(CACHE_DIR, f"{digest}.pkl"))
+
+
+def read_history(path, use_cache=True):
+    """
+    DataFrame with columns Date (datetime.date) and Sequence label (str).
+    """
+    digest = file_hash(path) if use_cache else None
+    if digest:
+        for cached in _cache_paths(digest):
+            if os.path.exists(cached):
+                try:
+                    df = (pd.read_parquet(cached) if cached.endswith(".parquet")
+                          else pd.read_pickle(cached))
+                    df["Date"] = pd.to_datetime(df["Date"]).dt.date
+                    return df
+                except Exception:
+                    # unreadable cache entry: fall back to the source file
+                    pass
+
+    df = _normalise(_parse(path))
+
+    if digest:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        parquet, pickle = _cache_paths(digest)
+        try:
+            df.assign(Date=pd.to_datetime(df["Date"])).to_parquet(parquet, index=False)
+        except Exception:
+            # no parquet engine installed: a pickle is still far faster than Excel
+            df.to_pickle(pickle)
+    return df
+
+
+def _ordered(counts):
+    # descending count, like Series.value_counts()
+    return dict(sorted(counts.items(), key=lambda kv: -kv[1]))
+
+
+def iter_day_problems(source):
+    """
+    Yield (date, {op: runs}) in date order, one day at a time, from a single
+    groupby over the whole frame.  source is a history path or a DataFrame
+    from read_history().
+    """
+    df = read_history(source) if isinstance(source, (str, os.PathLike)) else source
+    sizes = df.groupby(["Date", "Sequence label"], sort=True).size()
+    for day, rows in itertools.groupby(sizes.items(), key=lambda kv: kv[0][0]):
+        counts = {op: int(n) for (_, op), n in rows if n > 0}
+        if counts:
+            yield day, _ordered(counts)
+
+
+def day_counts(df):
+    """{date: {op: runs}} for every date in the history."""
+    return dict(iter_day_problems(df))
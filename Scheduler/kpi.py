@@ -0,0 +1,279 @@
+# scheduler/kpi.py
+"""
+Schedule KPIs computed with NumPy over flat task arrays.
+
+One definition for every report:
+
+- throughput           jobs in the schedule
+- weighted_throughput  the same, each job counted with its op weight
+- total_runtime        first PROCESS start → last PROCESS end (minutes)
+- makespan             last task end, from time 0
+- mean_flow / max_flow per-job first start → last end
+
+batch_kpis() takes any number of schedules at once and computes all of them
+with grouped reductions over one concatenated array, so summarising
+thousands of history days costs little more than building the arrays.
+
+Per-schedule detail: job_table(), station_utilisation(), idle_gaps() and
+occupancy curves for the D-line, the operators (S) and work in progress.
+"""
+import numpy as np
+import pandas as pd
+
+__all__ = [
+    "ScheduleArrays",
+    "schedule_arrays",
+    "kpis",
+    "batch_kpis",
+    "KPI_COLUMNS",
+    "job_table",
+    "station_utilisation",
+    "idle_gaps",
+    "occupancy",
+    "line_occupancy",
+    "wip_curve",
+]
+
+KPI_COLUMNS = ["throughput", "weighted_throughput", "total_runtime", "makespan",
+               "mean_flow", "max_flow"]
+
+
+class ScheduleArrays:
+    """
+    Flat, index-aligned arrays for every scheduled task of one or more schedules.
+    - sched_idx: which schedule a task belongs to
+    - job:       global job code (index into .job_ids); .job_sched maps it back
+    - step:      task index within its job
+    - start/end: minutes
+    - kind, station, from_st, to_st: object arrays from the task metadata
+    """
+    def __init__(self, **kw):
+        self.__dict__.update(kw)
+
+    def __len__(self):
+        return len(self.start)
+
+
+def schedule_arrays(schedules):
+    """
+    Build ScheduleArrays from an iterable of (sched, all_tasks) pairs.
+    """
+    sched_idx, job, step, start, end = [], [], [], [], []
+    kind, station, from_st, to_st = [], [], [], []
+    job_ids, job_sched, codes = [], [], {}
+    n = 0
+    for n, (sched, tasks) in enumerate(schedules, start=1):
+        i = n - 1
+        for (jid, idx), (s, e) in sched.items():
+            code = codes.get((i, jid))
+            if code is None:
+                code = codes[(i, jid)] = len(job_ids)
+                job_ids.append(jid)
+                job_sched.append(i)
+            info = tasks[(jid, idx)]
+            sched_idx.append(i)
+            job.append(code)
+            step.append(idx)
+            start.append(s)
+            end.append(e)
+            kind.append(info["type"])
+            station.append(info.get("station"))
+            from_st.append(info.get("from_st"))
+            to_st.append(info.get("to_st"))
+    obj = lambda xs: np.asarray(xs, dtype=object)
+    return ScheduleArrays(
+        n_schedules = n,
+        sched_idx   = np.asarray(sched_idx, dtype=np.int64),
+        job         = np.asarray(job, dtype=np.int64),
+        step        = np.asarray(step, dtype=np.int64),
+        start       = np.asarray(start, dtype=float),
+        end         = np.asarray(end, dtype=float),
+        kind        = obj(kind),
+        station     = obj(station),
+        from_st     = obj(from_st),
+        to_st       = obj(to_st),
+        job_ids     = obj(job_ids),
+        job_sched   = np.asarray(job_sched, dtype=np.int64),
+    )
+
+
+def _op(job_ids):
+    return np.asarray([j.rsplit("_", 1)[0] for j in job_ids], dtype=object)
+
+
+def _group_min(keys, values, n, empty=np.nan):
+    out = np.full(n, np.inf)
+    np.minimum.at(out, keys, values)
+    out[np.isinf(out)] = empty
+    return out
+
+
+def _group_max(keys, values, n, empty=np.nan):
+    out = np.full(n, -np.inf)
+    np.maximum.at(out, keys, values)
+    out[np.isinf(out)] = empty
+    return out
+
+
+def batch_kpis(schedules, weights=None, arrays=None):
+    """
+    DataFrame with one row of KPI_COLUMNS per (sched, all_tasks) pair, in order.
+    Empty schedules give 0 throughput/runtime and NaN flow times.
+    - weights: {op: weight} for weighted_throughput (default 1.0)
+    - arrays:  prebuilt ScheduleArrays for the same schedules
+    """
+    a = arrays if arrays is not None else schedule_arrays(schedules)
+    n, n_jobs = a.n_schedules, len(a.job_ids)
+    weights = weights or {}
+
+    # per job
+    job_start = _group_min(a.job, a.start, n_jobs)
+    job_end   = _group_max(a.job, a.end, n_jobs)
+    flow      = job_end - job_start
+    w_job     = np.asarray([weights.get(op, 1.0) for op in _op(a.job_ids)], dtype=float)
+
+    # per schedule
+    throughput = np.bincount(a.job_sched, minlength=n)
+    weighted   = np.bincount(a.job_sched, weights=w_job, minlength=n)
+    proc = a.kind == "PROCESS"
+    run_start = _group_min(a.sched_idx[proc], a.start[proc], n)
+    run_end   = _group_max(a.sched_idx[proc], a.end[proc], n)
+    total_runtime = np.nan_to_num(run_end - run_start, nan=0.0)
+    makespan  = np.nan_to_num(_group_max(a.sched_idx, a.end, n), nan=0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_flow = np.bincount(a.job_sched, weights=flow, minlength=n) / throughput
+    max_flow  = _group_max(a.job_sched, flow, n)
+
+    return pd.DataFrame({
+        "throughput":          throughput,
+        "weighted_throughput": weighted,
+        "total_runtime":       total_runtime,
+        "makespan":            makespan,
+        "mean_flow":           mean_flow,
+        "max_flow":            max_flow,
+    }, columns=KPI_COLUMNS)
+
+
+def kpis(sched, all_tasks, weights=None):
+    """KPI_COLUMNS of one schedule as a plain dict."""
+    row = batch_kpis([(sched, all_tasks)], weights).iloc[0]
+    return {k: (int(v) if k == "throughput" else float(v)) for k, v in row.items()}
+
+
+def job_table(sched, all_tasks, arrays=None):
+    """
+    DataFrame, one row per job: Job ID, Op, Run, Start/End (all tasks),
+    Entry/Exit (PROCESS tasks only; NaN if it has none) and Flow.
+    """
+    a = arrays if arrays is not None else schedule_arrays([(sched, all_tasks)])
+    n_jobs = len(a.job_ids)
+    proc = a.kind == "PROCESS"
+    start = _group_min(a.job, a.start, n_jobs)
+    end   = _group_max(a.job, a.end, n_jobs)
+    split = [j.rsplit("_", 1) for j in a.job_ids]
+    df = pd.DataFrame({
+        "Job ID": a.job_ids,
+        "Op":     [s[0] for s in split],
+        "Run":    [int(s[1]) if len(s) > 1 and s[1].isdigit() else -1 for s in split],
+        "Start":  start,
+        "End":    end,
+        "Entry":  _group_min(a.job[proc], a.start[proc], n_jobs),
+        "Exit":   _group_max(a.job[proc], a.end[proc], n_jobs),
+        "Flow":   end - start,
+    })
+    return df.sort_values(["Op", "Run"], ignore_index=True)
+
+
+# ─── resource occupancy ────────────────────────────────────────────────────
+
+def _none_or(arr, *names):
+    # elementwise "is None or one of names" for object arrays
+    out = np.equal(arr, None)
+    for n in names:
+        out |= arr == n
+    return out
+
+
+def _station_mask(a):
+    """(station name per task, mask) for tasks that occupy a station, as in build_model."""
+    proc_at = (a.kind == "PROCESS") & ~_none_or(a.station, "S", "FIN")
+    move_in = (a.kind == "MOVE") & ~_none_or(a.to_st, "S", "FIN")
+    name = np.where(proc_at, a.station, a.to_st)
+    return name, proc_at | move_in
+
+
+def _line_mask(a, prefix):
+    starts = np.fromiter((isinstance(f, str) and f.startswith(prefix) for f in a.from_st),
+                         dtype=bool, count=len(a))
+    return (a.kind == "MOVE") & starts
+
+
+def station_utilisation(sched, all_tasks, horizon=None, arrays=None):
+    """
+    {station: busy fraction of the window}.  The window is 0 → horizon, or
+    0 → makespan when no horizon is given.
+    """
+    a = arrays if arrays is not None else schedule_arrays([(sched, all_tasks)])
+    if not len(a):
+        return {}
+    span = horizon or float(a.end.max()) or 1.0
+    name, mask = _station_mask(a)
+    names, inv = np.unique(name[mask].astype(str), return_inverse=True)
+    busy = np.bincount(inv, weights=(a.end - a.start)[mask], minlength=len(names))
+    return {str(st): float(b / span) for st, b in zip(names, busy)}
+
+
+def idle_gaps(sched, all_tasks, min_gap=0.0, arrays=None):
+    """
+    {station: (n, 2) array of idle [start, end) gaps between its busy periods}.
+    Gaps shorter than min_gap minutes are dropped.
+    """
+    a = arrays if arrays is not None else schedule_arrays([(sched, all_tasks)])
+    name, mask = _station_mask(a)
+    out = {}
+    st_names = name[mask].astype(str)
+    s, e = a.start[mask], a.end[mask]
+    for st in np.unique(st_names):
+        sel = st_names == st
+        order = np.argsort(s[sel], kind="stable")
+        ss, ee = s[sel][order], e[sel][order]
+        # running max of ends, so overlapping busy periods merge
+        reach = np.maximum.accumulate(ee)
+        gap_start, gap_end = reach[:-1], ss[1:]
+        keep = gap_end - gap_start > max(min_gap, 0.0)
+        out[str(st)] = np.column_stack([gap_start[keep], gap_end[keep]])
+    return out
+
+
+def occupancy(starts, ends, times):
+    """How many [start, end) intervals are active at each of `times`."""
+    starts = np.sort(np.asarray(starts, dtype=float))
+    ends   = np.sort(np.asarray(ends, dtype=float))
+    times  = np.asarray(times, dtype=float)
+    return (np.searchsorted(starts, times, side="right")
+            - np.searchsorted(ends, times, side="right"))
+
+
+def _grid(a, step):
+    top = float(a.end.max()) if len(a) else 0.0
+    return np.arange(0.0, top + step, step)
+
+
+def line_occupancy(sched, all_tasks, line="S", step=1.0, arrays=None):
+    """
+    (times, counts): concurrent moves on the D-line (line="D") or by the
+    operators (line="S"), sampled every `step` minutes.
+    """
+    a = arrays if arrays is not None else schedule_arrays([(sched, all_tasks)])
+    mask = _line_mask(a, line)
+    times = _grid(a, step)
+    return times, occupancy(a.start[mask], a.end[mask], times)
+
+
+def wip_curve(sched, all_tasks, step=1.0, arrays=None):
+    """(times, jobs in progress) sampled every `step` minutes."""
+    a = arrays if arrays is not None else schedule_arrays([(sched, all_tasks)])
+    n_jobs = len(a.job_ids)
+    times = _grid(a, step)
+    return times, occupancy(_group_min(a.job, a.start, n_jobs),
+                            _group_max(a.job, a.end, n_jobs), times)
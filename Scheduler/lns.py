@@ -0,0 +1,263 @@
+# scheduler/lns.py
+"""
+Large-neighbourhood search around the CP-SAT model, for mixes too big for
+one monolithic solve to make steady progress.
+
+    sched, tasks, horizon = solve_model(built, time_limit=120, search="lns")
+
+A short plain solve gives the first incumbent.  Then, until the time limit:
+
+1. pick a neighbourhood kind (roulette over adaptive weights):
+   - "op":      the runs of one operation
+   - "window":  the jobs running around a random moment
+   - "station": the jobs using one station, the D-line or the operators
+   each also frees a few currently unscheduled jobs that could be inserted;
+2. fix every other job to the incumbent (presence, and start for jobs that
+   run), hint the incumbent and re-solve with a short limit;
+3. keep the result if it is at least as good.
+
+Each kind is tried once, then picked in proportion to its recent reward:
+the relative objective gain per second of solving (a moving average, with a
+floor so that no kind starves).  Each kind also tunes its own size: a
+neighbourhood solved to optimality without gain grows, one that hits the
+sub-limit shrinks.
+"""
+import math
+import random
+import time
+
+from ortools.sat.python import cp_model
+
+from .tasks import task_resources
+from .model import extract_schedule, _new_solver, _phase_report, _throughput_gap
+
+__all__ = ["solve_lns", "NEIGHBOURHOODS"]
+
+NEIGHBOURHOODS = ("op", "window", "station")
+SUB_TIME_LIMIT = 2.0        # seconds per neighbourhood solve
+INITIAL_SHARE = 0.15        # share of the time limit for the first incumbent
+WEIGHT_FLOOR = 0.05         # least pick weight of a kind, relative to the best
+
+
+class _Arm:
+    """Adaptive state of one neighbourhood kind."""
+    def __init__(self, **kw):
+        self.weight  = 0.0      # moving average of relative gain per second
+        self.size    = 0.2      # fraction of the jobs it frees
+        self.tries   = 0
+        self.wins    = 0
+        self.gain    = 0.0      # summed relative gain
+        self.seconds = 0.0      # summed solve time
+        self.__dict__.update(kw)
+
+
+class _Relay:
+    """
+    Stands in for the current CpSolver towards on_solver, so that a stop
+    request ends the whole search rather than one neighbourhood solve.
+    """
+    def __init__(self, time_limit):
+        self.parameters = type("Params", (), {"max_time_in_seconds": time_limit})()
+        self.solver  = None
+        self.stopped = False
+
+    def stop_search(self):
+        self.stopped = True
+        solver = self.solver
+        if solver is not None:
+            # StopSearch() does nothing before Solve() is running
+            solver.parameters.max_time_in_seconds = 0.0
+            solver.StopSearch()
+
+    StopSearch = stop_search
+
+
+def _op(jid):
+    return jid.rsplit("_", 1)[0]
+
+
+def solve_lns(
+    built,
+    time_limit: float,
+    num_workers: int = None,
+    on_solver=None,
+    progress=None,
+    on_schedule=None,
+    schedule_interval: float = 1.0,
+    report: dict = None,
+    sub_time_limit: float = SUB_TIME_LIMIT,
+    initial_share: float = INITIAL_SHARE,
+    seed: int = 0,
+):
+    """
+    LNS on a ScheduleModel from build_model() with its own (weighted) objective.
+    Same options and return value as solve_model; report additionally gets
+    "search": "lns" and per-kind statistics under "neighbourhoods".
+    """
+    t0 = time.monotonic()
+    elapsed = lambda: time.monotonic() - t0
+    rng = random.Random(seed)
+    model, all_tasks = built.model, built.all_tasks
+    relay = _Relay(time_limit)
+    if on_solver is not None:
+        on_solver(relay)
+    if relay.parameters.max_time_in_seconds <= 0:
+        relay.stopped = True        # cancelled before the search began
+
+    jobs  = list(built.job_presence)
+    n_ops = {jid: len(built.templates[_op(jid)]) for jid in jobs}
+    uses  = {op: {res for e in tpl for res, _ in task_resources(e, built.station_caps)}
+             for op, tpl in built.templates.items()}
+    tracked = [p for p, _ in built.job_presence.values()]
+    tracked += [info[k] for info in all_tasks.values() for k in ("start", "end")]
+    tracked += list(built.finish_vars)
+    presence = {jid: p for jid, (p, _) in built.job_presence.items()}
+
+    def run(m, limit):
+        solver = _new_solver(limit, num_workers, None)
+        relay.solver = solver
+        if relay.stopped:
+            # stopped between the last check and the attach above
+            solver.parameters.max_time_in_seconds = 0.0
+        st = solver.Solve(m)
+        relay.solver = None
+        return solver, st
+
+    def post(ev):
+        if progress is not None:
+            progress({**ev, "elapsed": elapsed(), "time_limit": time_limit})
+
+    last_snap = [None]
+
+    def publish():
+        # same events as model._SolutionCallback, snapshots throttled alike
+        post({"objective": inc_obj, "bound": bound,
+              "gap": _throughput_gap(built, inc_obj, bound),
+              "jobs": sum(inc[p.Index()] for p in presence.values()),
+              "jobs_total": len(jobs)})
+        now = elapsed()
+        if on_schedule is not None and (last_snap[0] is None
+                                        or now - last_snap[0] >= schedule_interval):
+            last_snap[0] = now
+            on_schedule(extract_schedule(built, lambda v: inc[v.Index()]), all_tasks, built.horizon)
+
+    post({"jobs": 0, "jobs_total": len(jobs)})
+
+    # ─── first incumbent ────────────────────────────────────────────────────
+    phases = []
+    solver, st = run(model, 0 if relay.stopped else time_limit * initial_share)
+    phases.append(_phase_report("initial", solver, st))
+    if st in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        inc = {v.Index(): solver.Value(v) for v in tracked}
+        inc_obj, bound = solver.ObjectiveValue(), solver.BestObjectiveBound()
+    elif st == cp_model.INFEASIBLE or built.latest_t:
+        # infeasible, or nothing found where some jobs are mandatory: no
+        # empty schedule to start from, so spend the rest on the plain model
+        if st != cp_model.INFEASIBLE and not relay.stopped:
+            solver, st = run(model, time_limit - elapsed())
+            phases.append(_phase_report("fallback", solver, st))
+        if report is not None:
+            report.update(objective="weighted", search="lns", phases=phases)
+        post({"status": solver.StatusName(st)})
+        if st in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return extract_schedule(built, solver.Value), all_tasks, built.horizon
+        if st == cp_model.INFEASIBLE:
+            print("No feasible solution found.")
+        return {}, all_tasks, 0
+    else:
+        # nothing found yet: start from the empty schedule
+        inc = {v.Index(): 0 for v in tracked}
+        inc_obj, bound = 0.0, solver.BestObjectiveBound()
+    if inc_obj:
+        publish()
+
+    # ─── neighbourhoods ─────────────────────────────────────────────────────
+    arms = {name: _Arm() for name in NEIGHBOURHOODS}
+    iterations = improvements = 0
+
+    def span(jid):
+        return (inc[all_tasks[(jid, 0)]["start"].Index()],
+                inc[all_tasks[(jid, n_ops[jid] - 1)]["end"].Index()])
+
+    def neighbourhood(kind, size):
+        present = [j for j in jobs if inc[presence[j].Index()]]
+        absent  = [j for j in jobs if not inc[presence[j].Index()]]
+        k = max(2, int(math.ceil(size * len(jobs))))
+        if kind == "op":
+            op = rng.choice(sorted({_op(j) for j in jobs}))
+            mine = [j for j in jobs if _op(j) == op]
+            rng.shuffle(mine)
+            return set(mine[:k]) | set(rng.sample(absent, min(len(absent), k // 2)))
+        if kind == "window":
+            pool, spare = present, absent
+        else:
+            res = rng.choice(sorted(set().union(*uses.values())))
+            pool  = [j for j in present if res in uses[_op(j)]]
+            spare = [j for j in absent if res in uses[_op(j)]]
+        # jobs nearest a random moment, by distance of their span from it
+        t = rng.uniform(0, built.H_t)
+        dist = lambda j: max(0, span(j)[0] - t, t - span(j)[1])
+        near = sorted(pool, key=lambda j: (dist(j), rng.random()))[:k]
+        return set(near) | set(rng.sample(spare, min(len(spare), max(1, k // 2))))
+
+    while not relay.stopped:
+        left = time_limit - elapsed()
+        if left <= 0.05 or inc_obj >= bound:
+            break
+        untried = [n for n in NEIGHBOURHOODS if not arms[n].tries]
+        if untried:
+            kind = untried[0]
+        else:
+            top = max(a.weight for a in arms.values())
+            kind = rng.choices(NEIGHBOURHOODS, weights=[
+                max(arms[n].weight, WEIGHT_FLOOR * top) or 1.0 for n in NEIGHBOURHOODS])[0]
+        arm = arms[kind]
+        free = neighbourhood(kind, arm.size)
+
+        sub = model.Clone()
+        for jid in jobs:
+            p = presence[jid]
+            on = inc[p.Index()]
+            if jid not in free:
+                sub.Add(p == on)
+                if on:
+                    start = all_tasks[(jid, 0)]["start"]
+                    sub.Add(start == inc[start.Index()])
+        for v in tracked:
+            sub.AddHint(v, inc[v.Index()])
+        solver, st = run(sub, min(sub_time_limit, left))
+        iterations += 1
+        arm.tries += 1
+
+        gain, seconds = 0.0, max(solver.WallTime(), 1e-3)
+        if st in (cp_model.OPTIMAL, cp_model.FEASIBLE) and solver.ObjectiveValue() >= inc_obj:
+            gain = (solver.ObjectiveValue() - inc_obj) / max(abs(inc_obj), 1.0)
+            inc = {v.Index(): solver.Value(v) for v in tracked}
+            inc_obj = solver.ObjectiveValue()
+        if gain > 0:
+            improvements += 1
+            arm.wins += 1
+            publish()
+        # reward by relative gain per second; grow easy neighbourhoods, shrink hard ones
+        arm.gain += gain
+        arm.seconds += seconds
+        arm.weight = 0.7 * arm.weight + 0.3 * gain / seconds
+        if st == cp_model.OPTIMAL and gain <= 0:
+            arm.size = min(0.6, arm.size * 1.2)
+        elif st != cp_model.OPTIMAL:
+            arm.size = max(0.02, arm.size * 0.85)
+
+    status = "OPTIMAL" if inc_obj >= bound else "FEASIBLE"
+    if report is not None:
+        phases.append({"phase": "lns", "status": status, "objective": inc_obj,
+                       "bound": bound, "elapsed": elapsed(),
+                       "iterations": iterations, "improvements": improvements})
+        report.update(
+            objective="weighted", search="lns", phases=phases,
+            neighbourhoods={n: {"tries": a.tries, "wins": a.wins,
+                                "gain": a.gain, "seconds": a.seconds,
+                                "weight": a.weight, "size": a.size}
+                            for n, a in arms.items()},
+        )
+    post({"status": status})
+    return extract_schedule(built, lambda v: inc[v.Index()]), all_tasks, built.horizon
@@ -0,0 +1,128 @@
+# scheduler/makespan.py
+"""
+Bounds for the makespan objective (every requested run, finish as early as
+possible), computed from a built model before the search starts.
+
+- makespan_lower_bound(): no schedule can end earlier than any job's release
+  plus its length, nor earlier than a resource's work divided by its
+  capacity, plus the shortest lead-in before and tail after that work.
+- greedy_schedule(): serial list scheduling, jobs by release then longest
+  first, each placed at the earliest start where its whole rigid chain
+  fits every resource.  Its makespan is the upper bound, and the schedule
+  itself the solver's first hint.
+
+Both work in ticks on a ScheduleModel from Scheduler.model.build_model.
+"""
+import math
+
+from .tasks import task_resources
+
+__all__ = ["makespan_lower_bound", "greedy_schedule", "serial_horizon"]
+
+
+def _durations(built):
+    return {op: [int(math.ceil(e[2] * built.time_unit)) for e in tpl]
+            for op, tpl in built.templates.items()}
+
+
+def _op(jid):
+    return jid.rsplit("_", 1)[0]
+
+
+def serial_horizon(templates, run_counts, earliest=0):
+    """
+    Minutes by which the jobs are certainly done when run one after another
+    from the latest earliest start: a horizon that never cuts off a schedule.
+    """
+    return earliest + sum(sum(e[2] for e in templates[op]) * n for op, n in run_counts.items())
+
+
+def makespan_lower_bound(built):
+    """Lower bound on the makespan in ticks when every job must run."""
+    durs = _durations(built)
+    length = {op: sum(d) for op, d in durs.items()}
+    lb = max((built.job_release[jid] + length[_op(jid)] for jid in built.job_presence), default=0)
+
+    # per resource: earliest possible first use + work / capacity + shortest tail
+    load, cap, head, tail = {}, {}, {}, {}
+    for jid in built.job_presence:
+        op = _op(jid)
+        offset = 0
+        for entry, dur in zip(built.templates[op], durs[op]):
+            if dur > 0:
+                for res, c in task_resources(entry, built.station_caps):
+                    load[res] = load.get(res, 0) + dur
+                    cap[res] = c
+                    head[res] = min(head.get(res, math.inf), built.job_release[jid] + offset)
+                    tail[res] = min(tail.get(res, math.inf), length[op] - offset - dur)
+            offset += dur
+    for res, work in load.items():
+        if cap[res] <= 0:
+            return math.inf     # work on a resource nobody may use
+        lb = max(lb, head[res] + math.ceil(work / cap[res]) + tail[res])
+    return lb
+
+
+def _fits(busy, cap, a, b):
+    """
+    None if one more [a, b) keeps busy's overlap below cap, else the earliest
+    end among the overlapping intervals (the next time anything frees up).
+    """
+    over = [(s, e) for s, e in busy if s < b and a < e]
+    if len(over) < cap:
+        return None
+    # the most intervals active together inside [a, b)
+    points = sorted({max(a, s) for s, _ in over})
+    if max(sum(1 for s, e in over if s <= t < e) for t in points) < cap:
+        return None
+    return min(e for _, e in over)
+
+
+def greedy_schedule(built):
+    """
+    (sched_ticks, makespan_ticks) of a serial list schedule with every job, or
+    (None, None) when one job cannot be placed (capacity 0, horizon, or a
+    latest finish it misses).  sched_ticks[(jid, idx)] = (start, end).
+    """
+    durs = _durations(built)
+    length = {op: sum(d) for op, d in durs.items()}
+    preds = built.precedence.preds if built.precedence else {}
+    rank = {jid: i for i, jid in enumerate(built.precedence.order)} if built.precedence else {}
+    jobs = sorted(built.job_presence,
+                  key=lambda j: (rank.get(j, -1), built.job_release[j], -length[_op(j)], j))
+
+    busy, sched, finish = {}, {}, {}
+    for jid in jobs:
+        op = _op(jid)
+        t = max([built.job_release[jid]] + [finish[b] for b in preds.get(jid, ())])
+        uses = []           # (offset, dur, resource, cap)
+        offset = 0
+        for entry, dur in zip(built.templates[op], durs[op]):
+            if dur > 0:
+                for res, c in task_resources(entry, built.station_caps):
+                    if c <= 0:
+                        return None, None
+                    uses.append((offset, dur, res, c))
+            offset += dur
+        while True:
+            if t + length[op] > built.H_t:
+                return None, None
+            shift = 0
+            for off, dur, res, c in uses:
+                free = _fits(busy.get(res, ()), c, t + off, t + off + dur)
+                if free is not None:
+                    shift = max(1, free - (t + off))
+                    break
+            if not shift:
+                break
+            t += shift
+        lf = built.latest_t.get(op)
+        if lf is not None and t + length[op] > lf:
+            return None, None
+        for off, dur, res, _ in uses:
+            busy.setdefault(res, []).append((t + off, t + off + dur))
+        for idx, dur in enumerate(durs[op]):
+            sched[(jid, idx)] = (t, t + dur)
+            t += dur
+        finish[jid] = t
+    return sched, max(finish.values(), default=0)
@@ -6,6 +6,8 @@ import math
 from ortools.sat.python import cp_model
 from .tasks import build_tasks
 from .load_data import movement_time
+from .precedence import compile_precedence, earliest_bounds
+from .makespan import makespan_lower_bound, greedy_schedule, serial_horizon
 from Data.universal_variable import TIME_UNIT, DEFAULT_HORIZON, Timespan
 from .utils import (
     station_xy,
@@ -16,12 +18,29 @@ from .utils import (
     find_json,
 )
 
-__all__ = ["solve_throughput_with_earliest", "TIME_UNIT"]
+__all__ = ["solve_throughput_with_earliest", "build_model", "solve_model", "extract_schedule",
+           "ScheduleModel", "OBJECTIVES", "SEARCHES", "TIME_UNIT"]
 
 # Expose module‐level default time unit so external scripts can import it
 TIME_UNIT = TIME_UNIT  # ticks per minute as defined in universal_variable
 
-def solve_throughput_with_earliest(
+# "weighted": one solve of throughput * BIGF - total_finish
+# "lexicographic": throughput first, then total finish with throughput fixed
+# "makespan": every requested run, finishing the last one as early as possible
+OBJECTIVES = ("weighted", "lexicographic", "makespan")
+# "cp-sat": one CP-SAT search; "lns": large-neighbourhood search around it
+# (Scheduler.lns), for mixes of hundreds of jobs
+SEARCHES = ("cp-sat", "lns")
+
+class ScheduleModel:
+    """
+    A built (not yet solved) CP-SAT schedule and the handles needed to read it back.
+    """
+    def __init__(self, **kw):
+        self.__dict__.update(kw)
+
+
+def build_model(
     selected_ops,
     stations_dict,
     operations_dict,
@@ -33,29 +52,19 @@ def solve_throughput_with_earliest(
     latest_finishes=None,
     time_unit: int = TIME_UNIT,
     precedence:   dict  = None,
-    time_limit: float = Timespan,            
-
-
 ):
     """
-    CP-SAT schedule with optional earliest-start and latest-finish constraints per operation.
-    Returns (sched, all_tasks_dict, horizon).
-    - sched[(job_id, idx)] = (start_min, end_min)
-    - all_tasks_dict[(job_id, idx)] = metadata dict with 'start','end','interval',...
+    Build the CP-SAT model behind solve_throughput_with_earliest without solving it.
+    Raises PrecedenceError (a ValueError) for precedence naming jobs that are
+    not created or forming a cycle.
+    Returns a ScheduleModel with .model, .all_tasks, .job_presence, .finish_vars,
+    .templates, .run_counts and the horizon in minutes (.horizon) and ticks (.H_t),
+    plus the inputs in ticks: .job_release, .latest_t, .precedence (compiled)
+    and .station_caps.
     """
     # convert horizon minutes → ticks
     H_t = int(round(horizon * time_unit))
     model = cp_model.CpModel()
-    # Create a hash of the problem parameters
-    problem_hash = str(hash((
-        tuple(selected_ops),
-        tuple(sorted(weights.items())),
-        tuple(sorted(max_runs.items())),
-        horizon,
-        tuple(sorted(station_caps.items())),
-        tuple(sorted((earliest_starts or {}).items())),
-        tuple(sorted((latest_finishes or {}).items()))
-    )))
 
     # adjust earliest-start values relative to program start
     program_start = (earliest_starts or {}).get("program_start", 0)
@@ -83,7 +92,19 @@ def solve_throughput_with_earliest(
             minimal = sum(entry[2] for entry in tpl)
             run_counts[op] = int(horizon // minimal) + 1
 
-    all_tasks, job_presence = {}, {}
+    # validated, reduced precedence and the start bounds its chains imply
+    job_lb = {}
+    compiled = compile_precedence(precedence, run_counts) if precedence else None
+    if compiled:
+        op_of = lambda jid: jid.rsplit("_", 1)[0]
+        job_dur = {
+            jid: sum(int(math.ceil(entry[2] * time_unit)) for entry in templates[op_of(jid)])
+            for jid in compiled.order
+        }
+        release = {jid: earliest_t.get(op_of(jid), 0) for jid in compiled.order}
+        job_lb = earliest_bounds(compiled, job_dur, release)
+
+    all_tasks, job_presence, job_release = {}, {}, {}
     station_intervals, move_D, move_S = {}, [], []
 
     # create variables and intervals
@@ -97,11 +118,20 @@ def solve_throughput_with_earliest(
             job_presence[jid] = (p, w)
             if force_presence:
                 model.Add(p == 1)
+            lb = job_lb.get(jid, 0)
+            prefix = lb + sum(int(math.ceil(entry[2] * time_unit)) for entry in tpl) <= H_t
+            if not prefix:
+                # the job (after its predecessor chain) cannot end within the horizon
+                model.Add(p == 0)
+                lb = 0
+            job_release[jid] = max(lb, earliest_t.get(op, 0))
             for idx, entry in enumerate(tpl):
                 tt, stn, dur_min, fr, to, *_ = entry
                 dur_t = int(math.ceil(dur_min * time_unit))
                 name = f"{jid}_t{idx}_{tt}"
-                s = model.NewIntVar(0, H_t - dur_t, f"{name}_s")
+                s = model.NewIntVar(lb, H_t - dur_t, f"{name}_s")
+                if prefix:
+                    lb += dur_t
                 e = model.NewIntVar(0, H_t,        f"{name}_e")
                 iv = model.NewOptionalIntervalVar(s, dur_t, e, p, f"{name}_iv")
 
@@ -142,22 +172,15 @@ def solve_throughput_with_earliest(
                 nxt  = all_tasks[(jid, idx + 1)]
                 model.Add(nxt["start"] == curr["end"]).OnlyEnforceIf(p)
     # ─── USER-DEFINED PRECEDENCE ────────────────────────────────────────────
-    # precedence: { "K01_0": ["K09_0","K15_1"], ... }
-    for jid, preds in (precedence or {}).items():
-        # make sure this job actually got created
-        idxs = [i for (j,i) in all_tasks if j == jid]
-        if not idxs:
-            continue
-        first_idx = min(idxs)
-        s_jid = all_tasks[(jid, first_idx)]["start"]
-        p_jid = all_tasks[(jid, first_idx)]["pres"]
+    # precedence: { "K01_0": ["K09_0","K15_1"], ... }, already validated and
+    # transitively reduced; a job only runs if its predecessors do
+    for jid, preds in (compiled.preds if compiled else {}).items():
+        s_jid = all_tasks[(jid, 0)]["start"]
+        p_jid = all_tasks[(jid, 0)]["pres"]
         for before_jid in preds:
-            # skip any before_jid that isn't scheduled
-            before_idxs = [i for (j,i) in all_tasks if j == before_jid]
-            if not before_idxs:
-                continue
-            last_idx = max(before_idxs)
+            last_idx = len(templates[before_jid.rsplit("_", 1)[0]]) - 1
             e_before = all_tasks[(before_jid, last_idx)]["end"]
+            model.AddImplication(p_jid, all_tasks[(before_jid, 0)]["pres"])
             model.Add(s_jid >= e_before).OnlyEnforceIf(p_jid)
     # station capacities
     for stn, ivs in station_intervals.items():
@@ -187,40 +210,386 @@ def solve_throughput_with_earliest(
     throughput = sum(p * w for p, w in job_presence.values())
     total_finish = sum(finish_vars)
     model.Maximize(throughput * BIGF - total_finish)
+
+    return ScheduleModel(
+        model        = model,
+        all_tasks    = all_tasks,
+        job_presence = job_presence,
+        job_release  = job_release,
+        latest_t     = latest_t,
+        precedence   = compiled,
+        station_caps = station_caps,
+        finish_vars  = finish_vars,
+        templates    = templates,
+        run_counts   = run_counts,
+        throughput   = throughput,
+        total_finish = total_finish,
+        bigf         = BIGF,
+        horizon      = horizon,
+        H_t          = H_t,
+        time_unit    = time_unit,
+    )
+
+
+def extract_schedule(built, value):
+    """
+    Read sched[(job_id, idx)] = (start_min, end_min) for every present task.
+    - value: solver.Value, or a solution callback's Value while inside it.
+    """
+    sched = {}
+    for (jid, idx), info in built.all_tasks.items():
+        if value(info["pres"]):
+            sched[(jid, idx)] = (
+                value(info["start"]) / built.time_unit,
+                value(info["end"]) / built.time_unit,
+            )
+    return sched
+
+
+def _relative_gap(objective, bound):
+    scale = max(abs(objective), abs(bound))
+    return abs(bound - objective) / scale if scale > 0 else 0.0
+
+
+def _throughput_gap(built, objective, bound):
+    """
+    Relative gap of the throughput inside the weighted objective
+    throughput * bigf - total_finish (total_finish < bigf): the raw gap is
+    ~1% as soon as the finish sum is in play, whatever the throughput.
+    """
+    thr = math.ceil(objective / built.bigf - 1e-9)
+    thr_bound = math.ceil(bound / built.bigf - 1e-9)
+    return _relative_gap(thr, thr_bound)
+
+
+class _SolutionCallback(cp_model.CpSolverSolutionCallback):
+    """
+    Runs on the solver thread for every improving solution: reports progress
+    events and, at most every schedule_interval seconds, a schedule snapshot.
+    gap(objective, bound) gives the event's "gap"; None leaves it out.
+    """
+    def __init__(self, built, time_limit, progress=None, on_schedule=None,
+                 schedule_interval=1.0, phase=None, offset=0.0, gap=None):
+        super().__init__()
+        self._built      = built
+        self._time_limit = time_limit
+        self._progress   = progress
+        self._on_schedule = on_schedule
+        self._interval   = schedule_interval
+        self._last_snap  = None
+        self._presence   = [p for p, _ in built.job_presence.values()]
+        self._phase      = phase
+        self._offset     = offset     # seconds spent in earlier phases
+        self._gap        = gap
+
+    def on_solution_callback(self):
+        if self._progress is not None:
+            ev = {
+                "objective":  self.ObjectiveValue(),
+                "bound":      self.BestObjectiveBound(),
+                "jobs":       sum(self.Value(p) for p in self._presence),
+                "jobs_total": len(self._presence),
+                "elapsed":    self._offset + self.WallTime(),
+                "time_limit": self._time_limit,
+            }
+            if self._phase is not None:
+                ev["phase"] = self._phase
+            if self._gap is not None:
+                ev["gap"] = self._gap(ev["objective"], ev["bound"])
+            self._progress(ev)
+        if self._on_schedule is not None:
+            # throttled so reading the schedule back never slows the search
+            now = self.WallTime()
+            if self._last_snap is None or now - self._last_snap >= self._interval:
+                self._last_snap = now
+                self._on_schedule(extract_schedule(self._built, self.Value),
+                                  self._built.all_tasks, self._built.horizon)
+
+
+def solve_throughput_with_earliest(
+    selected_ops,
+    stations_dict,
+    operations_dict,
+    weights,
+    max_runs,
+    horizon,
+    station_caps,
+    earliest_starts=None,
+    latest_finishes=None,
+    time_unit: int = TIME_UNIT,
+    precedence:   dict  = None,
+    time_limit: float = Timespan,
+    num_workers: int = None,
+    on_solver=None,
+    progress=None,
+    on_schedule=None,
+    schedule_interval: float = 1.0,
+    objective: str = "weighted",
+    phase_share: float = 0.5,
+    report: dict = None,
+    search: str = "cp-sat",
+):
+    """
+    CP-SAT schedule with optional earliest-start and latest-finish constraints per operation.
+    Returns (sched, all_tasks_dict, horizon).
+    - sched[(job_id, idx)] = (start_min, end_min)
+    - all_tasks_dict[(job_id, idx)] = metadata dict with 'start','end','interval',...
+    - num_workers: CP-SAT search workers (defaults to every core); lower it
+      when several solves share the machine.
+    - on_solver: called with the CpSolver just before the search starts, so
+      another thread can stop it early (see Scheduler.solve_async).
+    - progress: called from the solver thread with an event dict when the
+      search starts, for every improving solution (objective, bound, jobs,
+      elapsed, time_limit) and once more with the final status.
+    - on_schedule: called from the solver thread as on_schedule(sched,
+      all_tasks_dict, horizon) with improving schedules, at most once per
+      schedule_interval seconds (the first solution is always sent).
+    - objective: "weighted" maximises throughput * BIGF - total_finish in one
+      solve; "lexicographic" first maximises weighted throughput (using at
+      most phase_share of time_limit, less if it proves optimality), then
+      fixes it and minimises total finish from that solution.
+      "makespan" schedules every requested run (an op with no max runs gets
+      one) and minimises the end of the last one; the horizon is widened if
+      needed so it never cuts the schedule off, and the returned horizon is
+      the schedule's actual makespan.
+    - report: optional dict filled with {"objective", "phases": [{"phase",
+      "status", "objective", "bound", "elapsed"}, ...]}; makespan solves add
+      "lower_bound" and "greedy" (minutes).
+    - search: "lns" replaces the single search by large-neighbourhood search
+      (weighted objective only; see Scheduler.lns).
+    """
+    if objective == "makespan":
+        max_runs = {op: max(1, max_runs.get(op, 0)) for op in selected_ops}
+        program_start = (earliest_starts or {}).get("program_start", 0)
+        latest_release = max([0] + [t - program_start for op, t in (earliest_starts or {}).items()
+                                    if op != "program_start" and t is not None])
+        templates = {op: build_tasks(operations_dict[op], stations_dict) for op in selected_ops}
+        horizon = max(horizon, math.ceil(serial_horizon(templates, max_runs, latest_release)))
+    built = build_model(
+        selected_ops, stations_dict, operations_dict, weights, max_runs,
+        horizon, station_caps, earliest_starts, latest_finishes,
+        time_unit, precedence,
+    )
+    return solve_model(built, time_limit, num_workers, on_solver, progress,
+                       on_schedule, schedule_interval, objective, phase_share, report,
+                       search)
+
+
+def solve_model(
+    built,
+    time_limit: float = Timespan,
+    num_workers: int = None,
+    on_solver=None,
+    progress=None,
+    on_schedule=None,
+    schedule_interval: float = 1.0,
+    objective: str = "weighted",
+    phase_share: float = 0.5,
+    report: dict = None,
+    search: str = "cp-sat",
+):
+    """
+    Solve a ScheduleModel from build_model() (possibly with extra constraints,
+    hints or a different objective added by the caller).
+    Takes the same solver options as solve_throughput_with_earliest and
+    returns (sched, all_tasks_dict, horizon) in the same form.
+    With objective="weighted" the model's own objective is kept.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective {objective!r}; use one of {', '.join(OBJECTIVES)}")
+    if search not in SEARCHES:
+        raise ValueError(f"Unknown search {search!r}; use one of {', '.join(SEARCHES)}")
+    if search == "lns":
+        if objective != "weighted":
+            raise ValueError("search='lns' only supports the weighted objective")
+        from .lns import solve_lns
+        return solve_lns(built, time_limit, num_workers, on_solver, progress,
+                         on_schedule, schedule_interval, report)
+    if objective == "lexicographic":
+        return _solve_lexicographic(built, time_limit, num_workers, on_solver, progress,
+                                    on_schedule, schedule_interval, phase_share, report)
+    if objective == "makespan":
+        return _solve_makespan(built, time_limit, num_workers, on_solver, progress,
+                               on_schedule, schedule_interval, report)
+    all_tasks = built.all_tasks
+    horizon   = built.horizon
+
     # Solve with adaptive timeout
-    solver = cp_model.CpSolver()
-    solver.parameters.max_time_in_seconds = time_limit
-    solver.parameters.num_search_workers = multiprocessing.cpu_count()
-    
-    st = solver.Solve(model)
-    
-    # If solution is optimal, cache it
-    if st == cp_model.OPTIMAL:
-        sched = {}
-        for (jid, idx), info in all_tasks.items():
-            if solver.Value(info["pres"]):
-                sched[(jid, idx)] = (
-                    solver.Value(info["start"]) / time_unit,
-                    solver.Value(info["end"]) / time_unit,
-                )
-        solution = {
-            'sched': sched,
-            'all_tasks': all_tasks,
-            'horizon': horizon
-        }
-        return sched, all_tasks, horizon
-    
-    if st == cp_model.FEASIBLE:
-        # Found a feasible but not optimal solution
-        sched = {}
-        for (jid, idx), info in all_tasks.items():
-            if solver.Value(info["pres"]):
-                sched[(jid, idx)] = (
-                    solver.Value(info["start"]) / time_unit,
-                    solver.Value(info["end"]) / time_unit,
-                )
-        return sched, all_tasks, horizon
+    solver = _new_solver(time_limit, num_workers, on_solver)
+
+    callback = None
+    if progress is not None or on_schedule is not None:
+        callback = _SolutionCallback(built, time_limit, progress,
+                                     on_schedule, schedule_interval,
+                                     gap=lambda o, b: _throughput_gap(built, o, b))
+    if progress is not None:
+        progress({"elapsed": 0.0, "time_limit": time_limit,
+                  "jobs": 0, "jobs_total": len(built.job_presence)})
+
+    st = solver.Solve(built.model, callback)
+
+    if progress is not None:
+        progress({"status": solver.StatusName(st), "elapsed": solver.WallTime(),
+                  "time_limit": time_limit})
+    if report is not None:
+        report["objective"] = objective
+        report["phases"] = [_phase_report("weighted", solver, st)]
+
+    # OPTIMAL, or FEASIBLE when the time limit (or a stop request) cut the search short
+    if st in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return extract_schedule(built, solver.Value), all_tasks, horizon
     elif st == cp_model.INFEASIBLE:
         # No feasible solution found
         print("No feasible solution found.")
-    return {}, all_tasks, 0
\ No newline at end of file
+    return {}, all_tasks, 0
+
+
+# ─── LEXICOGRAPHIC (TWO-PHASE) SOLVE ───────────────────────────────────────
+
+def _new_solver(time_limit, num_workers, on_solver):
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = max(0.0, time_limit)
+    solver.parameters.num_search_workers = num_workers or multiprocessing.cpu_count()
+    if on_solver is not None:
+        on_solver(solver)
+    return solver
+
+
+def _phase_report(phase, solver, st):
+    found = st in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    return {
+        "phase":     phase,
+        "status":    solver.StatusName(st),
+        "objective": solver.ObjectiveValue() if found else None,
+        "bound":     solver.BestObjectiveBound() if found else None,
+        "elapsed":   solver.WallTime(),
+    }
+
+
+def _int_throughput(built):
+    # integer weights so the phase-one optimum can be fixed as a constraint
+    ws = [w for _, w in built.job_presence.values()]
+    scale = 1 if all(float(w).is_integer() for w in ws) else 1000
+    return sum(p * int(round(w * scale)) for p, w in built.job_presence.values())
+
+
+def _solve_lexicographic(built, time_limit, num_workers, on_solver, progress,
+                         on_schedule, schedule_interval, phase_share, report):
+    model, all_tasks = built.model, built.all_tasks
+    throughput = _int_throughput(built)
+    phases = []
+    if report is not None:
+        report["objective"] = "lexicographic"
+        report["phases"] = phases
+
+    # phase 1: weighted throughput only; stops early once proven optimal
+    model.Maximize(throughput)
+    solver = _new_solver(time_limit * phase_share, num_workers, on_solver)
+    callback = None
+    if progress is not None or on_schedule is not None:
+        callback = _SolutionCallback(built, time_limit, progress, on_schedule,
+                                     schedule_interval, phase=1, gap=_relative_gap)
+    if progress is not None:
+        progress({"elapsed": 0.0, "time_limit": time_limit, "phase": 1,
+                  "jobs": 0, "jobs_total": len(built.job_presence)})
+    st = solver.Solve(model, callback)
+    phases.append(_phase_report("throughput", solver, st))
+    used = solver.WallTime()
+
+    if st not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        if progress is not None:
+            progress({"status": solver.StatusName(st), "elapsed": used,
+                      "time_limit": time_limit})
+        if st == cp_model.INFEASIBLE:
+            print("No feasible solution found.")
+        return {}, all_tasks, 0
+    best = extract_schedule(built, solver.Value)
+
+    # phase 2: keep that throughput, start from its schedule, pull finishes in
+    model.Add(throughput >= int(round(solver.ObjectiveValue())))
+    model.ClearHints()
+    for p, _ in built.job_presence.values():
+        model.AddHint(p, solver.Value(p))
+    for info in all_tasks.values():
+        model.AddHint(info["start"], solver.Value(info["start"]))
+        model.AddHint(info["end"], solver.Value(info["end"]))
+    model.Minimize(built.total_finish)
+
+    solver2 = _new_solver(time_limit - used, num_workers, on_solver)
+    callback = None
+    if progress is not None or on_schedule is not None:
+        callback = _SolutionCallback(built, time_limit, progress, on_schedule,
+                                     schedule_interval, phase=2, offset=used)
+    st2 = solver2.Solve(model, callback)
+    phases.append(_phase_report("finish", solver2, st2))
+
+    if st2 in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        best = extract_schedule(built, solver2.Value)
+        final = cp_model.OPTIMAL if st == st2 == cp_model.OPTIMAL else cp_model.FEASIBLE
+    else:
+        # out of time (or stopped) before phase 2 improved on phase 1
+        final = st
+    if progress is not None:
+        progress({"status": solver.StatusName(final), "elapsed": used + solver2.WallTime(),
+                  "time_limit": time_limit})
+    return best, all_tasks, built.horizon
+
+
+# ─── MAKESPAN ──────────────────────────────────────────────────────────────
+
+def _solve_makespan(built, time_limit, num_workers, on_solver, progress,
+                    on_schedule, schedule_interval, report):
+    model, all_tasks, tu = built.model, built.all_tasks, built.time_unit
+    lb = makespan_lower_bound(built)
+    greedy, ub = greedy_schedule(built)
+    if report is not None:
+        report["objective"] = "makespan"
+        report["lower_bound"] = lb / tu if lb != math.inf else None
+        report["greedy"] = ub / tu if ub is not None else None
+        report["phases"] = []
+    if lb > built.H_t:
+        if progress is not None:
+            progress({"status": "INFEASIBLE", "elapsed": 0.0, "time_limit": time_limit})
+        print("No feasible solution found.")
+        return {}, all_tasks, 0
+
+    # every run is mandatory; cmax is squeezed between the two bounds
+    for p, _ in built.job_presence.values():
+        model.Add(p == 1)
+    cmax = model.NewIntVar(int(lb), ub if ub is not None else built.H_t, "makespan")
+    for jid in built.job_presence:
+        last = len(built.templates[jid.rsplit("_", 1)[0]]) - 1
+        model.Add(cmax >= all_tasks[(jid, last)]["end"])
+    model.ClearHints()
+    if greedy is not None:
+        for key, (s, e) in greedy.items():
+            model.AddHint(all_tasks[key]["start"], s)
+            model.AddHint(all_tasks[key]["end"], e)
+        for p, _ in built.job_presence.values():
+            model.AddHint(p, 1)
+    model.Minimize(cmax)
+
+    solver = _new_solver(time_limit, num_workers, on_solver)
+    callback = None
+    if progress is not None or on_schedule is not None:
+        callback = _SolutionCallback(built, time_limit, progress,
+                                     on_schedule, schedule_interval, gap=_relative_gap)
+    if progress is not None:
+        progress({"elapsed": 0.0, "time_limit": time_limit,
+                  "jobs": 0, "jobs_total": len(built.job_presence)})
+    st = solver.Solve(model, callback)
+    if progress is not None:
+        progress({"status": solver.StatusName(st), "elapsed": solver.WallTime(),
+                  "time_limit": time_limit})
+    if report is not None:
+        report["phases"].append(_phase_report("makespan", solver, st))
+
+    if st in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return extract_schedule(built, solver.Value), all_tasks, solver.Value(cmax) / tu
+    if greedy is not None:
+        # stopped before the solver's first solution: the greedy one still holds
+        return ({k: (s / tu, e / tu) for k, (s, e) in greedy.items()},
+                all_tasks, ub / tu)
+    if st == cp_model.INFEASIBLE:
+        print("No feasible solution found.")
+    return {}, all_tasks, 0
@@ -0,0 +1,201 @@
+# scheduler/operators.py
+"""
+Smallest operator count (station_caps["S"]) that meets a target.
+
+    ans = min_operators(selected_ops, sd, ops, max_runs, horizon, station_caps,
+                        earliest_starts, latest_finishes, target_jobs=None)
+    ans.operators, ans.certified, ans.probes
+
+The target is "target_jobs jobs scheduled" (default: every requested run)
+together with whatever latest finishes / precedence are given.  Adding an
+operator never makes a schedule infeasible, so the answer is found by a
+monotone search instead of solving every count:
+
+- a lower bound from S-line work (the target's operator minutes cannot fit
+  in the horizon with fewer operators) skips counts that are clearly too few;
+- more operators than jobs can never be busy at once, so min(jobs,
+  max_operators) is clearly sufficient;
+- each probe is a pure feasibility solve; a schedule found at k operators
+  never uses more than its own peak S-line occupancy, which becomes the new
+  upper bound directly;
+- the last feasible schedule is hinted into the next probe.
+
+The answer is certified when the count below it is proven infeasible (by the
+bound or by the solver) rather than merely not solved in time.
+"""
+import math
+import time
+
+from ortools.sat.python import cp_model
+
+from .tasks import build_tasks
+from .model import build_model, extract_schedule, _new_solver
+from .kpi import occupancy
+from Data.universal_variable import TIME_UNIT
+
+__all__ = ["OperatorAnswer", "min_operators", "operator_lower_bound", "peak_operators"]
+
+DEFAULT_MAX_OPERATORS = 6       # the Operator Test's range
+PROBE_TIME_LIMIT = 20
+
+
+class OperatorAnswer:
+    """
+    - operators:  smallest sufficient count, or None if none up to the maximum is
+    - certified:  True when operators - 1 is proven too few (or operators is None
+                  and the maximum is proven too few)
+    - sched, all_tasks: a schedule meeting the target with that many operators
+    - lower_bound: the bound-based minimum
+    - probes:     [(operators, status, seconds), ...] in the order they were solved
+    """
+    def __init__(self, **kw):
+        self.__dict__.update(kw)
+
+    def __repr__(self):
+        return (f"OperatorAnswer(operators={self.operators}, certified={self.certified}, "
+                f"probes={[(k, s) for k, s, _ in self.probes]})")
+
+
+def _s_work(entry, time_unit):
+    tt, _, dur, fr, *_ = entry
+    if tt == "MOVE" and fr and fr.startswith("S"):
+        return int(math.ceil(dur * time_unit))
+    return 0
+
+
+def operator_lower_bound(templates, run_counts, target_jobs, horizon_ticks, time_unit=TIME_UNIT):
+    """
+    Fewest operators whose combined time covers the S-line work of the
+    target_jobs cheapest jobs (0 if those jobs need no operator).
+    """
+    per_job = sorted(
+        sum(_s_work(e, time_unit) for e in templates[op])
+        for op, n in run_counts.items() for _ in range(n)
+    )
+    work = sum(per_job[:target_jobs])
+    if work == 0:
+        return 0
+    return max(1, math.ceil(work / max(1, horizon_ticks)))
+
+
+def peak_operators(sched, all_tasks):
+    """Most S-line moves running at the same moment in a schedule."""
+    spans = [se for key, se in sched.items()
+             if all_tasks[key]["type"] == "MOVE"
+             and (all_tasks[key]["from_st"] or "").startswith("S")]
+    if not spans:
+        return 0
+    starts = [s for s, _ in spans]
+    return int(occupancy(starts, [e for _, e in spans], starts).max())
+
+
+def min_operators(
+    selected_ops,
+    stations_dict,
+    operations_dict,
+    max_runs,
+    horizon,
+    station_caps,
+    earliest_starts=None,
+    latest_finishes=None,
+    time_unit: int = TIME_UNIT,
+    precedence: dict = None,
+    target_jobs: int = None,
+    max_operators: int = DEFAULT_MAX_OPERATORS,
+    probe_time_limit: float = PROBE_TIME_LIMIT,
+    num_workers: int = None,
+    on_solver=None,
+    progress=None,
+):
+    """
+    Smallest station_caps["S"] for which target_jobs jobs (default: all runs in
+    max_runs) can be scheduled within horizon and the given constraints.
+    Returns an OperatorAnswer.
+    - progress: called with {"operators", "status", "elapsed", "low", "high"}
+      after each probe.
+    """
+    t0 = time.monotonic()
+    probes, results = [], {}       # results: k → (status, sched, all_tasks)
+
+    def probe(k, hint):
+        caps = dict(station_caps)
+        caps["S"] = k
+        built = build_model(selected_ops, stations_dict, operations_dict, {}, max_runs,
+                            horizon, caps, earliest_starts, latest_finishes,
+                            time_unit, precedence)
+        model = built.model
+        model.ClearObjective()
+        model.Add(sum(p for p, _ in built.job_presence.values()) >= target)
+        if hint:
+            sched = hint
+            for (jid, idx), info in built.all_tasks.items():
+                if (jid, idx) in sched:
+                    s, e = sched[(jid, idx)]
+                    model.AddHint(info["start"], int(round(s * time_unit)))
+                    model.AddHint(info["end"], int(round(e * time_unit)))
+            present = {jid for jid, _ in sched}
+            for jid, (p, _) in built.job_presence.items():
+                model.AddHint(p, jid in present)
+        solver = _new_solver(probe_time_limit, num_workers, on_solver)
+        st = solver.Solve(model)
+        sched = (extract_schedule(built, solver.Value)
+                 if st in (cp_model.OPTIMAL, cp_model.FEASIBLE) else None)
+        results[k] = (st, sched, built.all_tasks)
+        probes.append((k, solver.StatusName(st), solver.WallTime()))
+        if progress is not None:
+            progress({"operators": k, "status": solver.StatusName(st),
+                      "elapsed": time.monotonic() - t0, "low": low, "high": high})
+        return results[k]
+
+    # templates and run counts exactly as build_model makes them
+    templates, run_counts = {}, {}
+    for op in selected_ops:
+        templates[op] = build_tasks(operations_dict[op], stations_dict)
+        if max_runs.get(op, 0) > 0:
+            run_counts[op] = max_runs[op]
+        else:
+            minimal = sum(entry[2] for entry in templates[op])
+            run_counts[op] = int(horizon // minimal) + 1
+    total = sum(run_counts.values())
+    target = total if target_jobs is None else min(int(target_jobs), total)
+    lower_bound = operator_lower_bound(templates, run_counts, target,
+                                       int(round(horizon * time_unit)), time_unit)
+
+    low, high = lower_bound, min(max_operators, max(lower_bound, target))
+    answer = lambda k, certified: OperatorAnswer(
+        operators=k, certified=certified, lower_bound=lower_bound, probes=probes,
+        sched=results[k][1] if k is not None else {},
+        all_tasks=results[k][2] if k is not None else {},
+    )
+    if lower_bound > max_operators:
+        return OperatorAnswer(operators=None, certified=True, lower_bound=lower_bound,
+                              probes=probes, sched={}, all_tasks={})
+
+    # the bound is often the answer: try it first
+    st, sched, tasks = probe(low, None)
+    if sched is not None:
+        return answer(low, True)
+    if low >= high:
+        return answer(None, st == cp_model.INFEASIBLE)
+    proven_below = low if st == cp_model.INFEASIBLE else None
+    low += 1
+
+    # clearly sufficient count next, so there is always a schedule to hint from
+    st, sched, tasks = probe(high, None)
+    if sched is None:
+        return answer(None, st == cp_model.INFEASIBLE)
+    best = max(low, peak_operators(sched, tasks))
+    results[best] = results[high]
+
+    # monotone binary search in [low, best]; INFEASIBLE raises low with proof
+    while low < best:
+        mid = (low + best) // 2
+        st, sched, tasks = probe(mid, results[best][1])
+        if sched is not None:
+            best = min(mid, max(low, peak_operators(sched, tasks)))
+            results[best] = results[mid]
+        else:
+            if st == cp_model.INFEASIBLE:
+                proven_below = mid
+            low = mid + 1
+    return answer(best, proven_below == best - 1)
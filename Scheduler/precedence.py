@@ -0,0 +1,157 @@
+# scheduler/precedence.py
+"""
+User precedence ({"K01_0": ["K09_0", "K15_1"], ...}: K01_0 starts after
+K09_0 and K15_1 finish) compiled before it reaches CP-SAT:
+
+- every job id is checked against the run counts of the model;
+- cycles are found with Kahn's algorithm in O(V + E) and reported as a
+  PrecedenceError naming the jobs on the cycle;
+- edges already implied by a longer path (A→B→C makes A→C redundant) are
+  dropped, so the model only gets the transitive reduction;
+- earliest_bounds() turns predecessor chains into start lower bounds that
+  build_model() uses to shrink the start-variable domains.
+"""
+import re
+from collections import deque
+
+__all__ = ["PrecedenceError", "CompiledPrecedence", "compile_precedence",
+           "earliest_bounds", "parse_job_list"]
+
+_JOB_ID = re.compile(r"^(?P<op>.+)_(?P<k>\d+)$")
+
+
+class PrecedenceError(ValueError):
+    """
+    Invalid precedence.  .unknown lists job ids the model does not create,
+    .cycle the jobs of one cycle in order (first job repeated at the end).
+    """
+    def __init__(self, message, unknown=(), cycle=()):
+        super().__init__(message)
+        self.unknown = list(unknown)
+        self.cycle   = list(cycle)
+
+
+class CompiledPrecedence:
+    """
+    Validated, acyclic precedence.
+    - preds:   {job_id: [predecessor job ids]} after transitive reduction
+    - order:   every constrained job in a topological order
+    - dropped: number of redundant edges removed
+    """
+    def __init__(self, preds, order, dropped):
+        self.preds   = preds
+        self.order   = order
+        self.dropped = dropped
+
+    def edges(self):
+        return [(before, jid) for jid, ps in self.preds.items() for before in ps]
+
+
+def parse_job_list(raw):
+    """'K01_0, K09_0' → ['K01_0', 'K09_0'] (blank entries skipped)."""
+    return [s.strip() for s in str(raw).split(",") if s.strip()]
+
+
+def _check_ids(precedence, run_counts):
+    unknown = []
+    for jid in {j for jid, ps in precedence.items() for j in (jid, *ps)}:
+        m = _JOB_ID.match(jid)
+        if not m or int(m["k"]) >= run_counts.get(m["op"], 0):
+            unknown.append(jid)
+    if unknown:
+        unknown.sort()
+        raise PrecedenceError(
+            "Precedence refers to job(s) that are not scheduled: " + ", ".join(unknown),
+            unknown=unknown,
+        )
+
+
+def _find_cycle(nodes, succs):
+    # iterative DFS restricted to the nodes Kahn's algorithm could not order
+    state = {}
+    for root in nodes:
+        if root in state:
+            continue
+        stack = [(root, iter(succs.get(root, ())))]
+        path  = [root]
+        state[root] = 1
+        while stack:
+            node, it = stack[-1]
+            nxt = next((n for n in it if n in nodes and state.get(n) != 2), None)
+            if nxt is None:
+                state[node] = 2
+                stack.pop()
+                path.pop()
+            elif state.get(nxt) == 1:
+                return path[path.index(nxt):] + [nxt]
+            else:
+                state[nxt] = 1
+                stack.append((nxt, iter(succs.get(nxt, ()))))
+                path.append(nxt)
+    return []
+
+
+def compile_precedence(precedence, run_counts):
+    """
+    Validate precedence against run_counts ({op: runs}) and reduce it.
+    Raises PrecedenceError for unknown job ids or a cycle.
+    """
+    precedence = {jid: list(dict.fromkeys(ps)) for jid, ps in (precedence or {}).items() if ps}
+    _check_ids(precedence, run_counts)
+
+    # Kahn: repeatedly take jobs whose predecessors are all placed
+    succs, indeg = {}, {}
+    for jid, ps in precedence.items():
+        indeg.setdefault(jid, 0)
+        for before in ps:
+            indeg.setdefault(before, 0)
+            succs.setdefault(before, []).append(jid)
+            indeg[jid] += 1
+    ready = deque(sorted(j for j, d in indeg.items() if d == 0))
+    order = []
+    while ready:
+        jid = ready.popleft()
+        order.append(jid)
+        for nxt in succs.get(jid, ()):
+            indeg[nxt] -= 1
+            if indeg[nxt] == 0:
+                ready.append(nxt)
+    if len(order) < len(indeg):
+        cycle = _find_cycle({j for j, d in indeg.items() if d > 0}, succs)
+        raise PrecedenceError("Precedence contains a cycle: " + " → ".join(cycle), cycle=cycle)
+
+    # transitive reduction: before→jid is redundant when `before` is already
+    # an ancestor of another predecessor of jid.  Ancestor sets are bitmasks.
+    bit = {jid: 1 << i for i, jid in enumerate(order)}
+    ancestors, reduced, dropped = {}, {}, 0
+    for jid in order:
+        ps = precedence.get(jid, [])
+        via = 0
+        for before in ps:
+            via |= ancestors[before]
+        kept = [before for before in ps if not via & bit[before]]
+        dropped += len(ps) - len(kept)
+        if kept:
+            reduced[jid] = kept
+        anc = via
+        for before in ps:
+            anc |= bit[before]
+        ancestors[jid] = anc
+    return CompiledPrecedence(reduced, order, dropped)
+
+
+def earliest_bounds(compiled, durations, release=None):
+    """
+    Longest-path start lower bounds, in the units of durations.
+    - durations: {job_id: time from its first start to its last end}
+    - release:   {job_id: own earliest start} (default 0)
+    Returns {job_id: bound} for every job in compiled.order.
+    """
+    release = release or {}
+    bounds = {}
+    for jid in compiled.order:
+        lb = release.get(jid, 0)
+        for before in compiled.preds.get(jid, ()):
+            lb = max(lb, bounds[before] + durations[before])
+        bounds[jid] = lb
+    return bounds
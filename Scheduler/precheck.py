@@ -0,0 +1,281 @@
+# scheduler/precheck.py
+"""
+Infeasibility checks that run before the solver.
+
+precheck() looks only at the jobs the model is forced to run (ops with a
+latest finish, plus their precedence predecessors) and returns in
+milliseconds:
+
+- "precedence": unknown job ids or a cycle (see Scheduler.precedence)
+- "window":     a job whose template is longer than the time between its
+                earliest start and latest finish, after both are tightened
+                along precedence chains
+- "load":       forced work on one station, the D-line or the S-line that
+                cannot fit between the earliest release and latest deadline
+                of that work (energetic reasoning over every window pair)
+
+find_conflict() handles what those checks miss: it re-solves the model with
+one assumption literal per latest finish and per precedence edge and shrinks
+CP-SAT's infeasible core to a minimal set of conflicting constraints.
+"""
+import math
+import time
+
+from ortools.sat.python import cp_model
+
+from .tasks import build_tasks, task_resources
+from .model import build_model
+from .precedence import compile_precedence, PrecedenceError
+from .utils import minutes_to_hhmm
+from Data.universal_variable import TIME_UNIT
+
+__all__ = ["Issue", "precheck", "find_conflict"]
+
+
+class Issue:
+    """One reason the problem cannot be solved."""
+    def __init__(self, kind, message, jobs=(), stations=()):
+        self.kind     = kind
+        self.message  = message
+        self.jobs     = sorted(set(jobs))
+        self.stations = sorted(set(stations))
+
+    def __str__(self):
+        return self.message
+
+    def __repr__(self):
+        return f"Issue({self.kind!r}, {self.message!r})"
+
+
+def _ticks(minutes_by_op, program_start, time_unit):
+    # same conversion as build_model
+    return {
+        op: max(0, int((t - program_start) * time_unit))
+        for op, t in (minutes_by_op or {}).items()
+        if op != "program_start" and t is not None
+    }
+
+
+def _overload(items, cap):
+    """
+    items: (release, deadline, duration, job) with each task's own window.
+    Return (r, d, load, jobs) for the worst window [r, d] whose enclosed load
+    exceeds cap * (d - r), or None.
+    """
+    worst = None
+    for r in sorted({it[0] for it in items}):
+        inside = sorted((it for it in items if it[0] >= r), key=lambda it: it[1])
+        load, jobs = 0, []
+        for _, d, dur, jid in inside:
+            load += dur
+            jobs.append(jid)
+            excess = load - cap * max(0, d - r)
+            if excess > 0 and (worst is None or excess > worst[0]):
+                worst = (excess, r, d, load, list(jobs))
+    return worst[1:] if worst else None
+
+
+def precheck(
+    selected_ops,
+    stations_dict,
+    operations_dict,
+    max_runs,
+    horizon,
+    station_caps,
+    earliest_starts=None,
+    latest_finishes=None,
+    time_unit: int = TIME_UNIT,
+    precedence: dict = None,
+):
+    """
+    Return a list of Issue for the problem as solve_throughput_with_earliest
+    would build it (same arguments, weights aside); empty when nothing is
+    provably wrong.
+    """
+    H_t = int(round(horizon * time_unit))
+    program_start = (earliest_starts or {}).get("program_start", 0)
+    release_op  = _ticks(earliest_starts, program_start, time_unit)
+    deadline_op = _ticks(latest_finishes, program_start, time_unit)
+    clock = lambda t: minutes_to_hhmm(program_start + t / time_unit)
+
+    templates, run_counts = {}, {}
+    for op in selected_ops:
+        templates[op] = build_tasks(operations_dict[op], stations_dict)
+        if max_runs.get(op, 0) > 0:
+            run_counts[op] = max_runs[op]
+        else:
+            minimal = sum(entry[2] for entry in templates[op])
+            run_counts[op] = int(horizon // minimal) + 1
+    op_of  = lambda jid: jid.rsplit("_", 1)[0]
+    durs   = {op: [int(math.ceil(e[2] * time_unit)) for e in tpl] for op, tpl in templates.items()}
+    length = {op: sum(d) for op, d in durs.items()}
+
+    try:
+        compiled = compile_precedence(precedence, run_counts) if precedence else None
+    except PrecedenceError as e:
+        return [Issue("precedence", str(e), jobs=e.unknown + e.cycle)]
+    preds = compiled.preds if compiled else {}
+
+    # forced jobs: every run of an op with a latest finish, and (since a job
+    # only runs when its predecessors do) everything upstream of them
+    forced = [f"{op}_{k}" for op in selected_ops if op in deadline_op
+              for k in range(run_counts[op])]
+    seen, stack = set(forced), list(forced)
+    while stack:
+        for before in preds.get(stack.pop(), ()):
+            if before not in seen:
+                seen.add(before)
+                stack.append(before)
+    forced = seen
+    if not forced:
+        return []
+
+    # tighten releases forwards and deadlines backwards along precedence
+    order = [j for j in (compiled.order if compiled else []) if j in forced]
+    order += sorted(forced - set(order))
+    release  = {j: release_op.get(op_of(j), 0) for j in forced}
+    deadline = {j: min(H_t, deadline_op.get(op_of(j), H_t)) for j in forced}
+    for jid in order:
+        for before in preds.get(jid, ()):
+            release[jid] = max(release[jid], release[before] + length[op_of(before)])
+    for jid in reversed(order):
+        for before in preds.get(jid, ()):
+            deadline[before] = min(deadline[before], deadline[jid] - length[op_of(jid)])
+
+    issues = []
+    for jid in sorted(forced):
+        op = op_of(jid)
+        if release[jid] + length[op] > deadline[jid]:
+            chained = (release[jid] != release_op.get(op, 0)
+                       or deadline[jid] != min(H_t, deadline_op.get(op, H_t)))
+            issues.append(Issue(
+                "window",
+                f"{jid} needs {length[op] / time_unit:g} min but can only run between "
+                f"{clock(release[jid])} and {clock(deadline[jid])}"
+                + (" once its precedence chain is taken into account" if chained else ""),
+                jobs=[jid],
+            ))
+    if issues:
+        return issues
+
+    # each forced task has its own window inside its job's window
+    per_resource, caps = {}, {}
+    for jid in forced:
+        op = op_of(jid)
+        offset = 0
+        for entry, dur in zip(templates[op], durs[op]):
+            for res, cap in task_resources(entry, station_caps):
+                if dur > 0:
+                    lo = release[jid] + offset
+                    hi = deadline[jid] - length[op] + offset + dur
+                    per_resource.setdefault(res, []).append((lo, hi, dur, jid))
+                    caps[res] = cap
+            offset += dur
+
+    for res in sorted(per_resource):
+        hit = _overload(per_resource[res], caps[res])
+        if hit:
+            r, d, load, jobs = hit
+            where = res if res.endswith("-line") else f"station {res}"
+            issues.append(Issue(
+                "load",
+                f"{where} has {load / time_unit:g} min of work from jobs that must run "
+                f"between {clock(r)} and {clock(d)}, but capacity {caps[res]} allows only "
+                f"{caps[res] * max(0, d - r) / time_unit:g} min",
+                jobs=jobs, stations=[res],
+            ))
+    return issues
+
+
+def find_conflict(
+    selected_ops,
+    stations_dict,
+    operations_dict,
+    max_runs,
+    horizon,
+    station_caps,
+    earliest_starts=None,
+    latest_finishes=None,
+    time_unit: int = TIME_UNIT,
+    precedence: dict = None,
+    time_limit: float = 10.0,
+):
+    """
+    Minimal set of latest-finish and precedence constraints that cannot hold
+    together, as a list of Issue ("latest" / "precedence").
+    Returns [] when the constraints are consistent, and None when no answer
+    was reached within time_limit.
+    """
+    deadline = time.monotonic() + time_limit
+    built = build_model(
+        selected_ops, stations_dict, operations_dict, {}, max_runs, horizon,
+        station_caps, earliest_starts, None, time_unit, None,
+    )
+    model, tasks = built.model, built.all_tasks
+    model.ClearObjective()
+    program_start = (earliest_starts or {}).get("program_start", 0)
+    clock = lambda t: minutes_to_hhmm(program_start + t / time_unit)
+
+    # one literal per constraint group we may want to blame
+    labels = {}
+    for op, lf_t in _ticks(latest_finishes, program_start, time_unit).items():
+        if op not in built.run_counts:
+            continue
+        lit = model.NewBoolVar(f"latest_{op}")
+        last = len(built.templates[op]) - 1
+        for k in range(built.run_counts[op]):
+            jid = f"{op}_{k}"
+            p, _ = built.job_presence[jid]
+            model.Add(p == 1).OnlyEnforceIf(lit)
+            model.Add(tasks[(jid, last)]["end"] <= lf_t).OnlyEnforceIf(lit)
+        labels[lit.Index()] = (lit, Issue(
+            "latest", f"all {built.run_counts[op]} run(s) of {op} finish by {clock(lf_t)}",
+            jobs=[f"{op}_{k}" for k in range(built.run_counts[op])]))
+
+    compiled = compile_precedence(precedence, built.run_counts) if precedence else None
+    for before, jid in (compiled.edges() if compiled else []):
+        lit = model.NewBoolVar(f"prec_{before}_{jid}")
+        p_jid = tasks[(jid, 0)]["pres"]
+        last = len(built.templates[before.rsplit("_", 1)[0]]) - 1
+        model.AddImplication(p_jid, tasks[(before, 0)]["pres"]).OnlyEnforceIf(lit)
+        model.Add(tasks[(jid, 0)]["start"] >= tasks[(before, last)]["end"]
+                  ).OnlyEnforceIf([lit, p_jid])
+        labels[lit.Index()] = (lit, Issue(
+            "precedence", f"{jid} starts after {before} finishes", jobs=[before, jid]))
+
+    def infeasible_core(idxs):
+        # (True, core) if INFEASIBLE, (False, None) if feasible, None on timeout
+        left = deadline - time.monotonic()
+        if left <= 0:
+            return None
+        model.ClearAssumptions()
+        model.AddAssumptions([labels[i][0] for i in idxs])
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = left
+        solver.parameters.num_search_workers = 1   # cores need a single worker
+        st = solver.Solve(model)
+        if st == cp_model.INFEASIBLE:
+            return True, set(solver.SufficientAssumptionsForInfeasibility())
+        if st in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return False, None
+        return None
+
+    res = infeasible_core(list(labels))
+    if res is None:
+        return None
+    if not res[0]:
+        return []
+
+    # deletion-based minimisation: drop each literal the rest stays infeasible without
+    core = [i for i in labels if i in res[1]]
+    pos = 0
+    while pos < len(core):
+        rest = core[:pos] + core[pos + 1:]
+        res = infeasible_core(rest)
+        if res is None:
+            break
+        if res[0]:
+            core = [i for i in rest if i in res[1]]
+        else:
+            pos += 1
+    return [labels[i][1] for i in core]
@@ -0,0 +1,74 @@
+# scheduler/problem.py
+"""
+Scheduling problems and results as plain JSON, shared by the service, the
+work queue and the archive:
+
+- make_problem():   the arguments of solve_throughput_with_earliest as a dict
+- problem_key():    stable hash of such a dict; identical scenarios share it
+- encode_result(), decode_result(): (sched, all_tasks, horizon) to JSON and back
+"""
+import hashlib
+import json
+
+from Data.universal_variable import TIME_UNIT, Timespan
+
+__all__ = ["make_problem", "problem_key", "encode_result", "decode_result"]
+
+
+def make_problem(selected_ops, stations_dict, operations_dict, weights, max_runs,
+                 horizon, station_caps, earliest_starts=None, latest_finishes=None,
+                 time_unit=TIME_UNIT, precedence=None, time_limit=Timespan,
+                 objective="weighted"):
+    """
+    Pack the arguments of solve_throughput_with_earliest into a JSON-safe dict.
+    """
+    return {
+        "selected_ops":    list(selected_ops),
+        "stations_dict":   stations_dict,
+        "operations_dict": {op: operations_dict[op] for op in selected_ops},
+        "weights":         dict(weights),
+        "max_runs":        dict(max_runs),
+        "horizon":         horizon,
+        "station_caps":    dict(station_caps),
+        "earliest_starts": dict(earliest_starts or {}),
+        "latest_finishes": dict(latest_finishes or {}),
+        "time_unit":       time_unit,
+        "precedence":      dict(precedence or {}),
+        "time_limit":      time_limit,
+        "objective":       objective,
+    }
+
+
+def problem_key(problem):
+    """
+    Stable hash of a problem dict; identical scenarios map to the same key.
+    """
+    blob = json.dumps(problem, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:24]
+
+
+def encode_result(sched, all_tasks, horizon):
+    """
+    Turn a solver result into JSON.  CP-SAT variables are dropped; only the
+    task metadata the GUI and reports use is kept.
+    """
+    return {
+        "sched": [[jid, idx, s, e] for (jid, idx), (s, e) in sched.items()],
+        "tasks": [
+            [jid, idx, info["type"], info["station"], info["from_st"], info["to_st"]]
+            for (jid, idx), info in all_tasks.items()
+        ],
+        "horizon": horizon,
+    }
+
+
+def decode_result(payload):
+    """
+    Inverse of encode_result: returns (sched, all_tasks_dict, horizon).
+    """
+    sched = {(jid, idx): (s, e) for jid, idx, s, e in payload["sched"]}
+    tasks = {
+        (jid, idx): {"type": tt, "station": stn, "from_st": fr, "to_st": to}
+        for jid, idx, tt, stn, fr, to in payload["tasks"]
+    }
+    return sched, tasks, payload["horizon"]
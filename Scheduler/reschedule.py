@@ -0,0 +1,175 @@
+# scheduler/reschedule.py
+"""
+Reactive rescheduling: repair a running plan instead of re-solving the day.
+
+    sched, tasks, horizon = reschedule(
+        sched, tasks, now=245,
+        changes={"add": {"K32": 2}, "late": {"K09_1": 260}},
+        selected_ops=ops_list, stations_dict=sd, operations_dict=ops,
+        weights=weights, horizon=horizon, station_caps=caps,
+    )
+
+- Jobs whose first task started before `now` are frozen at their planned times.
+- Every other job may only start at or after `now`; jobs that stay in the
+  plan are penalised for moving away from their previous start, and the
+  previous plan is passed to CP-SAT as a solution hint, so the search starts
+  from it and only the disturbed part of the future is re-optimised.
+- Throughput still dominates: a rush order is scheduled even when that means
+  moving other jobs, but never at the cost of dropping one.
+"""
+import math
+
+from .model import build_model, solve_model
+from Data.universal_variable import TIME_UNIT
+
+__all__ = ["reschedule", "split_at", "RESCHEDULE_TIME_LIMIT"]
+
+# repairs start from a good hint, so they get far less time than a full solve
+RESCHEDULE_TIME_LIMIT = 10
+
+
+def _job_of(jid):
+    op, _, k = jid.rpartition("_")
+    return op, int(k)
+
+
+def _job_starts(sched):
+    """{job_id: start of its first scheduled task}"""
+    starts = {}
+    for (jid, _), (s, _) in sched.items():
+        if jid not in starts or s < starts[jid]:
+            starts[jid] = s
+    return starts
+
+
+def split_at(sched, now, late=()):
+    """
+    (started, pending) job-id sets of a plan at time `now` (minutes).
+    Jobs listed in `late` planned to start before `now` but did not, so they
+    count as pending.
+    """
+    started, pending = set(), set()
+    for jid, s in _job_starts(sched).items():
+        (started if s < now and jid not in late else pending).add(jid)
+    return started, pending
+
+
+def reschedule(
+    sched,
+    all_tasks,
+    now,
+    changes=None,
+    *,
+    selected_ops,
+    stations_dict,
+    operations_dict,
+    weights,
+    horizon,
+    station_caps,
+    earliest_starts=None,
+    latest_finishes=None,
+    time_unit: int = TIME_UNIT,
+    precedence: dict = None,
+    deviation_weight: int = 1,
+    time_limit: float = RESCHEDULE_TIME_LIMIT,
+    num_workers: int = None,
+    on_solver=None,
+    progress=None,
+    on_schedule=None,
+    schedule_interval: float = 1.0,
+):
+    """
+    Re-plan the part of `sched` after `now` and return (sched, all_tasks_dict,
+    horizon) like solve_throughput_with_earliest.
+    - sched, all_tasks: the current plan and the task dict it was solved with
+      (all_tasks fixes how many runs of each op the plan allowed).
+    - now: minutes from program start, on the same clock as sched.
+    - changes:
+        "add":    {op: extra_runs}  rush orders (op need not be in the plan yet)
+        "cancel": [job_id, ...]     drop jobs that have not started
+        "late":   {job_id: ready}   jobs planned before `now` that have not
+                                    started; they start at `ready` or later
+                                    (None means `now`)
+    - deviation_weight: cost per minute a kept job moves from its old start,
+      relative to one minute of total finish time.
+    Started jobs cannot be cancelled; they stay frozen.
+    """
+    changes = changes or {}
+    add     = changes.get("add", {})
+    cancel  = set(changes.get("cancel", ()))
+    late    = {jid: (now if t is None else max(now, t))
+               for jid, t in changes.get("late", {}).items()}
+
+    # run counts of the old plan, plus the rush orders
+    max_runs = {}
+    for (jid, _) in all_tasks:
+        op, k = _job_of(jid)
+        max_runs[op] = max(max_runs.get(op, 0), k + 1)
+    ops_list = list(selected_ops)
+    for op, n in add.items():
+        if op not in operations_dict:
+            raise ValueError(f"Unknown operation {op!r} in rescheduling changes")
+        if op not in ops_list:
+            ops_list.append(op)
+        max_runs[op] = max_runs.get(op, 0) + int(n)
+
+    built = build_model(
+        ops_list, stations_dict, operations_dict, weights, max_runs,
+        horizon, station_caps, earliest_starts, latest_finishes,
+        time_unit, precedence,
+    )
+    model, tasks = built.model, built.all_tasks
+    to_t   = lambda m: int(round(m * time_unit))
+    now_t  = int(math.ceil(now * time_unit))
+    starts = _job_starts(sched)
+    started, _ = split_at(sched, now, late)
+
+    deviations = []
+    for jid, (p, _) in built.job_presence.items():
+        n_tasks = len(built.templates[_job_of(jid)[0]])
+        first   = tasks[(jid, 0)]
+
+        if jid in started:
+            # already on the line: pin every task where it was planned
+            model.Add(p == 1)
+            for idx in range(n_tasks):
+                s, e = sched[(jid, idx)]
+                model.Add(tasks[(jid, idx)]["start"] == to_t(s))
+                model.Add(tasks[(jid, idx)]["end"] == to_t(e))
+            continue
+
+        if jid in cancel:
+            model.Add(p == 0)
+            model.AddHint(p, 0)
+            continue
+
+        ready_t = now_t if jid not in late else int(math.ceil(late[jid] * time_unit))
+        model.Add(first["start"] >= ready_t).OnlyEnforceIf(p)
+
+        if jid in starts:
+            # kept from the old plan: hint it and charge for moving it
+            old_t = to_t(starts[jid])
+            model.AddHint(p, 1)
+            for idx in range(n_tasks):
+                # a late job's old times are no longer reachable
+                if (jid, idx) in sched and jid not in late:
+                    s, e = sched[(jid, idx)]
+                    model.AddHint(tasks[(jid, idx)]["start"], to_t(s))
+                    model.AddHint(tasks[(jid, idx)]["end"], to_t(e))
+            dev = model.NewIntVar(0, built.H_t, f"dev_{jid}")
+            model.Add(dev >= first["start"] - old_t).OnlyEnforceIf(p)
+            model.Add(dev >= old_t - first["start"]).OnlyEnforceIf(p)
+            deviations.append(dev)
+        elif jid not in late:
+            # absent from the old plan (or a new rush run): start from "not run"
+            model.AddHint(p, 0)
+
+    # objective: throughput first, then finish times plus plan deviation
+    secondary = built.total_finish + deviation_weight * sum(deviations)
+    n_jobs    = len(built.job_presence)
+    BIGF      = built.H_t * (n_jobs + 1) * (1 + max(0, deviation_weight))
+    model.Maximize(built.throughput * BIGF - secondary)
+    built.bigf = BIGF       # the progress gap reads throughput back with it
+
+    return solve_model(built, time_limit, num_workers, on_solver, progress,
+                       on_schedule, schedule_interval)
@@ -0,0 +1,142 @@
+# scheduler/run_params.py
+"""
+The per-job run parameter table behind the Run Parameters page, as a
+pandas DataFrame of strings (exactly what the user typed):
+
+    job_id | weight | earliest | latest | precedence
+    K01_0  | 1      | 0700     |        | K09_0,K06_1
+
+- default_table():    one row per job of the selected ops
+- parse_run_params(): every row at once into the solver's weights / earliest /
+                      latest / precedence dicts; bad cells raise RunParamsError
+- read_run_params(), write_run_params(), merge_run_params(): CSV round trip,
+                      imported rows matched to the table by job_id
+- parse_max_runs():   the same for the per-op Max Runs column
+
+Weights and windows are per operation in the model: the op's last run row
+counts.  Blank cells mean weight 1, earliest = program start, no latest
+finish and no predecessors.  Times are HHMM or HH:MM on a 24 h clock.
+"""
+import pandas as pd
+
+from .precedence import parse_job_list
+
+__all__ = [
+    "COLUMNS",
+    "RunParamsError",
+    "default_table",
+    "parse_run_params",
+    "parse_max_runs",
+    "read_run_params",
+    "write_run_params",
+    "merge_run_params",
+]
+
+COLUMNS = ("job_id", "weight", "earliest", "latest", "precedence")
+DEFAULTS = {"weight": "1", "earliest": "0700", "latest": "", "precedence": ""}
+
+
+class RunParamsError(ValueError):
+    """Cells that do not parse; .cells lists (job_id, column, value, reason)."""
+    def __init__(self, cells):
+        self.cells = cells
+        lines = [f"{jid} {col} {val!r}: {why}" for jid, col, val, why in cells[:10]]
+        more = f"\n… and {len(cells) - 10} more" if len(cells) > 10 else ""
+        super().__init__("Invalid run parameters:\n" + "\n".join(lines) + more)
+
+
+def default_table(selected_ops, max_runs, defaults=None):
+    """One row per job (op_0 … op_{runs-1}) with the default cell values."""
+    ids = [f"{op}_{k}" for op in selected_ops for k in range(max_runs.get(op, 1))]
+    vals = {**DEFAULTS, **(defaults or {})}
+    return pd.DataFrame({"job_id": ids, **{c: [vals[c]] * len(ids) for c in COLUMNS[1:]}})
+
+
+def _clock(col):
+    """Series of HHMM / HH:MM strings → (minutes as float, bad mask); blanks are NaN."""
+    s = col.str.strip().str.replace(":", "", regex=False)
+    blank = s == ""
+    digits = s.str.fullmatch(r"\d{3,4}")
+    n = pd.to_numeric(s.where(digits), errors="coerce")
+    hh, mm = n // 100, n % 100
+    ok = digits & (hh < 24) & (mm < 60)
+    return (hh * 60 + mm).where(ok), ~(ok | blank)
+
+
+def _bad(table, mask, col, why):
+    return [(j, col, v, why) for j, v in zip(table.loc[mask, "job_id"], table.loc[mask, col])]
+
+
+def parse_run_params(table, program_start):
+    """
+    (weights, earliest, latest, precedence) for solve_throughput_with_earliest:
+    weights/latest per op, earliest per op plus 'program_start', precedence per
+    job id.  Raises RunParamsError listing every cell that does not parse.
+    """
+    t = table.astype(str)
+    ops = t["job_id"].str.rsplit("_", n=1).str[0]
+
+    w = t["weight"].str.strip()
+    weight = pd.to_numeric(w, errors="coerce")
+    bad_w = (weight.isna() & (w != "")) | (weight < 0)
+    early, bad_e = _clock(t["earliest"])
+    late,  bad_l = _clock(t["latest"])
+    bad_order = late.notna() & early.notna() & (late <= early)
+
+    cells = (_bad(t, bad_w, "weight", "not a non-negative number")
+             + _bad(t, bad_e, "earliest", "not a HHMM time")
+             + _bad(t, bad_l, "latest", "not a HHMM time")
+             + _bad(t, bad_order, "latest", "not after the earliest start"))
+    if cells:
+        raise RunParamsError(cells)
+
+    last = pd.DataFrame({
+        "op": ops,
+        "weight": weight.fillna(1.0),
+        "earliest": early.fillna(program_start),
+        "latest": late,
+    }).drop_duplicates("op", keep="last").set_index("op")
+
+    weights  = last["weight"].astype(float).to_dict()
+    earliest = {"program_start": program_start, **last["earliest"].astype(int).to_dict()}
+    latest   = {op: (None if pd.isna(v) else int(v)) for op, v in last["latest"].items()}
+    precedence = {jid: parse_job_list(raw) for jid, raw in zip(t["job_id"], t["precedence"])}
+    return weights, earliest, latest, precedence
+
+
+def parse_max_runs(ops, values):
+    """{op: runs} from parallel lists of ops and cell strings; raises RunParamsError."""
+    s = pd.Series(list(values), dtype=str).str.strip()
+    n = pd.to_numeric(s, errors="coerce")
+    bad = n.isna() | (n < 0) | (n % 1 != 0)
+    if bad.any():
+        raise RunParamsError([(op, "max runs", v, "not a whole number ≥ 0")
+                              for op, v, b in zip(ops, s, bad) if b])
+    return dict(zip(ops, n.astype(int)))
+
+
+def read_run_params(path):
+    """A CSV with a job_id column and any of the other COLUMNS, all as strings."""
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    df.columns = [c.strip().lower() for c in df.columns]
+    if "job_id" not in df.columns:
+        raise ValueError(f"{path}: no job_id column")
+    return df[[c for c in COLUMNS if c in df.columns]]
+
+
+def write_run_params(table, path):
+    table.loc[:, list(COLUMNS)].to_csv(path, index=False)
+
+
+def merge_run_params(table, imported):
+    """
+    table with the imported rows' cells, matched by job_id.  Returns
+    (merged, unknown_job_ids); columns missing from the import stay as they were.
+    """
+    imp = imported.drop_duplicates("job_id", keep="last").set_index("job_id")
+    merged = table.set_index("job_id")
+    known = imp.index.intersection(merged.index)
+    cols = [c for c in imp.columns if c in merged.columns]
+    merged.loc[known, cols] = imp.loc[known, cols]
+    unknown = [j for j in imp.index if j not in merged.index]
+    return merged.reset_index(), unknown
@@ -0,0 +1,411 @@
+# scheduler/service.py
+"""
+Local scheduling service around solve_throughput_with_earliest.
+
+Several planners can share one solver process on the line PC instead of each
+desktop copy re-solving the same scenario:
+
+    python -m Scheduler.service --port 8765 --workers 2
+
+The service only binds to 127.0.0.1.  Clients POST a problem to /solve and
+then poll /jobs/<id> (optionally long-polling with ?wait=<seconds>) or read
+/jobs/<id>/stream, which emits one JSON line per status change.
+
+- Identical problems share one job: the job id is a hash of the problem.
+- Finished results are kept in an LRU cache and returned immediately, once
+  Scheduler.validate has confirmed they fit the problem.
+- "interactive" requests are always dequeued before "batch" ones.
+- The worker pool is bounded and splits the CPU cores between its solves.
+"""
+import argparse
+import heapq
+import itertools
+import json
+import math
+import multiprocessing
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from .model import solve_throughput_with_earliest
+from .problem import make_problem, problem_key, encode_result, decode_result
+from .validate import validate_problem
+from Data.universal_variable import TIME_UNIT, Timespan
+
+__all__ = [
+    "SchedulingService",
+    "ServiceClient",
+    "serve",
+    "make_problem",
+    "problem_key",
+    "encode_result",
+    "decode_result",
+    "DEFAULT_PORT",
+]
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# lower number = served first
+PRIORITIES = {"interactive": 0, "batch": 1}
+
+
+# ----------------------------------------------------------------------------
+# -- Job queue & worker pool
+# ----------------------------------------------------------------------------
+
+class _Job:
+    def __init__(self, key, problem, priority):
+        self.key      = key
+        self.problem  = problem
+        self.priority = priority
+        self.status   = "queued"      # queued → running → done | failed
+        self.result   = None
+        self.error    = None
+        self.verified = None          # result checked by validate_problem (cached jobs)
+        self.submitted = time.time()
+        self.started   = None
+        self.finished  = None
+        self.changed  = threading.Condition()
+
+    def snapshot(self, with_result=True):
+        out = {
+            "id":       self.key,
+            "status":   self.status,
+            "priority": self.priority,
+            "queued_s": round((self.started or time.time()) - self.submitted, 3),
+        }
+        if self.started:
+            out["running_s"] = round((self.finished or time.time()) - self.started, 3)
+        if self.error:
+            out["error"] = self.error
+        if with_result and self.status == "done":
+            out["result"] = self.result
+        return out
+
+
+class SchedulingService:
+    """
+    In-process job queue.  Safe to use directly from Python (e.g. in a batch
+    script); the HTTP front-end in serve() is a thin wrapper around it.
+    """
+
+    def __init__(self, workers=None, cache_size=256, solve=solve_throughput_with_earliest):
+        cores = multiprocessing.cpu_count()
+        self.workers     = max(1, workers or min(2, cores))
+        # each CP-SAT solve gets its share of the cores
+        self.search_workers = max(1, cores // self.workers)
+        self.cache_size  = cache_size
+        self._solve      = solve
+        self._lock       = threading.Lock()
+        self._queue      = []                 # heap of (priority, seq, key)
+        self._seq        = itertools.count()
+        self._pending    = threading.Semaphore(0)
+        self._jobs       = {}                 # key → in-flight _Job
+        self._cache      = OrderedDict()      # key → finished _Job (LRU)
+        self.stats       = {"submitted": 0, "cache_hits": 0, "deduplicated": 0, "solved": 0,
+                            "failed": 0, "rejected": 0}
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"solver-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, problem, priority="interactive"):
+        """
+        Queue a problem (as built by make_problem) and return its job id.
+        Repeats are answered from the cache, duplicates join the running job.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"priority must be one of {sorted(PRIORITIES)}")
+        key = problem_key(problem)
+        with self._lock:
+            self.stats["submitted"] += 1
+            cached = self._cache.get(key)
+            if cached is not None:
+                if cached.status == "done" and cached.result["sched"]:
+                    if self._verified(cached):
+                        self._cache.move_to_end(key)
+                        self.stats["cache_hits"] += 1
+                        return key
+                    self.stats["rejected"] += 1
+                # failures, empty and invalid results are solved again
+                del self._cache[key]
+            job = self._jobs.get(key)
+            if job is not None:
+                self.stats["deduplicated"] += 1
+                # an interactive request jumps a queued batch duplicate
+                if job.status == "queued" and PRIORITIES[priority] < PRIORITIES[job.priority]:
+                    job.priority = priority
+                    self._push(job)
+                return key
+            job = _Job(key, problem, priority)
+            self._jobs[key] = job
+            self._push(job)
+        return key
+
+    @staticmethod
+    def _verified(job):
+        # a cached schedule is reused only after an independent check
+        if job.verified is None:
+            sched, tasks, _ = decode_result(job.result)
+            job.verified = not validate_problem(job.problem, sched, tasks)
+        return job.verified
+
+    def _push(self, job):
+        heapq.heappush(self._queue, (PRIORITIES[job.priority], next(self._seq), job.key))
+        self._pending.release()
+
+    def get(self, key):
+        with self._lock:
+            return self._jobs.get(key) or self._cache.get(key)
+
+    def status(self, key, with_result=True):
+        job = self.get(key)
+        return None if job is None else job.snapshot(with_result)
+
+    def wait(self, key, timeout=None):
+        """
+        Block until the job finishes (or timeout); returns its snapshot.
+        """
+        job = self.get(key)
+        if job is None:
+            return None
+        deadline = None if timeout is None else time.time() + timeout
+        with job.changed:
+            while job.status in ("queued", "running"):
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    break
+                job.changed.wait(remaining)
+        return job.snapshot()
+
+    def _worker(self):
+        while True:
+            self._pending.acquire()
+            with self._lock:
+                _, _, key = heapq.heappop(self._queue)
+                job = self._jobs.get(key)
+                # stale entry left behind by a priority upgrade
+                if job is None or job.status != "queued":
+                    continue
+                self._set(job, "running")
+            try:
+                p = job.problem
+                sched, tasks, horizon = self._solve(
+                    p["selected_ops"], p["stations_dict"], p["operations_dict"],
+                    p["weights"], p["max_runs"], p["horizon"], p["station_caps"],
+                    p["earliest_starts"], p["latest_finishes"],
+                    time_unit   = p["time_unit"],
+                    precedence  = p["precedence"],
+                    time_limit  = p["time_limit"],
+                    objective   = p.get("objective", "weighted"),
+                    num_workers = self.search_workers,
+                )
+                job.result = encode_result(sched, tasks, horizon)
+                final = "done"
+            except Exception as e:
+                job.error = f"{type(e).__name__}: {e}"
+                final = "failed"
+            with self._lock:
+                self._jobs.pop(key, None)
+                self.stats["solved" if final == "done" else "failed"] += 1
+                # failed jobs stay visible to pollers until the next submit
+                self._cache[key] = job
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            self._set(job, final)
+
+    @staticmethod
+    def _set(job, status):
+        with job.changed:
+            job.status = status
+            if status == "running":
+                job.started = time.time()
+            elif status in ("done", "failed"):
+                job.finished = time.time()
+            job.changed.notify_all()
+
+    def overview(self):
+        with self._lock:
+            return {
+                "workers":        self.workers,
+                "search_workers": self.search_workers,
+                "queued":  sum(1 for j in self._jobs.values() if j.status == "queued"),
+                "running": sum(1 for j in self._jobs.values() if j.status == "running"),
+                "cached":  len(self._cache),
+                **self.stats,
+            }
+
+
+# ----------------------------------------------------------------------------
+# -- HTTP front-end (localhost only)
+# ----------------------------------------------------------------------------
+
+class _Handler(BaseHTTPRequestHandler):
+    service = None   # set by serve()
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _send(self, code, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/solve":
+            return self._send(404, {"error": "not found"})
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(body, dict) or not isinstance(body.get("problem"), dict):
+                raise ValueError('body must be a JSON object with a "problem" object')
+            key = self.service.submit(body["problem"], body.get("priority", "interactive"))
+        except (KeyError, TypeError, ValueError) as e:
+            return self._send(400, {"error": str(e)})
+        self._send(202, self.service.status(key, with_result=False))
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        query = parse_qs(url.query)
+        if parts == ["status"]:
+            return self._send(200, self.service.overview())
+        if len(parts) >= 2 and parts[0] == "jobs":
+            key = parts[1]
+            if self.service.get(key) is None:
+                return self._send(404, {"error": f"unknown job {key}"})
+            if parts[2:] == ["stream"]:
+                return self._stream(key)
+            if "wait" in query:
+                try:
+                    timeout = float(query["wait"][0])
+                except ValueError:
+                    timeout = math.nan
+                if not math.isfinite(timeout) or timeout < 0:
+                    return self._send(400, {"error": f"wait must be a number of seconds ≥ 0, "
+                                                     f"not {query['wait'][0]!r}"})
+                return self._send(200, self.service.wait(key, timeout))
+            return self._send(200, self.service.status(key))
+        self._send(404, {"error": "not found"})
+
+    def _stream(self, key):
+        # newline-delimited JSON; the body ends when the job does
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        job = self.service.get(key)
+        last = None
+        while True:
+            with job.changed:
+                if job.status == last:
+                    job.changed.wait(5.0)
+                status = job.status
+            final = status not in ("queued", "running")
+            if status != last or not final:
+                line = json.dumps(job.snapshot(with_result=final)) + "\n"
+                self.wfile.write(line.encode("utf-8"))
+                self.wfile.flush()
+                last = status
+            if final:
+                break
+        self.close_connection = True
+
+
+def serve(port=DEFAULT_PORT, workers=None, cache_size=256):
+    """
+    Run the service until interrupted.  Always bound to localhost.
+    """
+    service = SchedulingService(workers=workers, cache_size=cache_size)
+    handler = type("Handler", (_Handler,), {"service": service})
+    httpd = ThreadingHTTPServer((DEFAULT_HOST, port), handler)
+    httpd.daemon_threads = True
+    print(f"Scheduling service on http://{DEFAULT_HOST}:{port} "
+          f"({service.workers} solver(s) × {service.search_workers} search workers)")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+
+# ----------------------------------------------------------------------------
+# -- Client
+# ----------------------------------------------------------------------------
+
+class ServiceClient:
+    """
+    Talks to a running service.  solve() has the same signature and return
+    value as solve_throughput_with_earliest, so callers can swap one for the other.
+    """
+
+    def __init__(self, url=f"http://{DEFAULT_HOST}:{DEFAULT_PORT}", priority="interactive"):
+        self.url = url.rstrip("/")
+        self.priority = priority
+
+    def _request(self, path, body=None, timeout=30):
+        data = None if body is None else json.dumps(body).encode("utf-8")
+        req = urllib.request.Request(
+            self.url + path, data=data,
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return json.loads(resp.read())
+
+    def available(self):
+        try:
+            self._request("/status", timeout=2)
+            return True
+        except OSError:
+            return False
+
+    def submit(self, problem, priority=None):
+        return self._request("/solve", {"problem": problem,
+                                        "priority": priority or self.priority})["id"]
+
+    def status(self, key):
+        return self._request(f"/jobs/{key}")
+
+    def wait(self, key, timeout=None, poll=30.0):
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            step = poll if deadline is None else max(0.0, min(poll, deadline - time.time()))
+            snap = self._request(f"/jobs/{key}?wait={step}", timeout=step + 30)
+            if snap["status"] not in ("queued", "running"):
+                return snap
+            if deadline is not None and time.time() >= deadline:
+                raise TimeoutError(f"job {key} still {snap['status']}")
+
+    def solve(self, selected_ops, stations_dict, operations_dict, weights, max_runs,
+              horizon, station_caps, earliest_starts=None, latest_finishes=None,
+              time_unit=TIME_UNIT, precedence=None, time_limit=Timespan,
+              objective="weighted", **_ignored):
+        problem = make_problem(
+            selected_ops, stations_dict, operations_dict, weights, max_runs,
+            horizon, station_caps, earliest_starts, latest_finishes,
+            time_unit, precedence, time_limit, objective,
+        )
+        snap = self.wait(self.submit(problem))
+        if snap["status"] == "failed":
+            raise RuntimeError(snap.get("error", "remote solve failed"))
+        return decode_result(snap["result"])
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Local scheduling service")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--workers", type=int, default=None,
+                    help="concurrent solves (cores are split between them)")
+    ap.add_argument("--cache-size", type=int, default=256)
+    args = ap.parse_args()
+    serve(args.port, args.workers, args.cache_size)
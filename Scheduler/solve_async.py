@@ -0,0 +1,154 @@
+# scheduler/solve_async.py
+"""
+Non-blocking, cancellable solves.
+
+    handle = submit_solve(selected_ops, sd, ops, weights, max_runs, horizon, caps)
+    ...
+    handle.cancel()                 # stop CP-SAT now, keep the best schedule so far
+    sched, tasks, horizon = handle.result(timeout=5)
+
+Handles wrap a concurrent.futures.Future, so batch callers can wait on many
+of them with as_completed()/wait_all() or `await handle` inside asyncio.
+"""
+import asyncio
+import threading
+import concurrent.futures as cf
+
+from .model import solve_throughput_with_earliest
+
+__all__ = ["SolveHandle", "submit_solve", "as_completed", "wait_all"]
+
+
+class SolveHandle:
+    """
+    One running solve.  status is "pending", "running", "done",
+    "cancelled" (stopped early; result() holds the best schedule found)
+    or "failed".
+    """
+
+    def __init__(self):
+        self._future    = cf.Future()
+        self._lock      = threading.Lock()
+        self._solver    = None
+        self._cancelled = False
+        self._status    = "pending"
+        self._remote    = False
+
+    # ─── called from the solver thread ──────────────────────────────────────
+    def _attach(self, solver):
+        with self._lock:
+            self._solver = solver
+            self._status = "running"
+            if self._cancelled:
+                # cancelled before the search began: return straight away
+                solver.parameters.max_time_in_seconds = 0.0
+
+    def _finish(self, result=None, error=None):
+        with self._lock:
+            self._solver = None
+            if error is not None:
+                self._status = "failed"
+            elif not self._cancelled:
+                self._status = "done"
+        try:
+            if error is not None:
+                self._future.set_exception(error)
+            else:
+                self._future.set_result(result)
+        except cf.InvalidStateError:
+            # a remote solve that was already abandoned by cancel()
+            pass
+
+    # ─── public API ─────────────────────────────────────────────────────────
+    @property
+    def status(self):
+        return self._status
+
+    def done(self):
+        return self._future.done()
+
+    def cancelled(self):
+        return self._cancelled
+
+    def cancel(self):
+        """
+        Stop the search.  result() then returns the best schedule found so far
+        (empty if none was found).  Returns False if the solve already finished.
+        """
+        with self._lock:
+            if self._future.done():
+                return False
+            self._cancelled = True
+            self._status = "cancelled"
+            solver = self._solver
+            if solver is not None:
+                # stop_search() is a no-op until Solve() is running; the zero
+                # time limit covers a solver attached but not yet started
+                solver.parameters.max_time_in_seconds = 0.0
+                stop = getattr(solver, "stop_search", None) or getattr(solver, "StopSearch")
+                stop()
+        if solver is None and self._remote:
+            # nothing to stop locally: stop waiting and report no schedule
+            try:
+                self._future.set_result(({}, {}, 0))
+            except cf.InvalidStateError:
+                pass
+        return True
+
+    def result(self, timeout=None):
+        """
+        (sched, all_tasks, horizon) as returned by solve_throughput_with_earliest.
+        Raises concurrent.futures.TimeoutError if not finished within timeout.
+        """
+        return self._future.result(timeout)
+
+    def add_done_callback(self, fn):
+        """fn(handle) runs on the solver thread once the result is available."""
+        self._future.add_done_callback(lambda _f: fn(self))
+
+    def __await__(self):
+        return asyncio.wrap_future(self._future).__await__()
+
+
+def submit_solve(*args, solve=None, **kwargs):
+    """
+    Start solve_throughput_with_earliest (same arguments) on a background thread
+    and return its SolveHandle immediately.
+    - solve: alternative solver with the same signature (e.g. a ServiceClient's
+      solve); such solves cannot be interrupted, so cancel() just stops waiting.
+    """
+    handle = SolveHandle()
+    if solve is None:
+        solve = solve_throughput_with_earliest
+        kwargs["on_solver"] = handle._attach
+    else:
+        handle._remote = True
+
+    def run():
+        if handle._future.set_running_or_notify_cancel() is False:
+            return
+        if handle._remote:
+            handle._status = "running"
+        try:
+            result = solve(*args, **kwargs)
+        except BaseException as e:
+            handle._finish(error=e)
+        else:
+            handle._finish(result)
+
+    threading.Thread(target=run, name="solve", daemon=True).start()
+    return handle
+
+
+def as_completed(handles, timeout=None):
+    """Yield handles as they finish, like concurrent.futures.as_completed."""
+    by_future = {h._future: h for h in handles}
+    for fut in cf.as_completed(by_future, timeout=timeout):
+        yield by_future[fut]
+
+
+def wait_all(handles, timeout=None):
+    """Block until every handle finishes; return their results in order."""
+    handles = list(handles)
+    cf.wait([h._future for h in handles], timeout=timeout)
+    return [h.result(0) for h in handles]
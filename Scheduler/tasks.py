@@ -3,7 +3,7 @@
 from .load_data import movement_time
 from .utils import (station_xy,make_station_colors,minutes_to_hhmm,hhmm_to_minutes,axis_time_formatter,find_json,)
 from Data.universal_variable import DEFAULT_HORIZON
-__all__ = ["build_tasks", "build_tasks_with_storage"]
+__all__ = ["build_tasks", "build_tasks_with_storage", "task_resources"]
 
 def build_tasks(seq, stations_dict):
     """
@@ -49,3 +49,21 @@ def build_tasks_with_storage(seq, stations_dict):
             tasks.append(("MOVE", None, movement_time(buf, next_st, stations_dict), buf, next_st, None, None))
 
     return tasks
+
+def task_resources(entry, station_caps):
+    """
+    (resource, capacity) pairs a build_tasks entry occupies in the model:
+    its station, the "D-line" for moves off a D station and the "S-line"
+    (operators) for moves off an S station.
+    """
+    tt, stn, _, fr, to, *_ = entry
+    out = []
+    if tt == "PROCESS" and stn not in ("S", "FIN"):
+        out.append((stn, max(1, station_caps.get(stn, 1))))
+    if tt == "MOVE" and to not in ("S", "FIN"):
+        out.append((to, max(1, station_caps.get(to, 1))))
+    if tt == "MOVE" and fr and fr.startswith("D"):
+        out.append(("D-line", 1))
+    if tt == "MOVE" and fr and fr.startswith("S"):
+        out.append(("S-line", station_caps.get("S", 0)))
+    return out
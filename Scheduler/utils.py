@@ -2,9 +2,8 @@
 
 import os
 import math
-from matplotlib.colors import to_hex
-import matplotlib.pyplot as plt
-from matplotlib.ticker import FuncFormatter
+# matplotlib is imported by the two helpers that draw: the solver and the GUI's
+# first frame use this module too and should not pay for it
 
 # ----------------------------------------------------------------------------
 # -- Constants
@@ -43,6 +42,8 @@ def make_station_colors(sd, cmap_name="tab20"):
     """
     Assign each station in sd a unique hex colour, based on matplotlib's tab20.
     """
+    from matplotlib.colors import to_hex
+    import matplotlib.pyplot as plt
     keys = sorted(sd.keys(), key=lambda s:(sd[s]['row'], sd[s]['x']))
     cmap = plt.get_cmap(cmap_name)
     return {k: to_hex(cmap(i % cmap.N)) for i,k in enumerate(keys)}
@@ -79,6 +80,7 @@ def axis_time_formatter(program_start_min):
     Return a matplotlib.FuncFormatter that will display the x‐axis
     in HH:MM, offset by program_start_min.
     """
+    from matplotlib.ticker import FuncFormatter
     def fmt(x, pos):
         # x is minutes since program_start
         absolute = program_start_min + x
@@ -0,0 +1,221 @@
+# scheduler/validate.py
+"""
+Independent check of a finished schedule against its problem, without the
+solver: for schedules returned by CP-SAT, loaded from a cache or the work
+queue, or edited by hand.
+
+    issues = validate_schedule(sched, all_tasks, selected_ops, sd, ops, max_runs,
+                               horizon, station_caps, earliest, latest, precedence=...)
+    issues = validate_problem(problem, sched, all_tasks)     # make_problem() dict
+
+Every violation is listed as a precheck.Issue:
+
+- "template":   tasks missing, extra or not matching the op's template
+- "duration":   a task not as long as its template entry
+- "chain":      a task not starting where the previous one of its job ends
+- "window":     before the op's earliest start, after its latest finish, or
+                outside 0 → horizon
+- "latest":     a run of an op with a latest finish left out
+- "precedence": unknown ids/cycles, or a job starting before a predecessor
+                ends (or running without it)
+- "capacity":   more tasks at once than a station, the D-line or the
+                operators (S-line) allow
+
+Capacity is checked with one sorted sweep over start/end events per
+resource, so the whole check is O(n log n) in the number of tasks.
+"""
+import math
+
+from .tasks import build_tasks, task_resources
+from .precedence import compile_precedence, PrecedenceError
+from .precheck import Issue
+from .utils import minutes_to_hhmm
+from Data.universal_variable import TIME_UNIT
+
+__all__ = ["validate_schedule", "validate_problem"]
+
+
+def _op(jid):
+    return jid.rsplit("_", 1)[0]
+
+
+def _minutes(minutes_by_op, program_start, time_unit):
+    # the model's tick rounding, back in minutes
+    return {
+        op: max(0, int((t - program_start) * time_unit)) / time_unit
+        for op, t in (minutes_by_op or {}).items()
+        if op != "program_start" and t is not None
+    }
+
+
+def _sweep(spans, cap):
+    """
+    spans: (start_tick, end_tick, job) on one resource.  Yield (start, end,
+    peak, jobs) for every stretch where more than cap are active.
+    """
+    events = sorted([(s, 1, j) for s, e, j in spans] + [(e, 0, j) for s, e, j in spans])
+    active, count, over = {}, 0, None
+    for t, kind, jid in events:        # ends sort before starts at the same tick
+        if kind:
+            count += 1
+            active[jid] = active.get(jid, 0) + 1
+        else:
+            count -= 1
+            if active[jid] > 1:
+                active[jid] -= 1
+            else:
+                del active[jid]
+        if count > cap:
+            if over is None:
+                over = [t, count, set(active)]
+            else:
+                over[1] = max(over[1], count)
+                over[2].add(jid)
+        elif over is not None:
+            yield over[0], t, over[1], over[2]
+            over = None
+
+
+def validate_schedule(
+    sched,
+    all_tasks,
+    selected_ops,
+    stations_dict,
+    operations_dict,
+    max_runs,
+    horizon,
+    station_caps,
+    earliest_starts=None,
+    latest_finishes=None,
+    time_unit: int = TIME_UNIT,
+    precedence: dict = None,
+):
+    """
+    List of Issue for every way sched breaks the problem (arguments as for
+    solve_throughput_with_earliest; horizon=None skips the horizon check).
+    sched[(job_id, idx)] = (start_min, end_min); all_tasks needs the
+    'type', 'station', 'from_st' and 'to_st' of each scheduled task.
+    Times are compared at tick resolution (1 / time_unit minutes).
+    """
+    tol = 1.0 / time_unit
+    tick = lambda m: int(round(m * time_unit))
+    program_start = (earliest_starts or {}).get("program_start", 0)
+    clock = lambda m: minutes_to_hhmm(program_start + m)
+    release  = _minutes(earliest_starts, program_start, time_unit)
+    deadline = _minutes(latest_finishes, program_start, time_unit)
+    issues = []
+
+    templates, run_counts = {}, {}
+    for op in selected_ops:
+        templates[op] = build_tasks(operations_dict[op], stations_dict)
+        if max_runs.get(op, 0) > 0:
+            run_counts[op] = max_runs[op]
+        else:
+            minimal = sum(entry[2] for entry in templates[op])
+            run_counts[op] = int((horizon or 0) // minimal) + 1
+
+    jobs = {}
+    for (jid, idx), se in sched.items():
+        jobs.setdefault(jid, {})[idx] = se
+
+    # ─── per job: template, durations, chaining, windows ────────────────────
+    spans = {}          # jid → (first start, last end)
+    for jid in sorted(jobs):
+        steps, op = jobs[jid], _op(jid)
+        tpl = templates.get(op)
+        if tpl is None:
+            issues.append(Issue("template", f"{jid}: {op} is not a selected operation", jobs=[jid]))
+            continue
+        wrong = sorted(set(steps) ^ set(range(len(tpl))))
+        if wrong:
+            issues.append(Issue(
+                "template", f"{jid}: tasks {wrong} missing or not in the {op} template "
+                            f"({len(tpl)} tasks)", jobs=[jid]))
+        for idx in sorted(i for i in steps if i < len(tpl)):
+            tt, stn, dur, fr, to, *_ = tpl[idx]
+            meta = all_tasks.get((jid, idx)) or {}
+            if (meta.get("type"), meta.get("station"), meta.get("from_st"), meta.get("to_st")) \
+                    != (tt, stn, fr, to):
+                issues.append(Issue("template", f"{jid} task {idx} is not the template's "
+                                                f"{tt} {stn or f'{fr}→{to}'}", jobs=[jid]))
+            s, e = steps[idx]
+            need = math.ceil(dur * time_unit) / time_unit
+            if abs((e - s) - need) > tol:
+                issues.append(Issue("duration", f"{jid} task {idx} lasts {e - s:g} min, "
+                                                f"the template needs {need:g}", jobs=[jid]))
+            if idx + 1 in steps and abs(steps[idx + 1][0] - e) > tol:
+                issues.append(Issue("chain", f"{jid} task {idx + 1} starts at "
+                                             f"{clock(steps[idx + 1][0])}, not when task {idx} "
+                                             f"ends at {clock(e)}", jobs=[jid]))
+        start = min(s for s, _ in steps.values())
+        end   = max(e for _, e in steps.values())
+        spans[jid] = (start, end)
+        if op in release and start < release[op] - tol:
+            issues.append(Issue("window", f"{jid} starts at {clock(start)}, before its earliest "
+                                          f"start {clock(release[op])}", jobs=[jid]))
+        if op in deadline and end > deadline[op] + tol:
+            issues.append(Issue("window", f"{jid} ends at {clock(end)}, after its latest "
+                                          f"finish {clock(deadline[op])}", jobs=[jid]))
+        if start < -tol or (horizon is not None and end > horizon + tol):
+            issues.append(Issue("window", f"{jid} runs {clock(start)}–{clock(end)}, outside the "
+                                          f"{horizon} min horizon", jobs=[jid]))
+
+    # ─── runs the model must include ────────────────────────────────────────
+    for op in selected_ops:
+        if op in deadline:
+            missing = [f"{op}_{k}" for k in range(run_counts[op]) if f"{op}_{k}" not in jobs]
+            if missing:
+                issues.append(Issue("latest", f"{op} has a latest finish but "
+                                              f"{', '.join(missing)} not scheduled", jobs=missing))
+
+    # ─── precedence ─────────────────────────────────────────────────────────
+    if precedence:
+        try:
+            compiled = compile_precedence(precedence, run_counts)
+        except PrecedenceError as e:
+            issues.append(Issue("precedence", str(e), jobs=e.unknown + e.cycle))
+            compiled = None
+        for before, jid in (compiled.edges() if compiled else []):
+            if jid not in spans:
+                continue
+            if before not in spans:
+                issues.append(Issue("precedence", f"{jid} runs without its predecessor {before}",
+                                    jobs=[before, jid]))
+            elif spans[jid][0] < spans[before][1] - tol:
+                issues.append(Issue("precedence", f"{jid} starts at {clock(spans[jid][0])}, before "
+                                                  f"{before} ends at {clock(spans[before][1])}",
+                                    jobs=[before, jid]))
+
+    # ─── capacity: one event sweep per resource ─────────────────────────────
+    per_res, caps = {}, {}
+    for (jid, idx), (s, e) in sched.items():
+        meta = all_tasks.get((jid, idx)) or {}
+        if tick(e) <= tick(s):
+            continue        # zero-length tasks never conflict
+        entry = (meta.get("type"), meta.get("station"), 0, meta.get("from_st"), meta.get("to_st"))
+        for res, cap in task_resources(entry, station_caps):
+            per_res.setdefault(res, []).append((tick(s), tick(e), jid))
+            caps[res] = cap
+    for res in sorted(per_res):
+        for a, b, peak, who in _sweep(per_res[res], caps[res]):
+            where = res if res.endswith("-line") else f"station {res}"
+            issues.append(Issue(
+                "capacity", f"{where} has {peak} tasks at once (capacity {caps[res]}) "
+                            f"between {clock(a / time_unit)} and {clock(b / time_unit)}",
+                jobs=who, stations=[res]))
+    return issues
+
+
+def validate_problem(problem, sched, all_tasks):
+    """validate_schedule for a make_problem() dict (as cached by the service / work queue)."""
+    p = problem
+    horizon, max_runs = p["horizon"], p["max_runs"]
+    if p.get("objective") == "makespan":
+        # that mode widens the horizon and runs every selected op at least once
+        horizon = None
+        max_runs = {op: max(1, max_runs.get(op, 0)) for op in p["selected_ops"]}
+    return validate_schedule(
+        sched, all_tasks, p["selected_ops"], p["stations_dict"], p["operations_dict"],
+        max_runs, horizon, p["station_caps"], p.get("earliest_starts"),
+        p.get("latest_finishes"), p.get("time_unit", TIME_UNIT), p.get("precedence"),
+    )
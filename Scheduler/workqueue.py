@@ -0,0 +1,372 @@
+# scheduler/workqueue.py
+"""
+Batch solving over a shared directory: no server, only a filesystem that
+every machine can see.
+
+    python -m Scheduler.workqueue history  //share/run1 history.xlsx   # coordinator
+    python -m Scheduler.workqueue worker   //share/run1                # on each host
+    python -m Scheduler.workqueue status   //share/run1
+
+Directory layout (one JSON file per problem, named by its problem_key):
+
+    pending/<key>.json               waiting to be solved
+    claimed/<key>__<worker>.json     being solved; mtime is the heartbeat
+    done/<key>.json                  solved problem
+    done/<key>.result.json           its result (Scheduler.problem encoding)
+    failed/<key>.json                gave up after max_attempts, or its result
+                                     failed Scheduler.validate
+    failed/<key>.error.txt           last error / the validator's issues
+
+- A worker claims a problem by renaming it from pending/ to claimed/; the
+  rename is atomic, so exactly one worker wins.
+- Claimed files are touched while the solve runs.  A claim whose heartbeat is
+  older than stale_after (a crashed or unplugged worker) is put back in
+  pending/ by whoever notices first, up to max_attempts times.
+- Every file is written to a hidden temp name and renamed into place, so
+  nobody ever reads half a file.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import threading
+import time
+import traceback
+import uuid
+
+from .model import solve_throughput_with_earliest
+from .problem import make_problem, problem_key, encode_result, decode_result
+from .validate import validate_problem
+from Data.universal_variable import TIME_UNIT, DEFAULT_HORIZON, Timespan
+
+__all__ = ["WorkQueue", "run_worker", "STATES"]
+
+STATES = ("pending", "claimed", "done", "failed")
+
+# a claim untouched for this long is treated as abandoned (seconds); keep it
+# well above the clock skew between hosts
+STALE_AFTER = 120
+MAX_ATTEMPTS = 3
+
+
+def _atomic_write(path, text):
+    tmp = os.path.join(os.path.dirname(path), f".tmp-{uuid.uuid4().hex}")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _read_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class Claim:
+    """A problem this worker owns until complete() or fail()."""
+    def __init__(self, key, path, entry):
+        self.key     = key
+        self.path    = path
+        self.problem = entry["problem"]
+        self.meta    = entry.get("meta", {})
+        self.entry   = entry
+
+
+class WorkQueue:
+    """One shared directory; safe to use from any number of processes/hosts."""
+
+    def __init__(self, root, stale_after=STALE_AFTER, max_attempts=MAX_ATTEMPTS):
+        self.root = os.path.abspath(root)
+        self.stale_after  = stale_after
+        self.max_attempts = max_attempts
+        for state in STATES + (".requeue",):
+            os.makedirs(self._dir(state), exist_ok=True)
+
+    def _dir(self, state):
+        return os.path.join(self.root, state)
+
+    def _files(self, state):
+        return [n for n in os.listdir(self._dir(state))
+                if n.endswith(".json") and not n.startswith(".")
+                and not n.endswith(".result.json")]
+
+    # ─── coordinator ────────────────────────────────────────────────────────
+    def submit(self, problem, meta=None):
+        """
+        Queue a make_problem() dict; returns its key.  A problem already in
+        the queue (in any state) is not queued twice.
+        """
+        key = problem_key(problem)
+        if self.state(key) is None:
+            entry = {"problem": problem, "meta": meta or {}, "attempts": 0,
+                     "submitted": time.time()}
+            _atomic_write(os.path.join(self._dir("pending"), f"{key}.json"), json.dumps(entry))
+        return key
+
+    def state(self, key):
+        """"pending", "claimed", "done", "failed" or None if unknown."""
+        for state in ("done", "failed", "pending"):
+            if os.path.exists(os.path.join(self._dir(state), f"{key}.json")):
+                return state
+        if any(n.startswith(f"{key}__") for n in self._files("claimed")):
+            return "claimed"
+        return None
+
+    def result(self, key, verify=True):
+        """
+        (sched, all_tasks, horizon) of a solved problem, else None.  With
+        verify, a result that fails Scheduler.validate against its problem is
+        also None, and the problem moves to failed/ with the issues, so
+        status() no longer counts it as done.
+        """
+        path = os.path.join(self._dir("done"), f"{key}.result.json")
+        if not os.path.exists(path):
+            return None
+        res = decode_result(_read_json(path)["result"])
+        if verify and res[0]:
+            try:
+                entry = _read_json(os.path.join(self._dir("done"), f"{key}.json"))
+            except FileNotFoundError:
+                return None     # rejected by another reader meanwhile
+            issues = validate_problem(entry["problem"], res[0], res[1])
+            if issues:
+                self._reject(key, issues)
+                return None
+        return res
+
+    def _reject(self, key, issues):
+        # the rename decides which of several readers records the rejection
+        try:
+            os.replace(os.path.join(self._dir("done"), f"{key}.json"),
+                       os.path.join(self._dir("failed"), f"{key}.json"))
+        except FileNotFoundError:
+            return
+        _atomic_write(os.path.join(self._dir("failed"), f"{key}.error.txt"),
+                      "result failed validation:\n" + "\n".join(str(i) for i in issues))
+        try:
+            os.remove(os.path.join(self._dir("done"), f"{key}.result.json"))
+        except FileNotFoundError:
+            pass
+
+    def results(self):
+        """Yield (key, meta, (sched, all_tasks, horizon)) for every solved problem with a valid result."""
+        for name in sorted(self._files("done")):
+            key = name[:-len(".json")]
+            res = self.result(key)
+            if res is not None:
+                yield key, _read_json(os.path.join(self._dir("done"), name)).get("meta", {}), res
+
+    def status(self):
+        """
+        {"pending", "claimed", "done", "failed": counts, "workers": {id: claims},
+         "stale": claims past their heartbeat}
+        """
+        out = {state: len(self._files(state)) for state in STATES}
+        workers, stale, now = {}, 0, time.time()
+        for name in self._files("claimed"):
+            worker = name[:-len(".json")].split("__", 1)[-1]
+            workers[worker] = workers.get(worker, 0) + 1
+            try:
+                if now - os.path.getmtime(os.path.join(self._dir("claimed"), name)) > self.stale_after:
+                    stale += 1
+            except FileNotFoundError:
+                pass
+        out["workers"] = workers
+        out["stale"] = stale
+        return out
+
+    def requeue_stale(self):
+        """Return abandoned claims to pending/ (or failed/); returns how many."""
+        moved, now = 0, time.time()
+        for name in self._files("claimed"):
+            src = os.path.join(self._dir("claimed"), name)
+            try:
+                if now - os.path.getmtime(src) <= self.stale_after:
+                    continue
+                # park it first: of several workers noticing, one wins the rename
+                parked = os.path.join(self._dir(".requeue"), name)
+                os.rename(src, parked)
+            except FileNotFoundError:
+                continue
+            key = name[:-len(".json")].split("__", 1)[0]
+            entry = _read_json(parked)
+            entry["attempts"] = entry.get("attempts", 0) + 1
+            if entry["attempts"] >= self.max_attempts:
+                self._to_failed(key, entry, f"claim abandoned {entry['attempts']} times")
+            else:
+                _atomic_write(os.path.join(self._dir("pending"), f"{key}.json"), json.dumps(entry))
+            os.remove(parked)
+            moved += 1
+        return moved
+
+    def _to_failed(self, key, entry, error):
+        _atomic_write(os.path.join(self._dir("failed"), f"{key}.error.txt"), error)
+        _atomic_write(os.path.join(self._dir("failed"), f"{key}.json"), json.dumps(entry))
+
+    # ─── worker ─────────────────────────────────────────────────────────────
+    def claim(self, worker_id):
+        """Take the oldest pending problem, or return None if there is none."""
+        pending = self._dir("pending")
+        names = self._files("pending")
+        names.sort(key=lambda n: os.path.getmtime(os.path.join(pending, n))
+                   if os.path.exists(os.path.join(pending, n)) else 0)
+        for name in names:
+            key = name[:-len(".json")]
+            dst = os.path.join(self._dir("claimed"), f"{key}__{worker_id}.json")
+            try:
+                os.rename(os.path.join(pending, name), dst)
+            except (FileNotFoundError, FileExistsError, PermissionError):
+                continue    # another worker got there first
+            os.utime(dst)
+            entry = _read_json(dst)
+            if os.path.exists(os.path.join(self._dir("done"), f"{key}.result.json")):
+                # solved by a worker whose claim was requeued meanwhile
+                os.replace(dst, os.path.join(self._dir("done"), f"{key}.json"))
+                continue
+            return Claim(key, dst, entry)
+        return None
+
+    def heartbeat(self, claim):
+        try:
+            os.utime(claim.path)
+        except FileNotFoundError:
+            pass
+
+    def complete(self, claim, result, **info):
+        """Store (sched, all_tasks, horizon) next to the problem in done/."""
+        payload = {"result": encode_result(*result), **info}
+        _atomic_write(os.path.join(self._dir("done"), f"{claim.key}.result.json"),
+                      json.dumps(payload))
+        try:
+            os.replace(claim.path, os.path.join(self._dir("done"), f"{claim.key}.json"))
+        except FileNotFoundError:
+            # requeued while we were solving; the result still counts
+            _atomic_write(os.path.join(self._dir("done"), f"{claim.key}.json"),
+                          json.dumps(claim.entry))
+
+    def fail(self, claim, error):
+        """Count a failed attempt; retry later or give up after max_attempts."""
+        # park the claim first, as requeue_stale() does: if it has already
+        # been requeued the problem is back in pending/ and must not be twice
+        parked = os.path.join(self._dir(".requeue"), os.path.basename(claim.path))
+        try:
+            os.rename(claim.path, parked)
+        except FileNotFoundError:
+            return
+        claim.entry["attempts"] = claim.entry.get("attempts", 0) + 1
+        if claim.entry["attempts"] >= self.max_attempts:
+            self._to_failed(claim.key, claim.entry, error)
+        else:
+            _atomic_write(os.path.join(self._dir("pending"), f"{claim.key}.json"),
+                          json.dumps(claim.entry))
+        os.remove(parked)
+
+
+def _solve(p, num_workers):
+    return solve_throughput_with_earliest(
+        p["selected_ops"], p["stations_dict"], p["operations_dict"],
+        p["weights"], p["max_runs"], p["horizon"], p["station_caps"],
+        p["earliest_starts"], p["latest_finishes"],
+        time_unit   = p["time_unit"],
+        precedence  = p["precedence"],
+        time_limit  = p["time_limit"],
+        objective   = p.get("objective", "weighted"),
+        num_workers = num_workers,
+    )
+
+
+def run_worker(root, worker_id=None, poll=2.0, once=False, num_workers=None,
+               stale_after=STALE_AFTER, max_attempts=MAX_ATTEMPTS, log=print):
+    """
+    Claim and solve problems until the queue is empty (once=True) or forever.
+    Returns the number of problems this worker solved.
+    """
+    q = WorkQueue(root, stale_after, max_attempts)
+    worker_id = worker_id or _default_worker_id()
+    solved = 0
+    while True:
+        q.requeue_stale()
+        claim = q.claim(worker_id)
+        if claim is None:
+            if once and not q.status()["claimed"]:
+                return solved
+            time.sleep(poll)
+            continue
+
+        label = claim.meta.get("label", claim.key)
+        log(f"[{worker_id}] solving {label}")
+        stop = threading.Event()
+
+        def beat(claim=claim, stop=stop):
+            while not stop.wait(max(1.0, q.stale_after / 4)):
+                q.heartbeat(claim)
+        threading.Thread(target=beat, name="heartbeat", daemon=True).start()
+
+        t0 = time.time()
+        try:
+            result = _solve(claim.problem, num_workers)
+        except Exception:
+            stop.set()
+            q.fail(claim, traceback.format_exc())
+            log(f"[{worker_id}] {label} failed")
+            continue
+        stop.set()
+        q.complete(claim, result, worker=worker_id, elapsed=round(time.time() - t0, 3))
+        solved += 1
+
+
+def submit_history(root, path, time_limit=Timespan, horizon=DEFAULT_HORIZON, operators=1):
+    """Queue one problem per day of a history file; returns the keys."""
+    from .load_data import load_data
+    from .history import iter_day_problems
+
+    sd, ops = load_data()
+    caps = {st: 1 for st in sd if st not in ("S", "FIN")}
+    caps["S"] = operators
+    q, keys = WorkQueue(root), []
+    for day, counts in iter_day_problems(path):
+        problem = make_problem(
+            list(counts), sd, ops, {op: 1.0 for op in counts}, counts, horizon, caps,
+            {"program_start": 0, **{op: 0 for op in counts}}, None,
+            TIME_UNIT, None, time_limit,
+        )
+        keys.append(q.submit(problem, meta={"label": str(day), "date": str(day)}))
+    return keys
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Shared-directory batch solving")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    w = sub.add_parser("worker", help="solve queued problems")
+    w.add_argument("root")
+    w.add_argument("--id", default=None, help="worker name (default host-pid)")
+    w.add_argument("--once", action="store_true", help="exit when the queue is empty")
+    w.add_argument("--search-workers", type=int, default=None,
+                   help="CP-SAT threads per solve (default: every core)")
+    h = sub.add_parser("history", help="queue one problem per day of a history file")
+    h.add_argument("root")
+    h.add_argument("path")
+    h.add_argument("--time-limit", type=float, default=Timespan)
+    h.add_argument("--operators", type=int, default=1)
+    s = sub.add_parser("status", help="summarise the queue")
+    s.add_argument("root")
+    args = ap.parse_args()
+
+    if args.cmd == "worker":
+        n = run_worker(args.root, args.id, once=args.once,
+                       num_workers=args.search_workers or multiprocessing.cpu_count())
+        print(f"solved {n} problem(s)")
+    elif args.cmd == "history":
+        keys = submit_history(args.root, args.path, args.time_limit, operators=args.operators)
+        print(f"queued {len(keys)} day(s) in {os.path.abspath(args.root)}")
+    else:
+        st = WorkQueue(args.root).status()
+        total = sum(st[k] for k in STATES)
+        print(f"{st['done']}/{total} done, {st['claimed']} running, "
+              f"{st['pending']} pending, {st['failed']} failed, {st['stale']} stale")
+        for worker, n in sorted(st["workers"].items()):
+            print(f"  {worker}: {n}")
@@ -6,12 +6,16 @@ if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 import time
 import csv
-import pandas as pd
 from tkinter import filedialog
 import tkinter as tk
 from Data.universal_variable import TIME_UNIT, DEFAULT_HORIZON
 from Scheduler.load_data import load_data
 from Scheduler.model import solve_throughput_with_earliest
+from Scheduler.history import read_history, iter_day_problems
+from Scheduler.kpi import kpis
+from Scheduler.archive import ScheduleArchive
+from Scheduler.problem import make_problem
+from Scheduler.validate import validate_problem
 
 def select_input_file():
     """Open file dialog to select input file."""
@@ -43,13 +47,8 @@ def run_historical(input_path: str = None,
         
         print(f"Reading data from: {os.path.abspath(input_path)}")
         
-        # Read input data based on file extension
-        if input_path.lower().endswith(('.xlsx', '.xls')):
-            df = pd.read_excel(input_path, parse_dates=["Date"], dtype={"Sequence label": str})
-        else:
-            df = pd.read_csv(input_path, parse_dates=["Date"], dtype={"Sequence label": str})
-        
-        df["Date"] = df["Date"].dt.date
+        # Parsed once per file; later runs load the cached columnar copy
+        df = read_history(input_path)
 
         # Load static scheduling data
         sd, ops = load_data()
@@ -57,22 +56,20 @@ def run_historical(input_path: str = None,
         horizon = DEFAULT_HORIZON
         earliest = {"program_start": 0}
 
-        # Get unique dates and operations
-        all_dates = sorted(df["Date"].unique())
+        # Every operation seen in the history gets a column in the output
         all_ops = sorted(df["Sequence label"].unique())
         
         # Initialize results storage
         results = []
         t0 = time.time()
+        archive = ScheduleArchive()
+        run_id = archive.start_run(os.path.basename(input_path), kind="batch_test",
+                                   params={"source": os.path.abspath(input_path), "horizon": horizon})
 
         # Process each date
-        for day in all_dates:
+        for day, counts in iter_day_problems(df):
             print(f"→ Processing {day}")
             
-            # Get operations for this day
-            sub = df[df["Date"] == day]
-            counts = sub["Sequence label"].value_counts().to_dict()
-            
             # Setup scheduling parameters
             selected_ops = list(counts)
             weights = {op:1.0 for op in selected_ops}
@@ -85,33 +82,38 @@ def run_historical(input_path: str = None,
                 latest_finishes=None, time_unit=TIME_UNIT
             )
 
+            problem = make_problem(selected_ops, sd, ops, weights, max_runs, horizon,
+                                   station_caps, earliest, None, TIME_UNIT)
+            archive.record(run_id, sched, all_tasks, problem, date=day)
+
             if not sched:
                 print(f"  ⚠️  Failed to generate schedule for {day}, skipping")
                 continue
 
+            # every benchmark schedule is checked independently of the solver
+            violations = validate_problem(problem, sched, all_tasks)
+            for v in violations:
+                print(f"  ❌ {v.kind}: {v}")
+
             # Calculate metrics
-            procs = [(s,e) for (jid,idx),(s,e) in sched.items() 
-                    if all_tasks[(jid,idx)]["type"]=="PROCESS"]
-            
-            if procs:
-                starts, ends = zip(*procs)
-                total_runtime = max(ends) - min(starts)
-            else:
-                total_runtime = 0.0
-                
-            throughput = sum(1 for (jid,idx) in sched if idx==0)
+            metrics = kpis(sched, all_tasks)
+            total_runtime = metrics["total_runtime"]
+            throughput = metrics["throughput"]
 
             # Store results for this day
             row = {
                 "Date": day,
                 "total_runtime": total_runtime,
                 "throughput": throughput,
+                "violations": len(violations),
                 **{op: counts.get(op, 0) for op in all_ops}
             }
             results.append(row)
 
+        archive.close()
+
         # Write output CSV
-        fieldnames = ["Date", "total_runtime", "throughput"] + all_ops
+        fieldnames = ["Date", "total_runtime", "throughput", "violations"] + all_ops
         out_path = os.path.abspath(output_csv)
         
         with open(out_path, "w", newline="") as fout:
@@ -9,6 +9,7 @@ import csv
 import time
 from Scheduler.load_data import load_data
 from Scheduler.model import solve_throughput_with_earliest
+from Scheduler.kpi import kpis
 from tqdm import trange
 from Data.universal_variable import TIME_UNIT
 # 1) load your static data once
@@ -21,6 +22,7 @@ weights      = {op: 1.0 for op in selected_ops}
 max_runs     = {op: 20   for op in selected_ops}
 horizon      = 22*60
 earliest     = {'program_start': 0}
+search       = "cp-sat"     # "lns" for large mixes (see Scheduler.lns)
 
 # 3) run N trials with a tqdm progress bar
 results = []
@@ -38,24 +40,16 @@ for i in trange(1, N+1, desc="Reliability runs"):
         station_caps,
         earliest,
         latest_finishes=None,
-        time_unit=TIME_UNIT
+        time_unit=TIME_UNIT,
+        search=search
     )
 
-    # compute total runtime: first entry → last exit
-    entries = [s for (jid, idx),(s,e) in sched.items()
-                  if all_tasks[(jid,idx)]['type']=='PROCESS']
-    exits   = [e for (jid, idx),(s,e) in sched.items()
-                  if all_tasks[(jid,idx)]['type']=='PROCESS']
-    if entries and exits:
-        total_runtime = max(exits) - min(entries)
-    else:
-        total_runtime = 0
-
-    throughput = len({jid for jid, idx in sched if idx == 0})
+    # total runtime: first entry → last exit
+    metrics = kpis(sched, all_tasks)
     results.append({
         'run':           i,
-        'total_runtime': total_runtime,
-        'throughput':    throughput,
+        'total_runtime': metrics['total_runtime'],
+        'throughput':    metrics['throughput'],
     })
 
 # 4) write out a CSV
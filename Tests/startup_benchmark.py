@@ -0,0 +1,95 @@
+# startup_benchmark.py
+"""
+Time-to-interactive of the GUI, each run in a fresh interpreter:
+
+    python Tests/startup_benchmark.py [runs]
+
+- import:       GUI.main_app imported
+- window:       root window, splash and status bar up
+- interactive:  first page built and drawn (MainApp.timings["interactive"])
+- loaded:       background preloading finished (pandas, solver, charts, …)
+
+All in seconds from interpreter start-up of the child.  Without a display
+(or without ttkthemes) it falls back to timing the same work headless: the
+first page's imports plus load_data(), then each module MainApp preloads.
+"""
+import os, sys
+PROJECT_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..")
+)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+import json
+import statistics
+import subprocess
+import time
+
+# what MainApp's startup thread loads after the first page (GUI.main_app.STARTUP_STEPS)
+PRELOAD = ["pandas", "Scheduler.model", "Scheduler.archive",
+           "matplotlib.backends.backend_tkagg", "GUI.frames.run_params_frame"]
+
+
+def child_gui():
+    t0 = time.perf_counter()
+    from GUI.main_app import MainApp
+    t_import = time.perf_counter()
+    app = MainApp()
+    out = {}
+
+    def check():
+        if "loaded" in app.timings:
+            out.update({k: v - t0 for k, v in app.timings.items() if k != "start"})
+            out["import"] = t_import - t0
+            app.destroy()
+        else:
+            app.after(10, check)
+    app.after(10, check)
+    app.after(120_000, app.destroy)
+    app.mainloop()
+    return out
+
+
+def child_headless():
+    import importlib
+    t0 = time.perf_counter()
+    from Scheduler.load_data import load_data
+    importlib.import_module("GUI.frames.initial_frame")
+    load_data()
+    out = {"interactive": time.perf_counter() - t0}
+    for module in PRELOAD:
+        importlib.import_module(module)
+        out[module] = time.perf_counter() - t0
+    out["loaded"] = time.perf_counter() - t0
+    return out
+
+
+def run_child(mode):
+    proc = subprocess.run([sys.executable, __file__, "--child", mode],
+                          capture_output=True, text=True, cwd=PROJECT_ROOT)
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        return None, proc.stderr.strip().splitlines()[-1:] or ["no output"]
+    return json.loads(lines[-1]), None
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--child":
+        print(json.dumps(child_gui() if sys.argv[2] == "gui" else child_headless()))
+        sys.exit(0)
+
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    mode = "gui"
+    first, error = run_child(mode)
+    if first is None:
+        print(f"GUI start-up not possible here ({error[0]}); timing headless.")
+        mode = "headless"
+        first, error = run_child(mode)
+        if first is None:
+            sys.exit(f"Headless run failed: {error[0]}")
+
+    results = [first] + [run_child(mode)[0] for _ in range(runs - 1)]
+    results = [r for r in results if r]
+    print(f"\n{mode} start-up, {len(results)} run(s), seconds (median / min / max):")
+    for key in results[0]:
+        vals = [r[key] for r in results if key in r]
+        print(f"  {key:<36} {statistics.median(vals):7.3f} {min(vals):7.3f} {max(vals):7.3f}")